@@ -0,0 +1,363 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for tpDcc-tools-scripteditor Python syntax highlighter
+
+Highlights a corpus of generated and real Python files with PythonHiglighter attached to a QTextDocument
+(using offscreen Qt platform) and reports full document and per block timings and allocation counts.
+Results are written as JSON so different runs can be compared:
+
+    python scripts/benchmark_highlighter.py --output before.json
+    python scripts/benchmark_highlighter.py --output after.json --compare before.json
+
+Use --no-qt to only benchmark the lexers (useful when no Qt binding is available).
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import os
+import ast
+import sys
+import json
+import time
+import inspect
+import argparse
+import platform
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CODE_TEMPLATE = '''import maya.cmds as cmds
+import pymel.core as pm
+
+
+class {name}Rig(object):
+    """
+    Builds {name} rig
+    """
+
+    def __init__(self, side='L', joints=None):
+        self._side = side
+        self._joints = joints or list()  # joints of the chain
+
+    def build(self, parent=None):
+        for i, joint in enumerate(self._joints):
+            ctrl = pm.PyNode(cmds.createNode('transform', name='{{}}_{{}}_CTRL'.format(self._side, i)))
+            ctrl.translate.set(joint.getTranslation(space='world') * 1.5)
+            if parent and i % 2 == 0:
+                pm.parentConstraint(parent, ctrl, maintainOffset=True)
+        return {{'side': self._side, "count": len(self._joints), 'valid': True}}
+
+'''
+
+DOCSTRING_TEMPLATE = '''def {name}(value):
+    """
+    {name} documentation with 'quotes', "double quotes" and # hashes
+    :param value: int
+    :return: int
+    """
+
+    return value * 0x1F  # {name}
+
+'''
+
+
+def generate_code(lines):
+    """
+    Returns generated rigging code with the given number of lines
+    :param lines: int
+    :return: str
+    """
+
+    return _repeat_template(CODE_TEMPLATE, lines)
+
+
+def generate_docstrings(lines):
+    """
+    Returns generated code dominated by docstrings with the given number of lines
+    :param lines: int
+    :return: str
+    """
+
+    return _repeat_template(DOCSTRING_TEMPLATE, lines)
+
+
+def generate_long_lines(lines, line_length=2000):
+    """
+    Returns generated code with very long lines (similar to baked data files)
+    :param lines: int
+    :param line_length: int
+    :return: str
+    """
+
+    items = ', '.join('({0}, {0}.5, "key_{0}")'.format(i) for i in range(line_length // 20))
+    return '\n'.join('data_{} = [{}]'.format(i, items)[:line_length] + ']' for i in range(lines))
+
+
+def get_corpus(files=None):
+    """
+    Returns corpus of Python code used by the benchmark
+    :param files: list(str) or None, extra Python files to include in the corpus
+    :return: list(tuple(str, str))
+    """
+
+    corpus = [
+        ('generated_small', generate_code(200)),
+        ('generated_5k', generate_code(5000)),
+        ('generated_50k', generate_code(50000)),
+        ('docstrings_5k', generate_docstrings(5000)),
+        ('long_lines', generate_long_lines(500))
+    ]
+
+    for module_name in ('inspect', 'argparse', 'tokenize'):
+        module = __import__(module_name)
+        corpus.append(('stdlib_{}'.format(module_name), inspect.getsource(module)))
+
+    for file_path in files or list():
+        with open(file_path) as fh:
+            corpus.append((os.path.basename(file_path), fh.read()))
+
+    return corpus
+
+
+def get_lexers(engines, use_qt=True):
+    """
+    Returns lexers of the given highlighting engines
+    python syntax module imports Qt, so when Qt is not used the syntax table is read from its source code
+    :param engines: list(str)
+    :param use_qt: bool
+    :return: dict(str, PythonLexer)
+    """
+
+    if use_qt:
+        from tpDcc.tools.scripteditor.syntax import python
+        return {engine: python.get_lexer(engine) for engine in engines}
+
+    from tpDcc.tools.scripteditor.syntax import lexer, tokenizer
+
+    syntax_path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tpDcc', 'tools', 'scripteditor', 'syntax',
+        'python.py')
+    with open(syntax_path) as fh:
+        module = ast.parse(fh.read())
+    syntax = None
+    for node in module.body:
+        if isinstance(node, ast.Assign) and getattr(node.targets[0], 'id', None) == 'Syntax':
+            syntax = ast.literal_eval(node.value)
+    engine_classes = {lexer_class.ENGINE: lexer_class for lexer_class in (lexer.PythonLexer, tokenizer.TokenizeLexer)}
+
+    return {engine: engine_classes[engine](syntax) for engine in engines}
+
+
+def benchmark_lexer(python_lexer, text):
+    """
+    Benchmarks lexing of all the blocks of the given text without Qt
+    :param python_lexer: PythonLexer
+    :param text: str
+    :return: dict
+    """
+
+    from tpDcc.tools.scripteditor.syntax import lexer
+
+    timings = list()
+    state = lexer.STATE_NONE
+    start = time.perf_counter()
+    for line in text.split('\n'):
+        block_start = time.perf_counter()
+        _, state = python_lexer.lex(line, state)
+        timings.append(time.perf_counter() - block_start)
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    state = lexer.STATE_NONE
+    for line in text.split('\n'):
+        _, state = python_lexer.lex(line, state)
+    allocations = _get_allocations(snapshot)
+    tracemalloc.stop()
+
+    return {'full_document_ms': total * 1000.0, 'per_block_us': _get_stats(timings), 'allocations': allocations}
+
+
+def benchmark_highlighter(engine, text, warm=False):
+    """
+    Benchmarks highlighting of a QTextDocument with PythonHiglighter
+    :param engine: str, highlighting engine
+    :param text: str
+    :param warm: bool, whether or not highlight cache is kept from previous runs
+    :return: dict
+    """
+
+    from Qt.QtGui import QTextDocument
+    from tpDcc.tools.scripteditor.syntax import python, cache
+
+    def _highlight():
+        if not warm:
+            cache.get_highlight_cache().clear()
+        document = QTextDocument()
+        document.setPlainText(text)
+        highlighter = python.PythonHiglighter(document, engine=engine)
+        start = time.perf_counter()
+        highlighter.rehighlight()
+        elapsed = time.perf_counter() - start
+        return document, highlighter, elapsed
+
+    document, highlighter, total = _highlight()
+
+    if not warm:
+        cache.get_highlight_cache().clear()
+    timings = list()
+    block = document.begin()
+    while block.isValid():
+        block_start = time.perf_counter()
+        highlighter.rehighlightBlock(block)
+        timings.append(time.perf_counter() - block_start)
+        block = block.next()
+
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    _highlight()
+    allocations = _get_allocations(snapshot)
+    tracemalloc.stop()
+
+    return {
+        'full_document_ms': total * 1000.0,
+        'per_block_us': _get_stats(timings),
+        'allocations': allocations,
+        'cache': cache.get_highlight_cache().stats()
+    }
+
+
+def run(engines, use_qt=True, files=None):
+    """
+    Runs the benchmark
+    :param engines: list(str), highlighting engines to benchmark
+    :param use_qt: bool, whether to benchmark PythonHiglighter with Qt or only the lexers
+    :param files: list(str) or None, extra Python files to include in the corpus
+    :return: dict
+    """
+
+    meta = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'qt': None
+    }
+
+    if use_qt:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        import Qt
+        from Qt.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication(sys.argv)     # noqa: F841
+        meta['qt'] = '{} {}'.format(Qt.__binding__, Qt.__qt_version__)
+
+    lexers = get_lexers(engines, use_qt=use_qt)
+
+    results = list()
+    for name, text in get_corpus(files):
+        for engine in engines:
+            info = {'corpus': name, 'lines': text.count('\n') + 1, 'chars': len(text), 'engine': engine}
+            modes = [('lexer', lambda: benchmark_lexer(lexers[engine], text))]
+            if use_qt:
+                modes.append(('highlighter_cold', lambda: benchmark_highlighter(engine, text)))
+                modes.append(('highlighter_warm', lambda: benchmark_highlighter(engine, text, warm=True)))
+            for mode, fn in modes:
+                result = dict(info, mode=mode)
+                result.update(fn())
+                results.append(result)
+                print('{corpus:<20} {engine:<9} {mode:<17} {full_document_ms:>10.2f} ms  p95 {p95:>8.2f} us'.format(
+                    p95=result['per_block_us']['p95'], **result))
+
+    return {'meta': meta, 'results': results}
+
+
+def compare(current, previous):
+    """
+    Prints full document timing ratios between two benchmark runs
+    :param current: dict
+    :param previous: dict
+    """
+
+    previous_results = {(r['corpus'], r['engine'], r['mode']): r for r in previous.get('results', list())}
+    for result in current['results']:
+        old = previous_results.get((result['corpus'], result['engine'], result['mode']))
+        if not old or not result['full_document_ms']:
+            continue
+        print('{:<20} {:<9} {:<17} {:>6.2f}x'.format(
+            result['corpus'], result['engine'], result['mode'], old['full_document_ms'] / result['full_document_ms']))
+
+
+def _get_stats(timings):
+    """
+    Internal function that returns statistics in microseconds of the given timings in seconds
+    :param timings: list(float)
+    :return: dict
+    """
+
+    if not timings:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+
+    values = sorted(t * 1000000.0 for t in timings)
+    return {
+        'mean': sum(values) / len(values),
+        'p50': values[len(values) // 2],
+        'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+        'max': values[-1]
+    }
+
+
+def _get_allocations(snapshot):
+    """
+    Internal function that returns allocations done since the given tracemalloc snapshot was taken
+    :param snapshot: tracemalloc.Snapshot
+    :return: dict
+    """
+
+    current, peak = tracemalloc.get_traced_memory()
+    stats = tracemalloc.take_snapshot().compare_to(snapshot, 'filename')
+    return {
+        'count': sum(max(0, stat.count_diff) for stat in stats),
+        'bytes': sum(max(0, stat.size_diff) for stat in stats),
+        'peak_bytes': peak
+    }
+
+
+def _repeat_template(template, lines):
+    """
+    Internal function that repeats given template until reaching the given number of lines
+    :param template: str
+    :param lines: int
+    :return: str
+    """
+
+    result = list()
+    i = 0
+    while len(result) < lines:
+        result.extend(template.format(name='Item{}'.format(i)).split('\n'))
+        i += 1
+
+    return '\n'.join(result[:lines])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark Script Editor syntax highlighter')
+    parser.add_argument('--engines', nargs='+', default=['regex', 'tokenize'], help='Highlighting engines to run')
+    parser.add_argument('--files', nargs='*', default=list(), help='Extra Python files to add to the corpus')
+    parser.add_argument('--no-qt', action='store_true', help='Only benchmark lexers, without Qt')
+    parser.add_argument('--output', help='Path of the JSON file where results are stored')
+    parser.add_argument('--compare', help='Path of a previous JSON results file to compare with')
+    args = parser.parse_args()
+
+    benchmark_results = run(args.engines, use_qt=not args.no_qt, files=args.files)
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(benchmark_results, fh, indent=4)
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(benchmark_results, json.load(fh))
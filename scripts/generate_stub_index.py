@@ -0,0 +1,197 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Generates the stub index used by tpDcc-tools-scripteditor to complete DCC modules
+
+Must be executed with the Python interpreter of the DCC (mayapy, hython, etc), once per DCC version. Dumps names,
+signatures and docs of the members of the given modules (and the flags of maya.cmds commands):
+
+    mayapy scripts/generate_stub_index.py --output ~/tpDcc-tools-scripteditor/stubs
+
+If --output is a folder, index is stored with the name of the DCC version (maya_2022.stubs), which is the name the
+script editor looks for by default.
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import os
+import re
+import sys
+import inspect
+import argparse
+import importlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tpDcc.tools.scripteditor.core import stubindex
+
+DCC_MODULES = {
+    'maya': ['maya.cmds', 'maya.mel', 'maya.api.OpenMaya', 'maya.api.OpenMayaAnim', 'pymel.core'],
+    'houdini': ['hou']
+}
+
+# Matches flags listed by maya.cmds.help: -shortName -longName Type
+MAYA_FLAG_REGEX = re.compile(r'^\s*-(\w+)\s+-(\w+)\s*(.*?)\s*$')
+
+
+def initialize_dcc():
+    """
+    Initializes the DCC standalone session, if necessary
+    :return: str or None, name of the DCC
+    """
+
+    try:
+        import maya.standalone
+        maya.standalone.initialize()
+        return 'maya'
+    except ImportError:
+        pass
+    except RuntimeError:
+        # Already initialized (executed inside Maya)
+        return 'maya'
+
+    try:
+        importlib.import_module('hou')
+        return 'houdini'
+    except ImportError:
+        return None
+
+
+def get_kind(value):
+    """
+    Returns stub kind of the given value
+    :param value: object
+    :return: str
+    """
+
+    if inspect.ismodule(value):
+        return stubindex.StubKinds.MODULE
+    elif inspect.isclass(value):
+        return stubindex.StubKinds.CLASS
+    elif callable(value):
+        return stubindex.StubKinds.FUNCTION
+
+    return stubindex.StubKinds.INSTANCE
+
+
+def get_signature(name, value):
+    """
+    Returns signature of the given callable
+    :param name: str
+    :param value: object
+    :return: str
+    """
+
+    if not callable(value):
+        return ''
+
+    try:
+        # inspect.signature is not available in Python 2 DCCs
+        return '{}{}'.format(name, inspect.signature(value))
+    except Exception:
+        doc = inspect.getdoc(value) or ''
+        first_line = doc.split('\n')[0].strip()
+        return first_line if first_line.startswith(name + '(') else ''
+
+
+def get_maya_command_records(cmds, module_name, name):
+    """
+    Returns records of the given Maya command and its flags, parsed from maya.cmds.help
+    :param cmds: module
+    :param module_name: str
+    :param name: str
+    :return: list(tuple(str, str, str, str))
+    """
+
+    try:
+        help_text = cmds.help(name) or ''
+    except Exception:
+        help_text = ''
+
+    synopsis = ''
+    records = list()
+    for line in help_text.splitlines():
+        if line.startswith('Synopsis:'):
+            synopsis = line[len('Synopsis:'):].strip()
+            continue
+        match = MAYA_FLAG_REGEX.match(line)
+        if match:
+            short_name, long_name, flag_type = match.groups()
+            records.append((
+                stubindex.get_flag_key(module_name, name, long_name), stubindex.StubKinds.FLAG,
+                '{} | {}'.format(short_name, flag_type) if flag_type else short_name, ''))
+    records.append((
+        stubindex.get_member_key(module_name, name), stubindex.StubKinds.FUNCTION, synopsis, help_text))
+
+    return records
+
+
+def get_module_records(module_name):
+    """
+    Returns records of all the members of the given module
+    :param module_name: str
+    :return: list(tuple(str, str, str, str))
+    """
+
+    module = importlib.import_module(module_name)
+    records = list()
+    for name in dir(module):
+        if name.startswith('__'):
+            continue
+        try:
+            value = getattr(module, name)
+        except Exception:
+            continue
+        if module_name == 'maya.cmds' and callable(value):
+            records.extend(get_maya_command_records(module, module_name, name))
+            continue
+        kind = get_kind(value)
+        doc = inspect.getdoc(value) or '' if kind != stubindex.StubKinds.INSTANCE else ''
+        records.append((stubindex.get_member_key(module_name, name), kind, get_signature(name, value), doc))
+
+    return records
+
+
+def generate(module_names, output_path, dcc_name=None):
+    """
+    Generates stub index of the given modules
+    :param module_names: list(str)
+    :param output_path: str, index file path or folder where index is stored with DCC version name
+    :param dcc_name: str or None
+    :return: str, path of the generated index
+    """
+
+    stub_name = stubindex.get_dcc_stub_name() or dcc_name or 'python'
+    if os.path.isdir(output_path) or not os.path.splitext(output_path)[-1]:
+        output_path = os.path.join(output_path, '{}.stubs'.format(stub_name))
+
+    records = list()
+    modules = list()
+    for module_name in module_names:
+        try:
+            records.extend(get_module_records(module_name))
+            modules.append(module_name)
+        except Exception as exc:
+            print('Skipping module {}: {}'.format(module_name, exc))
+
+    stubindex.write_stub_index(output_path, records, metadata={
+        'name': stub_name, 'modules': modules, 'python': sys.version.split()[0]})
+    print('Stub index with {} records written: {}'.format(len(records), output_path))
+
+    return output_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate Script Editor stub index of DCC modules')
+    parser.add_argument('--modules', nargs='*', help='Modules to dump (by default, the modules of the current DCC)')
+    parser.add_argument('--output', default=os.getcwd(), help='Index file path or folder where index is stored')
+    args = parser.parse_args()
+
+    current_dcc = initialize_dcc()
+    generate(args.modules or DCC_MODULES.get(current_dcc, list()), args.output, dcc_name=current_dcc)
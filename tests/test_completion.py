@@ -0,0 +1,301 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-tools-scripteditor completion service
+"""
+
+import gc
+import sys
+import time
+import threading
+
+import jedi
+
+from tpDcc.tools.scripteditor.core import completion, records, diagnostics
+
+
+def test_complete_returns_jedi_completions():
+    names = [c.name for c in completion.complete('import os\nos.pa', 2, 5)]
+    assert 'path' in names
+
+
+def test_completion_worker_only_computes_latest_request():
+    started = threading.Event()
+    release = threading.Event()
+    done = threading.Event()
+    results = list()
+
+    def _slow_complete(text, line, column):
+        started.set()
+        release.wait(5)
+        return [text]
+
+    def _on_finished(revision, completions):
+        results.append((revision, completions, threading.current_thread()))
+        if revision == 3:
+            done.set()
+
+    completion_worker = completion.CompletionWorker()
+    completion_worker.submit(completion.CompletionRequest(1, 1, 'a', 1, 1, _on_finished, _slow_complete))
+    assert started.wait(5)
+    completion_worker.submit(completion.CompletionRequest(1, 2, 'ab', 1, 2, _on_finished, _slow_complete))
+    completion_worker.submit(completion.CompletionRequest(1, 3, 'abc', 1, 3, _on_finished, _slow_complete))
+    release.set()
+    assert done.wait(5)
+
+    assert [(revision, completions) for revision, completions, _ in results] == [(3, ['abc'])]
+    assert results[0][2] is not threading.current_thread()
+
+
+def test_jedi_session_reuses_script_of_same_revision():
+    jedi_session = completion.JediSession()
+    text = 'import os\nos.pa'
+    script = jedi_session.get_script(text, revision=1)
+    assert jedi_session.get_script(text, revision=1) is script
+    assert 'path' in [c.name for c in jedi_session.complete(text, 2, 5, revision=1)]
+
+    new_script = jedi_session.get_script(text + 'th.jo', revision=2)
+    assert new_script is not script
+    assert str(new_script.path) == jedi_session.path
+    assert 'join' in [c.name for c in jedi_session.complete(text + 'th.jo', 2, 10, revision=2)]
+
+
+def test_namespace_snapshot_version_only_changes_with_names_or_types():
+    namespace = {'value': 1}
+    snapshot = completion.NamespaceSnapshot(namespace)
+    previous = snapshot.namespace
+    assert snapshot.version == 1
+
+    namespace['value'] = 2
+    assert not snapshot.update(namespace)
+    assert snapshot.version == 1
+    assert snapshot.namespace['value'] == 2 and previous['value'] == 1
+
+    namespace['value'] = 'two'
+    assert snapshot.update(namespace)
+    assert snapshot.version == 2
+
+
+def test_jedi_session_completes_interpreter_objects():
+    class Rig(object):
+        def build_rig(self):
+            pass
+
+    snapshot = completion.NamespaceSnapshot({'rig': Rig()})
+    names = [c.name for c in completion.JediSession().complete(
+        'rig.bui', 1, 7, revision=1, namespace=snapshot.namespace, namespace_version=snapshot.version)]
+    assert names == ['build_rig']
+
+
+def test_completion_session_narrows_completions_of_same_identifier():
+    completions = completion.complete('import os\nos.', 2, 3)
+    session = completion.CompletionSession(1, 13, '', completions)
+
+    assert session.is_valid(1, 13, 'pa')
+    assert not session.is_valid(1, 16, 'pa')
+    assert not session.is_valid(2, 13, 'pa')
+
+    names = [c.name for c in session.filter('pa')]
+    assert names[:2] == ['path', 'pardir'] and 'getcwd' not in names
+    assert [c.name for c in session.filter('pat')][0] == 'path'
+    assert [c.name for c in session.filter('')] == [c.name for c in completions]
+
+    anchored_session = completion.CompletionSession(1, 13, 'pa', session.filter('pa'))
+    assert not anchored_session.is_valid(1, 13, 'p')
+
+
+def test_auto_import_preamble_is_only_resolved_when_code_changes():
+    preamble = completion.AutoImportPreamble('import os.path\nimport json as js\nfrom collections import OrderedDict')
+    assert not preamble.is_resolved() and not preamble.namespace
+    assert preamble.source == 'import os.path\nimport json as js\nfrom collections import OrderedDict\n'
+    namespace = preamble.resolve()
+    assert sorted(namespace) == ['OrderedDict', 'js', 'os']
+    assert preamble.version == 1
+
+    assert not preamble.update('import os.path\nimport json as js\nfrom collections import OrderedDict')
+    assert preamble.resolve() is namespace
+    assert preamble.update('import not_existing_module\nvalue = 1\nimport os')
+    assert not preamble.is_resolved()
+    assert list(preamble.resolve()) == ['os'] and preamble.version == 2
+
+    jedi_session = completion.JediSession()
+    names = [c.name for c in jedi_session.complete('os.pa', 1, 5, revision=1, preamble=preamble)]
+    assert 'path' in names
+
+
+def test_auto_import_preamble_only_imports_modules_on_request():
+    sys.modules.pop('colorsys', None)
+    preamble = completion.AutoImportPreamble('import colorsys\nimport os')
+    assert list(preamble.resolve()) == ['os'] and 'colorsys' not in sys.modules
+
+    assert preamble.import_modules()
+    assert not preamble.is_resolved() and preamble.version == 2
+    assert sorted(preamble.resolve()) == ['colorsys', 'os']
+    assert not preamble.import_modules()
+
+
+def test_static_completions_complete_auto_import_names_without_changing_document():
+    preamble = completion.AutoImportPreamble('import json as js\nvalue = 1')
+    jedi_session = completion.JediSession()
+    script = jedi_session.get_script('js.lo', revision=1, preamble=preamble)
+    assert isinstance(script, jedi.Interpreter) and preamble.is_resolved()
+    assert [c.name for c in jedi_session.complete('js.lo', 1, 5, revision=1, preamble=preamble)] == [
+        'load', 'loads']
+    signatures = jedi_session.get_signatures('js.loads(', 1, 9, revision=2, preamble=preamble, load_doc=False)
+    assert signatures[0].name == 'loads'
+
+
+def test_diagnostics_records_stage_histograms_and_logs_slow_requests(caplog):
+    diagnostics_ = diagnostics.Diagnostics(slow_threshold=0)
+    with diagnostics_.timer(diagnostics.CompletionStages.CONTEXT):
+        pass
+
+    trace = diagnostics_.start_trace('script.py')
+    trace.add(diagnostics.CompletionStages.JEDI, 30.0)
+    trace.add(diagnostics.CompletionStages.JEDI, 10.0)
+    with caplog.at_level('WARNING', logger='tpDcc-tools-scripteditor'):
+        trace.finish()
+        trace.finish()
+
+    stats = diagnostics_.get_stats()
+    assert list(stats) == ['context', 'jedi', 'total']
+    assert stats['jedi']['count'] == 1 and stats['jedi']['max'] == 40.0
+    assert stats['jedi']['buckets']['<=50'] == 1
+    assert stats['total']['count'] == 1
+    assert 'script.py' in caplog.text and 'jedi: 40.0 ms' in caplog.text
+
+    diagnostics_.reset()
+    assert not diagnostics_.get_stats()
+
+
+def test_request_trace_total_does_not_include_debounce():
+    diagnostics_ = diagnostics.Diagnostics()
+    trace = diagnostics_.start_trace()
+    start = diagnostics.clock()
+    time.sleep(0.2)
+    debounce = (diagnostics.clock() - start) * 1000.0
+    trace.add(diagnostics.CompletionStages.DEBOUNCE, debounce)
+    total = trace.finish()
+
+    stats = diagnostics_.get_stats()
+    assert debounce >= 200.0 and total < 100.0
+    assert stats['debounce']['max'] == debounce
+    assert stats['total']['max'] == total
+
+
+def test_completion_worker_times_jedi_stage_of_request_trace():
+    done = threading.Event()
+    diagnostics_ = diagnostics.Diagnostics()
+    trace = diagnostics_.start_trace()
+
+    completion_worker = completion.CompletionWorker()
+    completion_worker.submit(completion.CompletionRequest(
+        1, 1, 'import os\nos.pa', 2, 5, lambda *args: done.set(), prefix='pa', trace=trace))
+    assert done.wait(5)
+
+    assert list(trace.stages) == ['jedi', 'rank']
+
+
+def test_completion_worker_does_not_time_untraced_requests():
+    done = threading.Event()
+    diagnostics.get_diagnostics().reset()
+
+    completion_worker = completion.CompletionWorker()
+    completion_worker.submit(completion.CompletionRequest(
+        1, 1, 'import os\nos.pa', 2, 5, lambda *args: done.set(), prefix='pa'))
+    assert done.wait(5)
+
+    assert not diagnostics.get_stats()
+
+
+def test_get_imported_modules_of_invalid_code():
+    text = 'import os, sys as system\nfrom maya import cmds\n    import pymel.core as pm\nfrom . import x\nif ('
+    assert completion.get_imported_modules(text) == ['os', 'sys', 'maya', 'maya.cmds', 'pymel.core']
+
+
+def test_jedi_warm_up_waits_for_user_activity_and_does_not_delay_requests():
+    started = threading.Event()
+    release = threading.Event()
+    requested = threading.Event()
+    order = list()
+
+    def _preload(module_name):
+        order.append(module_name)
+        started.set()
+        release.wait(5)
+
+    completion_worker = completion.CompletionWorker()
+    completion_worker.notify_activity()
+    warm_up = completion.JediWarmUp(worker=completion_worker, preload_fn=_preload)
+    warm_up.IDLE_TIME = 0.2
+    warm_up.start(['os'])
+    completion_worker.submit(completion.CompletionRequest(
+        1, 1, 'a', 1, 1, lambda *args: order.append('request'), lambda *args: list()))
+    assert started.wait(5)
+    assert order == ['request', 'os']
+
+    # Requests submitted while a module is preloaded are computed without waiting for it
+    completion_worker.submit(completion.CompletionRequest(
+        1, 2, 'a', 1, 1, lambda *args: requested.set(), lambda *args: list()))
+    assert requested.wait(5)
+    assert not warm_up.is_preloaded('os')
+    release.set()
+
+
+def test_jedi_warm_up_preloads_each_module_once():
+    done = threading.Event()
+    preloaded = list()
+
+    def _preload(module_name):
+        preloaded.append(module_name)
+        if module_name == 'json':
+            done.set()
+
+    warm_up = completion.JediWarmUp(worker=completion.CompletionWorker(), preload_fn=_preload)
+    warm_up.IDLE_TIME = 0
+    warm_up.start(['os', 'not_existing_module'])
+    warm_up.start(['os', 'json'])
+    assert done.wait(5)
+
+    assert preloaded == ['os', 'not_existing_module', 'json']
+    assert warm_up.is_preloaded('os')
+    completion.preload_module('json')
+
+
+def test_get_import_aliases_of_invalid_code():
+    text = 'import maya.cmds as cmds\nimport pymel.core\nfrom maya import mel, OpenMaya as om\nfrom . import x\nif ('
+    assert completion.get_import_aliases(text) == {
+        'cmds': 'maya.cmds', 'pymel': 'pymel', 'mel': 'maya.mel', 'om': 'maya.OpenMaya'}
+
+
+def test_get_call_expression_of_innermost_open_call():
+    assert completion.get_call_expression('cmds.polyCube(') == 'cmds.polyCube'
+    assert completion.get_call_expression('x = cmds.polyCube("a(", w=(1, 2), ') == 'cmds.polyCube'
+    assert completion.get_call_expression('pm.ls(sl=True)') is None
+    assert completion.get_call_expression('x = [1, ') is None
+
+
+def test_jedi_session_signatures_load_doc_lazily():
+    jedi_session = completion.JediSession()
+    signatures = jedi_session.get_signatures('import json\njson.dumps(1, ', 2, 14, revision=1)
+    assert signatures[0].name == 'dumps' and signatures[0].index == 1
+    assert signatures[0].label.startswith('dumps(obj')
+    assert not signatures[0].is_doc_loaded()
+    assert 'JSON' in signatures[0].load_doc() and signatures[0].is_doc_loaded()
+
+    signatures = jedi_session.get_signatures('import json\njson.dumps(1, ', 2, 14, revision=1, load_doc=True)
+    assert signatures[0].is_doc_loaded()
+
+    signature = completion.CallSignature('polyCube', label='polyCube [flags]', doc_fn=lambda: 'Creates a cube')
+    assert signature.label == 'polyCube [flags]' and signature.load_doc() == 'Creates a cube'
+
+
+def test_completions_are_converted_into_records_without_jedi_objects():
+    completions = completion.JediSession().complete('import os\nos.path.jo', 2, 10, revision=1)
+    record = [c for c in completions if c.name == 'join'][0]
+    assert isinstance(record, records.CompletionRecord)
+    assert (record.name, record.complete, record.kind, record.end_char) == ('join', 'in', 'function', False)
+    assert not hasattr(record, '__dict__')
+    assert not [x for x in gc.get_referents(record) if type(x).__module__.startswith('jedi')]
+    assert 'Join two or more' in record.doc
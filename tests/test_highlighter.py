@@ -0,0 +1,52 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-tools-scripteditor Python syntax highlighter
+"""
+
+import pytest
+
+QtGui = pytest.importorskip('Qt.QtGui')
+
+from tpDcc.tools.scripteditor.syntax import python
+
+
+@pytest.fixture(scope='module')
+def application():
+    return QtGui.QGuiApplication.instance() or QtGui.QGuiApplication([])
+
+
+def _highlight_pending_blocks(highlighter):
+    highlighter._chunk_timer.stop()
+    for _ in range(100):
+        highlighter._on_highlight_chunk()
+        if not highlighter._chunk_timer.isActive():
+            break
+        highlighter._chunk_timer.stop()
+
+
+def _pending_blocks(document):
+    pending = list()
+    block = document.begin()
+    while block.isValid():
+        if block.userState() == python.PythonHiglighter.PENDING_STATE:
+            pending.append(block.blockNumber())
+        block = block.next()
+
+    return pending
+
+
+def test_lazy_highlighter_highlights_pasted_blocks(application):
+    document = QtGui.QTextDocument()
+    highlighter = python.PythonHiglighter(document, lazy=True)
+    application.processEvents()
+    highlighter.set_visible_blocks(0, 0)
+    _highlight_pending_blocks(highlighter)
+
+    QtGui.QTextCursor(document).insertText('\n'.join('value_{} = {}'.format(i, i) for i in range(20)))
+    assert _pending_blocks(document)
+
+    _highlight_pending_blocks(highlighter)
+    assert document.blockCount() == 20
+    assert not _pending_blocks(document)
@@ -0,0 +1,175 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-tools-scripteditor completion indexes
+"""
+
+import time
+
+from tpDcc.tools.scripteditor.core import index, nodetypes, scenenodes, stubindex
+
+NODE_TYPES = ['transform', 'joint', 'Transform', 'mesh', 'jointFfd', 'nurbsCurve', 'polyCube', 'polyCylinder']
+
+
+def test_prefix_index_returns_sorted_case_insensitive_matches():
+    prefix_index = index.PrefixIndex(NODE_TYPES)
+    assert prefix_index.search('POLY') == ['polyCube', 'polyCylinder']
+    assert prefix_index.search('tr') == ['Transform', 'transform']
+    assert prefix_index.search('joint') == ['joint', 'jointFfd']
+    assert prefix_index.search('x') == list()
+    assert prefix_index.search('') == sorted(NODE_TYPES, key=lambda x: (x.lower(), x))
+    assert prefix_index.search('p', limit=1) == ['polyCube']
+
+
+def test_prefix_index_narrows_previous_query():
+    prefix_index = index.PrefixIndex(NODE_TYPES)
+    assert prefix_index.search('po') == ['polyCube', 'polyCylinder']
+    assert prefix_index.search('polyc') == ['polyCube', 'polyCylinder']
+    assert prefix_index.search('polycy') == ['polyCylinder']
+    assert prefix_index.search('m') == ['mesh']
+
+
+def test_prefix_index_incremental_updates():
+    prefix_index = index.PrefixIndex(NODE_TYPES)
+    assert prefix_index.search('poly') == ['polyCube', 'polyCylinder']
+    prefix_index.add('polyCone')
+    assert prefix_index.search('polyc') == ['polyCone', 'polyCube', 'polyCylinder']
+    assert prefix_index.remove('polyCube')
+    assert not prefix_index.remove('polyCube')
+    assert 'polyCube' not in prefix_index and 'polyCone' in prefix_index
+    assert prefix_index.search('polyc') == ['polyCone', 'polyCylinder']
+
+
+def test_node_type_catalogue_loads_lazily_and_uses_disk_cache(tmp_path):
+    queries = list()
+    setup = {'key': '2022|mtoa'}
+
+    def _query():
+        queries.append(setup['key'])
+        return NODE_TYPES
+
+    cache_path = str(tmp_path / 'node_types.json')
+    catalogue = nodetypes.NodeTypeCatalogue(cache_path, key_fn=lambda: setup['key'], query_fn=_query)
+    assert not catalogue.is_loaded() and not queries
+    assert catalogue.search('poly') == ['polyCube', 'polyCylinder']
+    assert queries == ['2022|mtoa']
+
+    # Next sessions with the same DCC version and plugins read node types from disk
+    other_catalogue = nodetypes.NodeTypeCatalogue(cache_path, key_fn=lambda: setup['key'], query_fn=_query)
+    assert other_catalogue.search('poly') == ['polyCube', 'polyCylinder']
+    assert queries == ['2022|mtoa']
+
+    setup['key'] = '2022|mtoa,bifrost'
+    other_catalogue.invalidate()
+    other_catalogue.search('poly')
+    assert queries == ['2022|mtoa', '2022|mtoa,bifrost']
+
+
+def test_node_type_catalogue_is_invalidated_by_plugin_callbacks():
+    setup = {'key': '2022', 'node_types': NODE_TYPES}
+    installed = list()
+
+    class _PluginCallbacks(object):
+        def __init__(self, catalogue):
+            self.catalogue = catalogue
+
+        def install(self):
+            installed.append(self)
+            return True
+
+    catalogue = nodetypes.NodeTypeCatalogue(
+        key_fn=lambda: setup['key'], query_fn=lambda: setup['node_types'], callbacks_class=_PluginCallbacks)
+    assert catalogue.search('aiS') == list()
+    assert len(installed) == 1
+
+    setup['key'] = '2022|mtoa'
+    setup['node_types'] = NODE_TYPES + ['aiStandardSurface']
+    installed[0].catalogue.invalidate()
+    assert catalogue.search('aiS') == ['aiStandardSurface']
+    assert len(installed) == 1
+
+
+def test_node_type_catalogue_ranks_candidates_found_by_prefix_index():
+    node_types = NODE_TYPES + ['pointConstraint', 'parentConstraint', 'spaceLocator', 'locator']
+    catalogue = nodetypes.NodeTypeCatalogue(key_fn=lambda: None, query_fn=lambda: node_types, callbacks_class=None)
+    assert catalogue.rank('pc') == ['polyCube', 'polyCylinder', 'pointConstraint', 'parentConstraint']
+    assert catalogue.rank('Loc') == ['locator', 'spaceLocator']
+    assert catalogue.rank('jn') == ['joint', 'jointFfd']
+    assert catalogue.rank('', limit=2) == ['joint', 'jointFfd']
+    names = list(catalogue.get_index())
+    assert [names[i] for i in catalogue.get_index().find_indexes('LOC')] == ['locator', 'spaceLocator']
+
+
+def test_scene_node_index_applies_queued_changes():
+    scene = ['pCube1', 'pCubeShape1', 'persp', 'L_arm_CTRL']
+    queries = list()
+
+    def _list_nodes():
+        queries.append(True)
+        return scene
+
+    scene_index = scenenodes.SceneNodeIndex(list_fn=_list_nodes, callbacks_class=None)
+    assert scene_index.search('cube') == ['pCube1', 'pCubeShape1']
+    assert scene_index.search('ctrl') == ['L_arm_CTRL']
+
+    scene_index.add_node('cube_CTRL')
+    scene_index.rename_node('pCube1', 'box1')
+    scene_index.remove_node('persp')
+    assert scene_index.search('cube') == ['cube_CTRL', 'pCubeShape1']
+    assert scene_index.search('ctrl', limit=1) == ['cube_CTRL']
+    assert 'persp' not in scene_index.search('p')
+    assert len(queries) == 1
+
+
+def test_scene_node_index_tracks_nodes_sharing_short_name():
+    scene_index = scenenodes.SceneNodeIndex(list_fn=lambda: ['pCube1', 'pCube1', 'persp'], callbacks_class=None)
+    assert scene_index.search('pcube') == ['pCube1']
+
+    scene_index.remove_node('pCube1')
+    assert scene_index.search('pcube') == ['pCube1']
+    scene_index.remove_node('pCube1')
+    scene_index.remove_node('not_indexed')
+    assert scene_index.search('pcube') == list()
+    assert scenenodes.get_short_name('group1|pCube1') == 'pCube1'
+
+
+def test_prefix_index_substring_search_is_fast_on_big_scenes():
+    prefix_index = index.PrefixIndex('node_{}_GEO'.format(i) for i in range(200000))
+    prefix_index.find('warm')
+    start = time.time()
+    assert prefix_index.find('_199999_') == ['node_199999_GEO']
+    assert len(prefix_index.find('geo', limit=100)) == 100
+    assert time.time() - start < 0.1
+
+
+def test_stub_index_finds_module_members_and_flags(tmp_path):
+    records = [
+        (stubindex.get_member_key('maya.cmds', 'polyCube'), 'function', 'polyCube [flags]', 'Creates a cube'),
+        (stubindex.get_member_key('maya.cmds', 'polyCylinder'), 'function', '', ''),
+        (stubindex.get_member_key('maya.cmds', 'ls'), 'function', '', u'Lists nodes é'),
+        (stubindex.get_flag_key('maya.cmds', 'polyCube', 'width'), 'flag', 'w | Length', ''),
+        (stubindex.get_flag_key('maya.cmds', 'polyCube', 'height'), 'flag', 'h | Length', ''),
+        (stubindex.get_flag_key('maya.cmds', 'polyCylinder', 'radius'), 'flag', 'r | Length', ''),
+        (stubindex.get_member_key('maya.cmds.sub', 'other'), 'function', '', ''),
+        (stubindex.get_member_key('maya', 'cmds'), 'module', '', '')
+    ]
+    stub_path = str(tmp_path / 'maya_2022.stubs')
+    stubindex.write_stub_index(stub_path, records, metadata={'name': 'maya_2022'})
+
+    stub_index = stubindex.StubIndex(stub_path)
+    assert stub_index.has_module('maya.cmds') and stub_index.has_module('maya')
+    assert not stub_index.has_module('maya.mel')
+    assert stub_index.metadata == {'name': 'maya_2022'} and len(stub_index) == len(records)
+
+    assert [x.name for x in stub_index.get_members('maya.cmds')] == ['ls', 'polyCube', 'polyCylinder']
+    assert [x.name for x in stub_index.get_flags('maya.cmds', 'polyCube')] == ['height', 'width']
+    cube = stub_index.complete('maya.cmds', 'pc')[0]
+    assert (cube.name, cube.kind, cube.signature) == ('polyCube', 'function', 'polyCube [flags]')
+    assert cube.doc == 'Creates a cube'
+    assert stub_index.complete('maya.cmds', 'ls')[0].doc == u'Lists nodes é'
+    assert stub_index.get_member('maya.cmds', 'polyCube').signature == 'polyCube [flags]'
+    assert stub_index.get_member('maya.cmds', 'polyCub') is None
+
+    stub_index.set_path(str(tmp_path / 'missing.stubs'))
+    assert not stub_index.open() and not stub_index.has_module('maya.cmds')
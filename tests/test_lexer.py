@@ -0,0 +1,162 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-tools-scripteditor Python lexer
+"""
+
+import threading
+
+import pytest
+
+from tpDcc.tools.scripteditor.syntax import lexer, tokenizer, cache, worker
+
+SYNTAX = {
+    'operators': ['=', '!=', '<', '>', '+', '\\-', '*', '/', '%', '^', '|', '&'],
+    'keywords': ['import', 'for', 'in', 'print', 'None'],
+    'definition': ['class', 'def', 'lambda'],
+    'boolean': ['True', 'False'],
+    'extras': ['len', 'range'],
+    'braces': ['\\{', '\\}', '\\(', '\\)', '\\[', '\\]']
+}
+
+
+@pytest.fixture
+def python_lexer():
+    return lexer.PythonLexer(SYNTAX)
+
+
+def _tokens(text, ranges):
+    return [(text[start:start + length], key) for start, length, key in ranges]
+
+
+def test_single_pass_classification(python_lexer):
+    text = 'def foo(a=1): print(len(a), True)  # done'
+    ranges, state = python_lexer.lex(text)
+    assert state == lexer.STATE_NONE
+    assert _tokens(text, ranges) == [
+        ('def', 'definition'), ('foo', 'methods'), ('(', 'brace'), ('=', 'operator'), ('1', 'digits'),
+        (')', 'brace'), ('print', 'methods'), ('(', 'brace'), ('len', 'extra'), ('(', 'brace'), (')', 'brace'),
+        ('True', 'boolean'), (')', 'brace'), ('# done', 'comment')]
+
+
+def test_strings_hide_comments(python_lexer):
+    text = 'x = "a # b" + r\'c\'  # real'
+    ranges, _ = python_lexer.lex(text)
+    assert _tokens(text, ranges) == [
+        ('=', 'operator'), ('"a # b"', 'string'), ('+', 'operator'), ("r'c'", 'string'), ('# real', 'comment')]
+
+
+def test_triple_quoted_strings_span_blocks(python_lexer):
+    ranges, state = python_lexer.lex('x = """doc')
+    assert state == lexer.STATE_TRIPLE_DOUBLE
+    assert ranges[-1] == (4, 6, 'docstring')
+
+    ranges, state = python_lexer.lex("still ''' inside", state)
+    assert state == lexer.STATE_TRIPLE_DOUBLE
+    assert ranges == [(0, 16, 'docstring')]
+
+    text = 'end""" + 1'
+    ranges, state = python_lexer.lex(text, state)
+    assert state == lexer.STATE_NONE
+    assert _tokens(text, ranges) == [('end"""', 'docstring'), ('+', 'operator'), ('1', 'digits')]
+
+
+def test_block_states_are_distinct_per_quote_kind(python_lexer):
+    _, single_state = python_lexer.lex("x = '''doc")
+    _, double_state = python_lexer.lex('x = """doc')
+    _, continued_state = python_lexer.lex('x = "abc\\')
+    assert lexer.split_state(single_state) == (lexer.STATE_TRIPLE_SINGLE, 0)
+    assert lexer.split_state(double_state) == (lexer.STATE_TRIPLE_DOUBLE, 0)
+    assert lexer.split_state(continued_state) == (lexer.STATE_DOUBLE, 0)
+
+    text = 'def" + 1'
+    ranges, state = python_lexer.lex(text, continued_state)
+    assert state == lexer.STATE_NONE
+    assert _tokens(text, ranges)[0] == ('def"', 'string')
+
+
+def test_regex_engine_state_ignores_brackets(python_lexer):
+    _, state = python_lexer.lex('foo(a, [1,')
+    assert state == lexer.STATE_NONE
+    _, state = python_lexer.lex('x = ("""doc', state)
+    assert state == lexer.STATE_TRIPLE_DOUBLE
+
+
+def test_bracket_continuation_state():
+    tokenize_lexer = tokenizer.TokenizeLexer(SYNTAX)
+    _, state = tokenize_lexer.lex('foo(a, [1,')
+    assert lexer.split_state(state) == (lexer.STATE_NONE, 2)
+    _, state = tokenize_lexer.lex('     2])', state)
+    assert state == lexer.STATE_NONE
+
+    # Unclosed brackets do not leak into the next top level statement
+    _, state = tokenize_lexer.lex('foo(', state)
+    _, state = tokenize_lexer.lex('def bar():', state)
+    assert state == lexer.STATE_NONE
+
+
+def test_editing_inside_docstring_keeps_block_state(python_lexer):
+    _, state = python_lexer.lex('"""', lexer.STATE_NONE)
+    _, before = python_lexer.lex('some docs', state)
+    _, after = python_lexer.lex('some edited docs (', state)
+    assert before == after == state
+
+
+@pytest.mark.parametrize('text, state', [
+    ('def foo(a=1): print(len(a), True)  # done', lexer.STATE_NONE),
+    ('x = """doc', lexer.STATE_NONE),
+    ('end""" + 1', lexer.STATE_TRIPLE_DOUBLE),
+    ('def" + 1', lexer.STATE_DOUBLE),
+    ('foo(a, [1,', lexer.STATE_NONE),
+    ('     2])', lexer.make_state(bracket_depth=2))
+])
+def test_tokenize_engine_matches_regex_engine(python_lexer, text, state):
+    ranges, end_state = python_lexer.lex(text, state)
+    tokenize_ranges, tokenize_state = tokenizer.TokenizeLexer(SYNTAX).lex(text, state)
+    assert tokenize_ranges == tuple(ranges)
+    assert lexer.split_state(tokenize_state)[0] == end_state
+
+
+def test_tokenize_engine_lexes_python_literals():
+    tokenize_lexer = tokenizer.TokenizeLexer(SYNTAX)
+    text = 'x = 0x1F + 1.5e3 + b"raw"'
+    ranges, _ = tokenize_lexer.lex(text)
+    assert _tokens(text, ranges) == [
+        ('=', 'operator'), ('0x1F', 'digits'), ('+', 'operator'), ('1.5e3', 'digits'), ('+', 'operator'),
+        ('b"raw"', 'string')]
+
+
+def test_highlight_cache_reuses_blocks_and_evicts_least_recently_used(python_lexer):
+    highlight_cache = cache.HighlightCache(max_size=2)
+    first = highlight_cache.lex(python_lexer, 'import os', lexer.STATE_NONE)
+    assert highlight_cache.lex(python_lexer, 'import os', lexer.STATE_NONE) is first
+    assert (highlight_cache.hits, highlight_cache.misses) == (1, 1)
+
+    highlight_cache.lex(python_lexer, 'import sys', lexer.STATE_NONE)
+    highlight_cache.lex(python_lexer, 'import os', lexer.STATE_NONE)
+    highlight_cache.lex(python_lexer, 'import re', lexer.STATE_NONE)
+    assert len(highlight_cache) == 2
+    stats = highlight_cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 3)
+    highlight_cache.lex(python_lexer, 'import os', lexer.STATE_NONE)
+    assert highlight_cache.hits == 3
+
+
+def test_highlight_worker_computes_blocks_outside_caller_thread(python_lexer):
+    done = threading.Event()
+    results = dict()
+
+    def _on_finished(revision, first_block, blocks):
+        results.update(revision=revision, first_block=first_block, blocks=blocks, thread=threading.current_thread())
+        done.set()
+
+    texts = ['x = """doc', 'inside', '"""', 'y = 1']
+    highlight_worker = worker.HighlightWorker()
+    highlight_worker.submit(worker.HighlightJob(1, 7, python_lexer, texts, lexer.STATE_NONE, _on_finished, 3))
+    assert done.wait(5)
+    assert (results['revision'], results['first_block']) == (7, 3)
+    assert results['thread'] is not threading.current_thread()
+    assert results['blocks'] == worker.compute_blocks(python_lexer, texts)
+    assert [state for _, _, state in results['blocks']] == [
+        lexer.STATE_TRIPLE_DOUBLE, lexer.STATE_TRIPLE_DOUBLE, lexer.STATE_NONE, lexer.STATE_NONE]
@@ -0,0 +1,58 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-tools-scripteditor completion ranking
+"""
+
+import random
+
+import pytest
+
+from tpDcc.tools.scripteditor.core import ranking
+
+NAMES = [
+    'polyCube', 'polyCylinder', 'pointConstraint', 'parentConstraint', '_private_pc', 'PolyCube', 'createNode', 'pc',
+    'spaceLocator', 'poleVectorConstraint']
+
+
+def test_rank_orders_by_kind_of_match():
+    assert ranking.rank(NAMES, 'pc') == [
+        'pc', 'polyCube', 'PolyCube', 'polyCylinder', 'pointConstraint', 'parentConstraint', 'poleVectorConstraint',
+        'spaceLocator', '_private_pc']
+    assert ranking.rank(NAMES, 'Poly') == ['PolyCube', 'polyCube', 'polyCylinder']
+    assert ranking.rank(NAMES, 'pvc') == ['poleVectorConstraint', '_private_pc']
+    assert ranking.rank(NAMES, '_pri') == ['_private_pc']
+    assert ranking.rank(NAMES, 'xyz') == list()
+    assert ranking.rank(NAMES, '', limit=2) == NAMES[:2]
+
+
+def test_rank_returns_top_k_items_with_key():
+    class Completion(object):
+        def __init__(self, name):
+            self.name = name
+
+    completions = [Completion(name) for name in NAMES]
+    ranked = ranking.rank(completions, 'con', key=lambda x: x.name, limit=2)
+    assert [c.name for c in ranked] == ['pointConstraint', 'parentConstraint']
+
+
+def test_vectorized_ranking_matches_pure_python_ranking(monkeypatch):
+    pytest.importorskip('numpy')
+
+    names = ['node{}Type_{}'.format(i, i % 97) for i in range(1500)] + NAMES
+    random.Random(1).shuffle(names)
+    vectorized = ranking.Ranker(names)
+    monkeypatch.setattr(ranking, 'NUMPY_MIN_CANDIDATES', len(names) + 1)
+    pure_python = ranking.Ranker(names)
+
+    for query in ('n', 'node99', 'nT_5', 'pc', 'Poly', '_pri', 'xyz'):
+        assert vectorized.rank(query) == pure_python.rank(query), query
+
+
+def test_rank_only_given_candidates():
+    ranker = ranking.Ranker(NAMES)
+    indexes = ranker.rank('pc', limit=None)
+    assert [NAMES[i] for i in ranker.rank('pcu', limit=None, indexes=indexes)] == ['polyCube', 'PolyCube']
+    assert ranker.rank('pc', indexes=[0, 9]) == [0, 9]
+    assert ranker.rank('', limit=1, indexes=[3, 4]) == [3]
@@ -0,0 +1,1051 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains background service used to compute code completions outside GUI thread
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import os
+import re
+import ast
+import sys
+import time
+import logging
+import functools
+import importlib
+import threading
+from collections import OrderedDict, deque
+
+import jedi
+
+from tpDcc.tools.scripteditor.core import ranking, records, diagnostics
+
+logger = logging.getLogger('tpDcc-tools-scripteditor')
+
+_COMPLETION_WORKER = None
+_AUTO_IMPORT_PREAMBLE = None
+_JEDI_WARM_UP = None
+
+# Matches the called expression located before an open parenthesis
+CALL_REGEX = re.compile(r'(?<![\w.])([A-Za-z_]\w*(?:\.\w+)*)\s*$')
+
+# Matches the modules imported by import statements located at the start of a line
+IMPORT_REGEX = re.compile(
+    r'^[ \t]*(?:from[ \t]+([\w.]+)[ \t]+import[ \t]+\(?([\w., \t*]*)|import[ \t]+([\w., \t]+))', re.MULTILINE)
+
+
+class CompletionModes(object):
+    STATIC = 'static'
+    INTERPRETER = 'interpreter'
+
+
+def complete(text, line, column):
+    """
+    Returns jedi completions at the given position of the given code. This function does not use Qt, so it can be
+    safely executed outside GUI thread
+    :param text: str, Python code
+    :param line: int, line number (starting from 1)
+    :param column: int, column number (starting from 0)
+    :return: list(CompletionRecord)
+    """
+
+    return get_completion_records(jedi.Script(text).complete(line, column))
+
+
+def get_completion_records(completions):
+    """
+    Converts given jedi completions into completion records that do not keep jedi inference state alive
+    :param completions: list(jedi.api.classes.Completion)
+    :return: list(CompletionRecord)
+    """
+
+    return [
+        records.CompletionRecord(
+            c.name, c.complete, c.type, doc_fn=functools.partial(get_doc, c.full_name) if c.full_name else None)
+        for c in completions]
+
+
+def get_doc(full_name):
+    """
+    Returns the doc of the object with the given full name (os.path.join), inferred by jedi
+    :param full_name: str
+    :return: str
+    """
+
+    source = 'import {}\n{}'.format(full_name.split('.')[0], full_name)
+    # Platform dependent modules infer more than one name (ntpath and posixpath), so first documented one is used
+    for name in jedi.Interpreter(source, [dict()]).infer(2, len(full_name)):
+        doc = name.docstring(raw=True)
+        if doc:
+            return doc
+
+    return ''
+
+
+def get_imported_modules(text):
+    """
+    Returns names of the modules imported by the given code. Code does not need to be valid
+    Names imported from a module are also returned as submodules (from maya import cmds returns maya and maya.cmds)
+    :param text: str, Python code
+    :return: list(str)
+    """
+
+    modules = list()
+    for from_module, from_names, import_modules in IMPORT_REGEX.findall(text or ''):
+        if from_module:
+            names = [from_module] + [
+                '{}.{}'.format(from_module, x.split()[0]) for x in from_names.split(',') if x.strip(' \t*')]
+        else:
+            names = [x.split()[0] for x in import_modules.split(',') if x.strip()]
+        for name in names:
+            if not name.startswith('.') and name not in modules:
+                modules.append(name)
+
+    return modules
+
+
+def get_import_aliases(text):
+    """
+    Returns the names bound by the import statements of the given code and the modules they refer to. Code does not
+    need to be valid
+    :param text: str, Python code
+    :return: dict(str, str)
+    """
+
+    aliases = dict()
+    for from_module, from_names, import_modules in IMPORT_REGEX.findall(text or ''):
+        if from_module:
+            if from_module.startswith('.'):
+                continue
+            for name in from_names.split(','):
+                parts = name.split()
+                if parts and parts[0] != '*':
+                    aliases[parts[-1]] = '{}.{}'.format(from_module, parts[0])
+        else:
+            for name in import_modules.split(','):
+                parts = name.split()
+                if not parts:
+                    continue
+                if len(parts) == 3 and parts[1] == 'as':
+                    aliases[parts[2]] = parts[0]
+                else:
+                    top_name = parts[0].split('.')[0]
+                    aliases[top_name] = top_name
+
+    return aliases
+
+
+def get_call_expression(line):
+    """
+    Returns the expression of the innermost call that is open at the end of the given line
+    :param line: str, text of the line before the cursor
+    :return: str or None, called expression (cmds.polyCube) or None if there is no open call
+    """
+
+    depth = 0
+    quote = None
+    for i in range(len(line) - 1, -1, -1):
+        char = line[i]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char in ')]}':
+            depth += 1
+        elif char in '([{':
+            if depth:
+                depth -= 1
+            elif char == '(':
+                match = CALL_REGEX.search(line[:i])
+                return match.group(1) if match else None
+            else:
+                return None
+
+    return None
+
+
+def preload_module(module_name):
+    """
+    Makes jedi import and analyse the given module, so next completions of the module are fast. Unlike
+    jedi.preload_module, an Interpreter is used so the module is loaded into the same environment used by editors
+    :param module_name: str
+    """
+
+    source = 'import {} as x; x.'.format(module_name)
+    jedi.Interpreter(source, [dict()]).complete(1, len(source))
+
+
+class CallSignature(object):
+    """
+    Signature of the callable being called at the cursor position. Doc is only loaded the first time it is requested
+    """
+
+    def __init__(self, name, params=None, index=None, label=None, doc_fn=None, doc=None):
+        super(CallSignature, self).__init__()
+
+        self.name = name
+        self.params = params or list()
+        self.index = index
+        self._label = label
+        self._doc_fn = doc_fn
+        self._doc = doc
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def label(self):
+        return self._label or '{}({})'.format(self.name, ', '.join(self.params))
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            try:
+                self._doc = self._doc_fn() if self._doc_fn else ''
+            except Exception as exc:
+                logger.debug('Error while loading doc of {}: {}'.format(self.name, exc))
+                self._doc = ''
+            self._doc_fn = None
+
+        return self._doc
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    @classmethod
+    def from_jedi(cls, signature, load_doc=False):
+        """
+        Returns call signature of the given jedi signature. Jedi signature is not stored, so inference state is not
+        kept alive by the call signature
+        :param signature: jedi.api.classes.Signature
+        :param load_doc: bool, whether to load doc from the jedi signature. If False, doc is inferred again by its
+            full name the first time it is requested
+        :return: CallSignature
+        """
+
+        doc = signature.docstring(raw=True) if load_doc else None
+        doc_fn = functools.partial(get_doc, signature.full_name) if signature.full_name else None
+
+        return cls(
+            signature.name, [param.to_string() for param in signature.params], signature.index, doc_fn=doc_fn,
+            doc=doc)
+
+    def load_doc(self):
+        """
+        Loads doc of the signature, if it is not already loaded
+        :return: str
+        """
+
+        return self.doc
+
+    def is_doc_loaded(self):
+        """
+        Returns whether or not doc was already loaded
+        :return: bool
+        """
+
+        return self._doc is not None
+
+
+class NamespaceSnapshot(object):
+    """
+    Versioned copy of an interpreter namespace that can be safely used by jedi outside GUI thread
+    Version is only increased when namespace names or the types of their values change
+    """
+
+    def __init__(self, namespace=None):
+        super(NamespaceSnapshot, self).__init__()
+
+        self._version = 0
+        self._namespace = dict()
+        self._types = dict()
+
+        if namespace is not None:
+            self.update(namespace)
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def namespace(self):
+        return self._namespace
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def update(self, namespace):
+        """
+        Updates snapshot with the current contents of the given namespace
+        Snapshot dictionary is replaced (never modified), so dictionaries returned before keep being valid
+        :param namespace: dict
+        :return: bool, True if snapshot version changed; False otherwise
+        """
+
+        items = dict(namespace)
+        types = dict((name, type(value)) for name, value in items.items())
+        self._namespace = items
+        if types == self._types:
+            return False
+
+        self._types = types
+        self._version += 1
+
+        return True
+
+
+class AutoImportPreamble(object):
+    """
+    Import statements of the auto import code of the DCC. Code is only parsed when it changes and any statement that
+    is not an import is ignored. Completions use the namespace bound by the statements, so the document sent to jedi
+    is never modified. Namespace is resolved by the completion worker from the modules that are already imported;
+    DCC modules can only be safely imported from the main thread, so modules are only imported by import_modules
+    """
+
+    def __init__(self, text=None):
+        super(AutoImportPreamble, self).__init__()
+
+        self._text = None
+        self._version = 0
+        self._statements = list()
+        self._source = ''
+        self._namespace = None
+        self._lock = threading.Lock()
+
+        if text:
+            self.update(text)
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def text(self):
+        return self._text
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def namespace(self):
+        return self._namespace or dict()
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def update(self, text):
+        """
+        Updates import statements with the given auto import code. Modules are not imported, so it is safe to call
+        it from GUI thread
+        :param text: str or None
+        :return: bool, True if the code changed; False otherwise
+        """
+
+        text = text or ''
+        if text == self._text:
+            return False
+
+        try:
+            statements = ast.parse(text).body
+        except SyntaxError as exc:
+            logger.warning('Auto import code is not valid: {}'.format(exc))
+            statements = list()
+        statements = [
+            x for x in statements if isinstance(x, ast.Import) or (isinstance(x, ast.ImportFrom) and not x.level)]
+
+        with self._lock:
+            self._text = text
+            self._statements = statements
+            self._source = ''.join('{}\n'.format(self._get_import_line(x)) for x in statements)
+            self._namespace = None
+            self._version += 1
+
+        return True
+
+    def is_resolved(self):
+        """
+        Returns whether or not the namespace of the current import statements is resolved
+        :return: bool
+        """
+
+        return self._namespace is not None
+
+    def resolve(self):
+        """
+        Returns namespace with the names bound by the import statements. Modules are never imported, so it is safe
+        to call it from any thread: modules that are not imported yet are skipped. Namespace is only resolved again
+        when the code changes or when new modules are imported by import_modules
+        :return: dict
+        """
+
+        with self._lock:
+            namespace, statements, version = self._namespace, self._statements, self._version
+        if namespace is not None:
+            return namespace
+
+        namespace = dict()
+        for statement in statements:
+            if isinstance(statement, ast.Import):
+                self._resolve_import(statement, namespace)
+            else:
+                self._resolve_import_from(statement, namespace)
+
+        with self._lock:
+            if version == self._version:
+                self._namespace = namespace
+
+        return namespace
+
+    def import_modules(self):
+        """
+        Imports the modules of the import statements that are not imported yet. DCC modules can only be safely
+        imported from the main thread, so this function must be called from GUI thread
+        :return: bool, True if any module was imported; False otherwise
+        """
+
+        with self._lock:
+            statements = self._statements
+
+        imported = False
+        for statement in statements:
+            if isinstance(statement, ast.Import):
+                for alias in statement.names:
+                    imported = self._import(alias.name) or imported
+                continue
+            imported = self._import(statement.module) or imported
+            module = sys.modules.get(statement.module)
+            if module is None:
+                continue
+            for alias in statement.names:
+                if alias.name != '*' and not hasattr(module, alias.name):
+                    imported = self._import('{}.{}'.format(statement.module, alias.name)) or imported
+
+        if imported:
+            with self._lock:
+                if statements is self._statements:
+                    self._namespace = None
+                    self._version += 1
+
+        return imported
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _get_import_line(self, statement):
+        """
+        Internal function that returns the source code of the given import statement in a single line
+        :param statement: ast.Import or ast.ImportFrom
+        :return: str
+        """
+
+        names = ', '.join(
+            '{} as {}'.format(alias.name, alias.asname) if alias.asname else alias.name for alias in statement.names)
+        if isinstance(statement, ast.Import):
+            return 'import {}'.format(names)
+
+        return 'from {} import {}'.format(statement.module, names)
+
+    def _import(self, module_name):
+        """
+        Internal function that imports the module with the given name if it is not already imported
+        :param module_name: str
+        :return: bool, True if the module was imported; False otherwise
+        """
+
+        if module_name in sys.modules:
+            return False
+
+        try:
+            importlib.import_module(module_name)
+        except Exception as exc:
+            logger.debug('Auto import module {} cannot be imported: {}'.format(module_name, exc))
+            return False
+
+        return True
+
+    def _resolve_import(self, statement, namespace):
+        """
+        Internal function that adds the names bound by an import statement into the given namespace
+        :param statement: ast.Import
+        :param namespace: dict
+        """
+
+        for alias in statement.names:
+            module = sys.modules.get(alias.name)
+            if module is None:
+                continue
+            if alias.asname:
+                namespace[alias.asname] = module
+            else:
+                top_name = alias.name.split('.')[0]
+                namespace[top_name] = sys.modules.get(top_name, module)
+
+    def _resolve_import_from(self, statement, namespace):
+        """
+        Internal function that adds the names bound by a from import statement into the given namespace
+        :param statement: ast.ImportFrom
+        :param namespace: dict
+        """
+
+        module = sys.modules.get(statement.module)
+        if module is None:
+            return
+
+        for alias in statement.names:
+            if alias.name == '*':
+                names = getattr(module, '__all__', None) or [x for x in dir(module) if not x.startswith('_')]
+                for name in names:
+                    if hasattr(module, name):
+                        namespace[name] = getattr(module, name)
+                continue
+            value = getattr(module, alias.name, None)
+            if value is None:
+                value = sys.modules.get('{}.{}'.format(statement.module, alias.name))
+            if value is not None:
+                namespace[alias.asname or alias.name] = value
+
+
+class JediSession(object):
+    """
+    Keeps jedi state of a document between completion requests. A single jedi Project is used for all the requests
+    and jedi Script is only created again when document revision changes. Scripts are always created with the same
+    path, so jedi parser reparses only the parts of the document that changed since the previous revision
+    """
+
+    def __init__(self, path=None):
+        super(JediSession, self).__init__()
+
+        self._path = None
+        self._project = None
+        self._environment = None
+        self._script = None
+        self._revision = None
+        self._key = None
+        self._lock = threading.Lock()
+
+        self.set_path(path)
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def revision(self):
+        return self._revision
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def set_path(self, path):
+        """
+        Sets the path of the document. Documents that are not saved into disk use a virtual path located in the
+        current working directory, so jedi parser cache can still be used
+        :param path: str or None
+        """
+
+        if path and os.path.isfile(path):
+            path = os.path.abspath(path)
+            project_path = os.path.dirname(path)
+        else:
+            project_path = os.getcwd()
+            path = os.path.join(project_path, '__scripteditor_{}__.py'.format(id(self)))
+
+        with self._lock:
+            if path == self._path:
+                return
+            self._path = path
+            self._project = jedi.Project(project_path)
+            self._script = None
+            self._revision = None
+            self._key = None
+
+    def get_script(self, text, revision=None, namespace=None, namespace_version=None, preamble=None):
+        """
+        Returns jedi Script of the given document revision, creating it only if revision changed
+        :param text: str, document text
+        :param revision: int or None, document revision. If None, a new Script is always created
+        :param namespace: dict or None, if given, a jedi Interpreter that completes objects of the namespace is used
+        :param namespace_version: int or None, version of the given namespace
+        :param preamble: AutoImportPreamble or None, if given, names imported by the preamble are also completed
+        :return: jedi.Script or jedi.Interpreter
+        """
+
+        return self._get_script(text, revision, namespace, namespace_version, preamble)
+
+    def complete(
+            self, text, line, column, revision=None, namespace=None, namespace_version=None, preamble=None,
+            fuzzy=False):
+        """
+        Returns jedi completions at the given position of the given document revision
+        :param text: str, document text
+        :param line: int, line number (starting from 1)
+        :param column: int, column number (starting from 0)
+        :param revision: int or None, document revision
+        :param namespace: dict or None, namespace used to complete objects that only exist in the interpreter
+        :param namespace_version: int or None, version of the given namespace
+        :param preamble: AutoImportPreamble or None, auto import code whose imported names are also completed
+        :param fuzzy: bool, whether jedi should return completions that fuzzy match the text before the cursor
+        :return: list(CompletionRecord)
+        """
+
+        script = self._get_script(text, revision, namespace, namespace_version, preamble)
+
+        return get_completion_records(script.complete(line, column, fuzzy=fuzzy))
+
+    def get_signatures(
+            self, text, line, column, revision=None, namespace=None, namespace_version=None, preamble=None,
+            load_doc=False):
+        """
+        Returns signatures of the callable called at the given position of the given document revision
+        :param text: str, document text
+        :param line: int, line number (starting from 1)
+        :param column: int, column number (starting from 0)
+        :param revision: int or None, document revision
+        :param namespace: dict or None, namespace used to infer objects that only exist in the interpreter
+        :param namespace_version: int or None, version of the given namespace
+        :param preamble: AutoImportPreamble or None, auto import code whose imported names are also inferred
+        :param load_doc: bool, whether to load the doc of the first signature (the one that is shown). If False,
+            docs are only loaded when CallSignature.load_doc is called. Docs use jedi, so they should be loaded
+            outside GUI thread
+        :return: list(CallSignature)
+        """
+
+        script = self._get_script(text, revision, namespace, namespace_version, preamble)
+
+        return [
+            CallSignature.from_jedi(x, load_doc=load_doc and i == 0)
+            for i, x in enumerate(script.get_signatures(line, column))]
+
+    def clear(self):
+        """
+        Removes cached jedi Script
+        """
+
+        with self._lock:
+            self._script = None
+            self._revision = None
+            self._key = None
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _get_script(self, text, revision=None, namespace=None, namespace_version=None, preamble=None):
+        """
+        Internal function that returns jedi Script of the given document revision. Names bound by the preamble are
+        completed through the namespaces of a jedi Interpreter, so the document text is always sent to jedi as it is
+        :param text: str, document text
+        :param revision: int or None, document revision. If None, a new Script is always created
+        :param namespace: dict or None, if given, a jedi Interpreter that completes objects of the namespace is used
+        :param namespace_version: int or None, version of the given namespace
+        :param preamble: AutoImportPreamble or None, if given, names imported by the preamble are also completed
+        :return: jedi.Script or jedi.Interpreter
+        """
+
+        preamble = preamble if preamble and preamble.source else None
+        key = (revision, namespace is not None, namespace_version, preamble.version if preamble else None)
+        with self._lock:
+            if self._script is None or revision is None or key != self._key:
+                namespaces = [namespace] if namespace is not None else list()
+                preamble_namespace = preamble.resolve() if preamble else None
+                if preamble_namespace:
+                    namespaces.append(preamble_namespace)
+                if namespaces:
+                    # jedi Interpreter always uses an InterpreterEnvironment
+                    self._script = jedi.Interpreter(text, namespaces, path=self._path, project=self._project)
+                else:
+                    if self._environment is None:
+                        self._environment = jedi.InterpreterEnvironment()
+                    self._script = jedi.Script(
+                        text, path=self._path, project=self._project, environment=self._environment)
+                self._revision = revision
+                self._key = key
+
+            return self._script
+
+
+class CompletionSession(object):
+    """
+    Completions computed for the identifier being typed. While the user keeps extending the same identifier,
+    completions are narrowed locally instead of querying jedi again. Session is only valid while the identifier
+    starts at the same position and its text extends the text completions were computed for (the anchor)
+    """
+
+    def __init__(self, block_number, start, prefix, completions):
+        super(CompletionSession, self).__init__()
+
+        self._block_number = block_number
+        self._start = start
+        self._prefix = prefix or ''
+        self._completions = list(completions or list())
+        self._ranker = None
+        # Completions are already ranked for the anchor, so all of them are the matches of the anchor
+        self._last_query = (self._prefix, None, self._completions)
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def block_number(self):
+        return self._block_number
+
+    @property
+    def start(self):
+        return self._start
+
+    @property
+    def prefix(self):
+        return self._prefix
+
+    @property
+    def completions(self):
+        return self._completions
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def is_valid(self, block_number, start, prefix):
+        """
+        Returns whether or not completions of the session can be used for the given identifier
+        :param block_number: int, line where the identifier is located
+        :param start: int, position of the first character of the identifier
+        :param prefix: str, text of the identifier before the cursor
+        :return: bool
+        """
+
+        return block_number == self._block_number and start == self._start and prefix.startswith(self._prefix)
+
+    def filter(self, prefix):
+        """
+        Returns completions that match the given identifier text, sorted from best to worst match
+        Features of the completion names are computed once per session and characters typed after the anchor can
+        only reduce the matches, so each query only ranks the matches of the previous one when it extends it
+        :param prefix: str
+        :return: list
+        """
+
+        last_prefix, last_indexes, last_matches = self._last_query
+        if prefix == last_prefix:
+            return last_matches
+
+        if prefix:
+            if self._ranker is None:
+                self._ranker = ranking.Ranker([x.name for x in self._completions])
+            candidates = last_indexes if prefix.startswith(last_prefix) else None
+            indexes = self._ranker.rank(prefix, limit=None, indexes=candidates)
+            matches = [self._completions[i] for i in indexes]
+        else:
+            indexes = None
+            matches = self._completions
+        self._last_query = (prefix, indexes, matches)
+
+        return matches
+
+
+class CompletionRequest(object):
+    def __init__(
+            self, owner_id, revision, text, line, column, callback, complete_fn=None, prefix=None, trace=None):
+        self.owner_id = owner_id
+        self.revision = revision
+        self.text = text
+        self.line = line
+        self.column = column
+        self.callback = callback
+        self.complete_fn = complete_fn or complete
+        self.prefix = prefix
+        self.trace = trace
+        self.cancelled = threading.Event()
+
+
+class CompletionWorker(object):
+    """
+    Background thread that computes code completions. Each owner (editor) can only have one request queued:
+    submitting a new request cancels the previous one, so completions for outdated text are never computed
+    """
+
+    def __init__(self):
+        super(CompletionWorker, self).__init__()
+
+        self._requests = OrderedDict()
+        self._last_activity = 0.0
+        self._current_request = None
+        self._condition = threading.Condition()
+        self._thread = None
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def submit(self, request):
+        """
+        Queues given request. Pending or running requests of the same owner are cancelled
+        :param request: CompletionRequest
+        """
+
+        with self._condition:
+            self._cancel(request.owner_id)
+            self._requests[request.owner_id] = request
+            self._start()
+            self._condition.notify()
+
+    def notify_activity(self):
+        """
+        Notifies that the user is typing, so background work (such as jedi warm up) waits until the user stops
+        """
+
+        self._last_activity = time.time()
+
+    def get_idle_time(self):
+        """
+        Returns the time (in seconds) since the user was last active
+        :return: float
+        """
+
+        return time.time() - self._last_activity
+
+    def cancel(self, owner_id):
+        """
+        Cancels pending and running requests of the given owner
+        :param owner_id: int
+        """
+
+        with self._condition:
+            self._cancel(owner_id)
+
+    def is_busy(self):
+        """
+        Returns whether or not worker is computing or has pending requests
+        :return: bool
+        """
+
+        with self._condition:
+            return bool(self._requests) or self._current_request is not None
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _start(self):
+        """
+        Internal function that starts worker thread if it is not already running
+        """
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self._run, name='tpDcc-tools-scripteditor-completion')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _cancel(self, owner_id):
+        """
+        Internal function that cancels requests of the given owner. Must be called with condition acquired
+        :param owner_id: int
+        """
+
+        request = self._requests.pop(owner_id, None)
+        if request:
+            request.cancelled.set()
+        if self._current_request and self._current_request.owner_id == owner_id:
+            self._current_request.cancelled.set()
+
+    def _run(self):
+        """
+        Internal function that processes queued requests
+        """
+
+        while True:
+            with self._condition:
+                while not self._requests:
+                    self._condition.wait()
+                _, request = self._requests.popitem(last=False)
+                self._current_request = request
+
+            try:
+                # Only requests traced by their owner are timed. Owners finish the trace once results are shown
+                trace = request.trace
+                try:
+                    with diagnostics.trace_stage(trace, diagnostics.CompletionStages.JEDI):
+                        results = request.complete_fn(request.text, request.line, request.column)
+                    if request.prefix:
+                        # All matches are kept, so completion sessions can narrow them without querying again
+                        with diagnostics.trace_stage(trace, diagnostics.CompletionStages.RANK):
+                            results = ranking.rank(results, request.prefix, key=lambda x: x.name, limit=None)
+                except Exception as exc:
+                    logger.debug('Error while computing completions: {}'.format(exc))
+                    results = list()
+                if not request.cancelled.is_set():
+                    request.callback(request.revision, results)
+            except Exception as exc:
+                logger.warning('Error while sending completions: {}'.format(exc))
+            finally:
+                with self._condition:
+                    self._current_request = None
+
+
+class JediWarmUp(object):
+    """
+    Preloads modules into jedi in background, so the first completions of a session are as fast as the next ones
+    Preloading a module can not be interrupted, so modules are preloaded by a separate thread instead of the
+    completion worker, and completions typed while a module is preloaded are not delayed. Each module is only
+    preloaded when the completion worker is idle and the user has not been active for a while
+    """
+
+    # Time (in seconds) without user activity after which modules are preloaded
+    IDLE_TIME = 0.5
+
+    def __init__(self, worker=None, preload_fn=None):
+        super(JediWarmUp, self).__init__()
+
+        self._worker = worker
+        self._preload_fn = preload_fn or preload_module
+        self._modules = set()
+        self._preloaded = set()
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def is_preloaded(self, module_name):
+        """
+        Returns whether or not given module was already preloaded
+        :param module_name: str
+        :return: bool
+        """
+
+        with self._condition:
+            return module_name in self._preloaded
+
+    def start(self, module_names):
+        """
+        Queues the preload of the given modules. Modules already queued or preloaded are ignored
+        :param module_names: list(str)
+        """
+
+        with self._condition:
+            for module_name in module_names:
+                if module_name in self._modules:
+                    continue
+                self._modules.add(module_name)
+                self._queue.append(module_name)
+            if not self._queue:
+                return
+            if not self._thread or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='tpDcc-tools-scripteditor-warm-up')
+                self._thread.daemon = True
+                self._thread.start()
+            self._condition.notify()
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _wait_idle(self):
+        """
+        Internal function that waits until the completion worker is idle and the user stops typing
+        """
+
+        worker = self._worker or get_completion_worker()
+        while True:
+            idle_time = worker.get_idle_time()
+            if idle_time >= self.IDLE_TIME and not worker.is_busy():
+                return
+            time.sleep(max(self.IDLE_TIME - idle_time, 0.05))
+
+    def _run(self):
+        """
+        Internal function that preloads queued modules
+        """
+
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                module_name = self._queue.popleft()
+
+            self._wait_idle()
+            self._preload(module_name)
+
+    def _preload(self, module_name):
+        """
+        Internal function that preloads the given module
+        :param module_name: str
+        """
+
+        try:
+            self._preload_fn(module_name)
+        except Exception as exc:
+            logger.debug('Error while preloading module {}: {}'.format(module_name, exc))
+        with self._condition:
+            self._preloaded.add(module_name)
+
+
+def get_completion_worker():
+    """
+    Returns completion worker shared by all editors of the process
+    :return: CompletionWorker
+    """
+
+    global _COMPLETION_WORKER
+    if _COMPLETION_WORKER is None:
+        _COMPLETION_WORKER = CompletionWorker()
+
+    return _COMPLETION_WORKER
+
+
+def get_auto_import_preamble():
+    """
+    Returns auto import preamble shared by all editors of the process
+    :return: AutoImportPreamble
+    """
+
+    global _AUTO_IMPORT_PREAMBLE
+    if _AUTO_IMPORT_PREAMBLE is None:
+        _AUTO_IMPORT_PREAMBLE = AutoImportPreamble()
+
+    return _AUTO_IMPORT_PREAMBLE
+
+
+def get_jedi_warm_up():
+    """
+    Returns jedi warm up shared by all editors of the process
+    :return: JediWarmUp
+    """
+
+    global _JEDI_WARM_UP
+    if _JEDI_WARM_UP is None:
+        _JEDI_WARM_UP = JediWarmUp()
+
+    return _JEDI_WARM_UP
@@ -18,6 +18,8 @@ from Qt.QtGui import QFont
 
 
 DEFAULT_SESSION_NAME = 'session.json'
+NODE_TYPES_CACHE_NAME = 'node_types.json'
+STUBS_FOLDER_NAME = 'stubs'
 DEFAULT_SCRIPTS_TAB_NAME = 'New Script'
 INDENT_LENGTH = 4
 TAB_STOP = 4
@@ -28,3 +30,17 @@ ESCAPE_BUTTONS = [
     Qt.Key_Return, Qt.Key_Enter, Qt.Key_Left, Qt.Key_Right, Qt.Key_Home, Qt.Key_End,
     Qt.Key_PageUp, Qt.Key_PageDown, Qt.Key_Delete, Qt.Key_Insert, Qt.Key_Escape
 ]
+
+# Files bigger than these limits are opened in performance mode
+PERFORMANCE_MODE_SIZE = 1024 * 1024
+PERFORMANCE_MODE_LINES = 20000
+
+# Time (in milliseconds) the user must stop typing before jedi completions are requested
+COMPLETION_DELAY = 150
+
+# Time (in milliseconds) after the script editor is shown when jedi starts preloading modules in background
+WARM_UP_DELAY = 500
+
+# DCC modules preloaded into jedi when the script editor is shown (modules that cannot be imported are skipped)
+# pymel.core is not preloaded by default, because it takes several seconds to import and analyse
+WARM_UP_MODULES = ['maya.cmds', 'maya.api.OpenMaya', 'hou', 'pymxs', 'nuke']
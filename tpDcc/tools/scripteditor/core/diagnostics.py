@@ -0,0 +1,350 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains latency instrumentation of the code completion pipeline
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import time
+import logging
+import threading
+import contextlib
+from collections import deque, OrderedDict
+
+logger = logging.getLogger('tpDcc-tools-scripteditor')
+
+_DIAGNOSTICS = None
+
+# Python 2 does not have perf_counter
+clock = getattr(time, 'perf_counter', time.time)
+
+
+class CompletionStages(object):
+    SNAPSHOT = 'snapshot'
+    CONTEXT = 'context'
+    STUBS = 'stubs'
+    DEBOUNCE = 'debounce'
+    AUTO_IMPORT = 'auto_import'
+    JEDI = 'jedi'
+    RANK = 'rank'
+    POPULATE = 'populate'
+    RENDER = 'render'
+    TOTAL = 'total'
+
+
+class Histogram(object):
+    """
+    Histogram of durations (in milliseconds). Durations are counted in fixed buckets and the most recent ones are
+    kept to compute percentiles
+    """
+
+    # Upper bounds (in milliseconds) of the buckets. Last bucket counts durations greater than the last bound
+    BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+    # Number of recent durations used to compute percentiles
+    MAX_SAMPLES = 1024
+
+    def __init__(self):
+        super(Histogram, self).__init__()
+
+        self._buckets = [0] * (len(self.BOUNDS) + 1)
+        self._samples = deque(maxlen=self.MAX_SAMPLES)
+        self._count = 0
+        self._total = 0.0
+        self._min = None
+        self._max = None
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def total(self):
+        return self._total
+
+    @property
+    def mean(self):
+        return self._total / self._count if self._count else 0.0
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def add(self, duration):
+        """
+        Adds a duration into the histogram
+        :param duration: float, duration in milliseconds
+        """
+
+        index = 0
+        while index < len(self.BOUNDS) and duration > self.BOUNDS[index]:
+            index += 1
+        self._buckets[index] += 1
+        self._samples.append(duration)
+        self._count += 1
+        self._total += duration
+        self._min = duration if self._min is None else min(self._min, duration)
+        self._max = duration if self._max is None else max(self._max, duration)
+
+    def percentile(self, percent):
+        """
+        Returns the given percentile of the most recent durations
+        :param percent: float, from 0 to 100
+        :return: float
+        """
+
+        if not self._samples:
+            return 0.0
+
+        samples = sorted(self._samples)
+        index = int(round((len(samples) - 1) * min(max(percent, 0), 100) / 100.0))
+
+        return samples[index]
+
+    def as_dict(self):
+        """
+        Returns the statistics of the histogram
+        :return: dict
+        """
+
+        buckets = OrderedDict()
+        for bound, count in zip(self.BOUNDS, self._buckets):
+            buckets['<={}'.format(bound)] = count
+        buckets['>{}'.format(self.BOUNDS[-1])] = self._buckets[-1]
+
+        return {
+            'count': self._count,
+            'total': self._total,
+            'mean': self.mean,
+            'min': self._min or 0.0,
+            'max': self._max or 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'buckets': buckets
+        }
+
+
+class RequestTrace(object):
+    """
+    Durations of the stages of a single completion request. Stages can be timed from different threads and are
+    only recorded into the diagnostics histograms when the trace is finished, so discarded requests are not recorded
+    """
+
+    # Stages where the request is only waiting (for example, for the user to stop typing). They are recorded as
+    # their own stages but they are not part of the total duration of the request
+    WAIT_STAGES = (CompletionStages.DEBOUNCE,)
+
+    def __init__(self, diagnostics, name=None):
+        super(RequestTrace, self).__init__()
+
+        self._diagnostics = diagnostics
+        self._name = name
+        self._start = clock()
+        self._stages = OrderedDict()
+        self._finished = False
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def stages(self):
+        return self._stages
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def add(self, stage, duration):
+        """
+        Adds duration to the given stage of the request
+        :param stage: str
+        :param duration: float, duration in milliseconds
+        """
+
+        self._stages[stage] = self._stages.get(stage, 0.0) + duration
+
+    @contextlib.contextmanager
+    def stage(self, stage):
+        """
+        Context manager that times the code executed inside it as the given stage of the request
+        :param stage: str
+        """
+
+        start = clock()
+        try:
+            yield
+        finally:
+            self.add(stage, (clock() - start) * 1000.0)
+
+    def finish(self):
+        """
+        Records durations of the request stages and total duration of the request. Wait stages are not included
+        in the total duration
+        :return: float, total duration of the request in milliseconds
+        """
+
+        wait = sum(self._stages.get(stage, 0.0) for stage in self.WAIT_STAGES)
+        total = max(0.0, (clock() - self._start) * 1000.0 - wait)
+        if self._finished:
+            return total
+
+        self._finished = True
+        self._diagnostics.record_trace(self, total)
+
+        return total
+
+
+class Diagnostics(object):
+    """
+    Collects histograms of the durations of the stages of the completion pipeline. Requests slower than the slow
+    threshold are logged with the duration of each one of their stages
+    """
+
+    def __init__(self, slow_threshold=None):
+        super(Diagnostics, self).__init__()
+
+        self._histograms = OrderedDict()
+        self._slow_threshold = slow_threshold
+        self._lock = threading.Lock()
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def slow_threshold(self):
+        return self._slow_threshold
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def set_slow_threshold(self, slow_threshold):
+        """
+        Sets the duration from which requests are logged
+        :param slow_threshold: float or None, duration in milliseconds. If None, requests are not logged
+        """
+
+        self._slow_threshold = slow_threshold
+
+    def record(self, stage, duration):
+        """
+        Adds duration of the given stage into its histogram
+        :param stage: str
+        :param duration: float, duration in milliseconds
+        """
+
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.add(duration)
+
+    @contextlib.contextmanager
+    def timer(self, stage):
+        """
+        Context manager that records the duration of the code executed inside it into the histogram of given stage
+        :param stage: str
+        """
+
+        start = clock()
+        try:
+            yield
+        finally:
+            self.record(stage, (clock() - start) * 1000.0)
+
+    def start_trace(self, name=None):
+        """
+        Returns a new trace used to time the stages of a completion request
+        :param name: str or None, name used to identify the request in logs (for example, script name)
+        :return: RequestTrace
+        """
+
+        return RequestTrace(self, name=name)
+
+    def record_trace(self, trace, total):
+        """
+        Records durations of the stages of the given finished trace
+        :param trace: RequestTrace
+        :param total: float, total duration of the request in milliseconds
+        """
+
+        for stage, duration in list(trace.stages.items()):
+            self.record(stage, duration)
+        self.record(CompletionStages.TOTAL, total)
+
+        if self._slow_threshold is not None and total > self._slow_threshold:
+            stages = ', '.join('{}: {:.1f} ms'.format(stage, duration) for stage, duration in trace.stages.items())
+            logger.warning('Slow completion request {}: {:.1f} ms ({})'.format(trace.name or '', total, stages))
+
+    def get_stats(self):
+        """
+        Returns statistics of all the recorded stages
+        :return: dict
+        """
+
+        with self._lock:
+            return OrderedDict((stage, histogram.as_dict()) for stage, histogram in self._histograms.items())
+
+    def reset(self):
+        """
+        Removes all recorded durations
+        """
+
+        with self._lock:
+            self._histograms = OrderedDict()
+
+
+@contextlib.contextmanager
+def trace_stage(trace, stage):
+    """
+    Context manager that times the code executed inside it as the given stage of the given trace
+    :param trace: RequestTrace or None, if None, code is not timed
+    :param stage: str
+    """
+
+    if trace is None:
+        yield
+        return
+
+    with trace.stage(stage):
+        yield
+
+
+def get_diagnostics():
+    """
+    Returns completion diagnostics shared by all editors of the process
+    :return: Diagnostics
+    """
+
+    global _DIAGNOSTICS
+    if _DIAGNOSTICS is None:
+        _DIAGNOSTICS = Diagnostics()
+
+    return _DIAGNOSTICS
+
+
+def get_stats():
+    """
+    Returns statistics of the durations of the completion pipeline stages recorded in the current process
+    :return: dict
+    """
+
+    return get_diagnostics().get_stats()
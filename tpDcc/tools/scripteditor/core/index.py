@@ -0,0 +1,211 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains sorted indexes used to answer completion queries without scanning all the items
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import bisect
+
+# Character greater than any character used in names. Used to find the end of the range of a prefix
+MAX_CHAR = u'\uffff'
+
+
+class PrefixIndex(object):
+    """
+    Case insensitive index of names sorted alphabetically. Names starting with a prefix are found with binary search,
+    so queries take logarithmic time and results are returned already sorted. Successive queries that extend the
+    previous prefix (as the user types) only search within the range of the previous query
+    """
+
+    def __init__(self, items=None):
+        super(PrefixIndex, self).__init__()
+
+        self._keys = list()
+        self._items = list()
+        self._last_query = None
+        self._text = None
+        self._offsets = None
+
+        if items:
+            self.set_items(items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        key = (item.lower(), item)
+        index = bisect.bisect_left(self._keys, key)
+        return index < len(self._keys) and self._keys[index] == key
+
+    def __iter__(self):
+        return iter(self._items)
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def set_items(self, items):
+        """
+        Replaces all the names of the index
+        :param items: list(str)
+        """
+
+        self._keys = sorted(set((item.lower(), item) for item in items))
+        self._items = [item for _, item in self._keys]
+        self._last_query = None
+        self._text = None
+
+    def add(self, item):
+        """
+        Adds given name into the index
+        :param item: str
+        """
+
+        key = (item.lower(), item)
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return
+        self._keys.insert(index, key)
+        self._items.insert(index, item)
+        self._last_query = None
+        self._text = None
+
+    def remove(self, item):
+        """
+        Removes given name from the index
+        :param item: str
+        :return: bool, True if the name was in the index; False otherwise
+        """
+
+        key = (item.lower(), item)
+        index = bisect.bisect_left(self._keys, key)
+        if index >= len(self._keys) or self._keys[index] != key:
+            return False
+        del self._keys[index]
+        del self._items[index]
+        self._last_query = None
+        self._text = None
+
+        return True
+
+    def clear(self):
+        """
+        Removes all the names of the index
+        """
+
+        self.set_items(list())
+
+    def find_range(self, prefix, lo=0, hi=None):
+        """
+        Returns the range of indexes of the names that start with the given prefix
+        :param prefix: str, case insensitive prefix
+        :param lo: int, index where search starts
+        :param hi: int or None, index where search ends
+        :return: tuple(int, int)
+        """
+
+        prefix = prefix.lower()
+        hi = len(self._keys) if hi is None else hi
+        start = bisect.bisect_left(self._keys, (prefix,), lo, hi)
+        end = bisect.bisect_left(self._keys, (prefix + MAX_CHAR,), start, hi)
+
+        return start, end
+
+    def search(self, prefix, limit=None):
+        """
+        Returns sorted names that start with the given prefix
+        :param prefix: str, case insensitive prefix
+        :param limit: int or None, maximum number of names to return
+        :return: list(str)
+        """
+
+        prefix = prefix.lower()
+        lo, hi = 0, None
+        if self._last_query and prefix.startswith(self._last_query[0]):
+            _, lo, hi = self._last_query
+        start, end = self.find_range(prefix, lo, hi)
+        self._last_query = (prefix, start, end)
+        if limit is not None:
+            end = min(end, start + limit)
+
+        return self._items[start:end]
+
+    def find(self, text, limit=None):
+        """
+        Returns names that contain the given text. Names that start with the text are returned first
+        :param text: str, case insensitive text
+        :param limit: int or None, maximum number of names to return
+        :return: list(str)
+        """
+
+        result = self.search(text, limit=limit)
+        if not text or (limit is not None and len(result) >= limit):
+            return result
+
+        for index in self._find_substrings(text):
+            result.append(self._items[index])
+            if limit is not None and len(result) >= limit:
+                break
+
+        return result
+
+    def find_indexes(self, text):
+        """
+        Returns the indexes of the names that contain the given text. Indexes of the names that start with the text
+        are returned first
+        :param text: str, case insensitive text
+        :return: list(int)
+        """
+
+        start, end = self.find_range(text)
+        indexes = list(range(start, end))
+        if text:
+            indexes.extend(self._find_substrings(text))
+
+        return indexes
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _find_substrings(self, text):
+        """
+        Internal generator that yields the indexes of the names that contain the given text but do not start with it
+        Substring search is done by the C implementation of str.find over all the lower case names joined with
+        new lines, so no Python code is executed for the names that do not match
+        :param text: str, case insensitive text
+        :return: generator(int)
+        """
+
+        if self._text is None:
+            self._build_text()
+        text = text.lower()
+        position = self._text.find(text)
+        while position != -1:
+            index = bisect.bisect_right(self._offsets, position) - 1
+            if position != self._offsets[index]:
+                yield index
+            # Continue searching from the next name, so each name is only returned once
+            index += 1
+            position = self._text.find(text, self._offsets[index]) if index < len(self._offsets) else -1
+
+    def _build_text(self):
+        """
+        Internal function that builds text used by substring search and the offsets of each name inside it
+        """
+
+        offsets = list()
+        offset = 0
+        for key, _ in self._keys:
+            offsets.append(offset)
+            offset += len(key) + 1
+        self._offsets = offsets
+        self._text = '\n'.join(key for key, _ in self._keys)
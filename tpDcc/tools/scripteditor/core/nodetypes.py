@@ -0,0 +1,318 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains catalogue of DCC node types used by createNode completion
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import os
+import json
+import logging
+
+from tpDcc.tools.scripteditor.core import index, ranking
+
+logger = logging.getLogger('tpDcc-tools-scripteditor')
+
+_NODE_TYPE_CATALOGUE = None
+
+
+def get_maya_catalogue_key():
+    """
+    Returns key that identifies the node types available in current Maya session: Maya version and loaded plugins
+    :return: str or None
+    """
+
+    try:
+        import maya.cmds as cmds
+    except ImportError:
+        return None
+
+    plugins = sorted(cmds.pluginInfo(query=True, listPlugins=True) or list())
+
+    return '{}|{}'.format(cmds.about(version=True), ','.join(plugins))
+
+
+def get_maya_node_types():
+    """
+    Returns all node types available in current Maya session
+    :return: list(str)
+    """
+
+    try:
+        import maya.cmds as cmds
+    except ImportError:
+        return list()
+
+    return cmds.allNodeTypes() or list()
+
+
+class MayaPluginCallbacks(object):
+    """
+    Registers Maya callbacks that invalidate a node type catalogue when plugins are loaded or unloaded, because
+    plugins can register new node types
+    """
+
+    def __init__(self, catalogue):
+        super(MayaPluginCallbacks, self).__init__()
+
+        self._catalogue = catalogue
+        self._callback_ids = list()
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def install(self):
+        """
+        Registers Maya callbacks
+        :return: bool, True if callbacks were registered; False otherwise
+        """
+
+        try:
+            import maya.api.OpenMaya as OpenMaya
+        except ImportError:
+            return False
+
+        if self._callback_ids:
+            return True
+
+        self._callback_ids = [
+            OpenMaya.MSceneMessage.addStringArrayCallback(
+                OpenMaya.MSceneMessage.kAfterPluginLoad, self._on_plugins_changed),
+            OpenMaya.MSceneMessage.addStringArrayCallback(
+                OpenMaya.MSceneMessage.kAfterPluginUnload, self._on_plugins_changed)
+        ]
+
+        return True
+
+    def uninstall(self):
+        """
+        Removes registered Maya callbacks
+        """
+
+        if not self._callback_ids:
+            return
+
+        import maya.api.OpenMaya as OpenMaya
+        OpenMaya.MMessage.removeCallbacks(self._callback_ids)
+        self._callback_ids = list()
+
+    # =================================================================================================================
+    # CALLBACKS
+    # =================================================================================================================
+
+    def _on_plugins_changed(self, *args):
+        """
+        Internal callback function that is called when a plugin is loaded or unloaded
+        """
+
+        self._catalogue.invalidate()
+
+
+class NodeTypeCatalogue(object):
+    """
+    Catalogue of the node types of the current DCC session. Node types are only queried the first time they are
+    needed and are stored in a disk cache, keyed by DCC version and loaded plugins, so next sessions with the same
+    setup do not need to query the DCC. When the DCC supports it, the catalogue is invalidated when plugins are
+    loaded or unloaded, so node types are loaded again (with the new key) next time they are needed
+    """
+
+    # Maximum number of DCC setups stored in the disk cache
+    MAX_CACHED_KEYS = 8
+
+    def __init__(self, cache_path=None, key_fn=None, query_fn=None, callbacks_class=MayaPluginCallbacks):
+        super(NodeTypeCatalogue, self).__init__()
+
+        self._cache_path = cache_path
+        self._key_fn = key_fn or get_maya_catalogue_key
+        self._query_fn = query_fn or get_maya_node_types
+        self._callbacks = callbacks_class(self) if callbacks_class else None
+        self._tracked = False
+        self._index = index.PrefixIndex()
+        self._ranker = None
+        self._loaded = False
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def cache_path(self):
+        return self._cache_path
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def set_cache_path(self, cache_path):
+        """
+        Sets path of the JSON file where node types are cached
+        :param cache_path: str or None
+        """
+
+        self._cache_path = cache_path
+
+    def is_loaded(self):
+        """
+        Returns whether or not node types are already loaded
+        :return: bool
+        """
+
+        return self._loaded
+
+    def load(self, force=False):
+        """
+        Loads node types, from disk cache if possible or querying the DCC otherwise
+        :param force: bool, whether to query the DCC even if node types are cached
+        """
+
+        if not self._tracked and self._callbacks:
+            self._tracked = self._callbacks.install()
+
+        key = self._key_fn()
+        node_types = None if force or key is None else self._read_cache(key)
+        if node_types is None:
+            node_types = list(self._query_fn())
+            if key is not None:
+                self._write_cache(key, node_types)
+
+        self._index.set_items(node_types)
+        self._ranker = None
+        self._loaded = True
+
+    def invalidate(self):
+        """
+        Forces node types to be loaded again next time they are needed (for example, after loading a plugin)
+        """
+
+        self._loaded = False
+
+    def clear(self):
+        """
+        Removes DCC callbacks and forces node types to be loaded again next time they are needed
+        """
+
+        if self._callbacks:
+            self._callbacks.uninstall()
+        self._tracked = False
+        self.invalidate()
+
+    def get_index(self):
+        """
+        Returns prefix index of node types, loading node types if necessary
+        :return: PrefixIndex
+        """
+
+        if not self._loaded:
+            self.load()
+
+        return self._index
+
+    def search(self, prefix, limit=None):
+        """
+        Returns sorted node types that start with the given prefix
+        :param prefix: str, case insensitive prefix
+        :param limit: int or None, maximum number of node types to return
+        :return: list(str)
+        """
+
+        return self.get_index().search(prefix, limit=limit)
+
+    def rank(self, query, limit=ranking.TOP_K):
+        """
+        Returns node types that fuzzy match the given query, sorted from best to worst match
+        Only node types found by the prefix index are ranked: the ones that start with the first character of the
+        query (prefix, camelCase humps and most fuzzy matches) and the ones that contain the query
+        :param query: str
+        :param limit: int or None, maximum number of node types to return
+        :return: list(str)
+        """
+
+        node_type_index = self.get_index()
+        if self._ranker is None:
+            # Ranker candidates are sorted as the index names, so index positions are also ranker indexes
+            self._ranker = ranking.Ranker(list(node_type_index))
+        if not query:
+            return node_type_index.search('', limit=limit)
+
+        start, end = node_type_index.find_range(query[0])
+        candidates = set(range(start, end))
+        candidates.update(node_type_index.find_indexes(query))
+
+        return [self._ranker.names[i] for i in self._ranker.rank(query, limit=limit, indexes=sorted(candidates))]
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _read_cache_file(self):
+        """
+        Internal function that returns contents of disk cache file
+        :return: dict
+        """
+
+        if not self._cache_path or not os.path.isfile(self._cache_path):
+            return dict()
+
+        try:
+            with open(self._cache_path, 'r') as fh:
+                data = json.load(fh)
+        except Exception as exc:
+            logger.warning('Error while reading node types cache: {} | {}'.format(self._cache_path, exc))
+            return dict()
+
+        return data if isinstance(data, dict) else dict()
+
+    def _read_cache(self, key):
+        """
+        Internal function that returns node types cached for the given key
+        :param key: str
+        :return: list(str) or None
+        """
+
+        for entry in self._read_cache_file().get('entries', list()):
+            if entry.get('key') == key:
+                return entry.get('node_types', list())
+
+        return None
+
+    def _write_cache(self, key, node_types):
+        """
+        Internal function that stores node types of the given key in disk cache
+        :param key: str
+        :param node_types: list(str)
+        """
+
+        if not self._cache_path:
+            return
+
+        entries = [entry for entry in self._read_cache_file().get('entries', list()) if entry.get('key') != key]
+        entries.append({'key': key, 'node_types': node_types})
+        try:
+            cache_folder = os.path.dirname(self._cache_path)
+            if cache_folder and not os.path.isdir(cache_folder):
+                os.makedirs(cache_folder)
+            with open(self._cache_path, 'w') as fh:
+                json.dump({'entries': entries[-self.MAX_CACHED_KEYS:]}, fh)
+        except Exception as exc:
+            logger.warning('Error while writing node types cache: {} | {}'.format(self._cache_path, exc))
+
+
+def get_node_type_catalogue():
+    """
+    Returns node type catalogue shared by all editors of the process
+    :return: NodeTypeCatalogue
+    """
+
+    global _NODE_TYPE_CATALOGUE
+    if _NODE_TYPE_CATALOGUE is None:
+        _NODE_TYPE_CATALOGUE = NodeTypeCatalogue()
+
+    return _NODE_TYPE_CATALOGUE
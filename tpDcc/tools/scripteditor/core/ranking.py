@@ -0,0 +1,307 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains fuzzy ranking engine used to sort code completions
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import heapq
+
+try:
+    import numpy
+    numpy_strings = getattr(numpy, 'strings', None) or numpy.char
+except ImportError:
+    numpy = numpy_strings = None
+
+# Maximum number of ranked results returned by default
+TOP_K = 200
+
+# Minimum number of candidates from which NumPy is used to score candidates
+NUMPY_MIN_CANDIDATES = 512
+
+# Maximum number of candidates (shortest first) scored with fuzzy matching when NumPy is used
+FUZZY_MAX_CANDIDATES = 2000
+
+# Match scores. Better kinds of match always rank before worse ones (substring scores go from 600 to 700 and
+# fuzzy scores from 100 to 599). Private names are ranked after public ones of the same kind of match
+EXACT_SCORE = 1000
+PREFIX_SCORE = 900
+HUMPS_SCORE = 800
+SUBSTRING_SCORE = 700
+FUZZY_SCORE = 500
+CASE_BONUS = 5
+PRIVATE_PENALTY = 300
+
+
+def get_char_mask(text):
+    """
+    Returns bit mask of the characters of the given lower case text. Each character sets one of 63 bits, so a
+    candidate can only match a query if all the bits of the query mask are also set in the candidate mask
+    :param text: str
+    :return: int
+    """
+
+    mask = 0
+    for char in text:
+        mask |= 1 << (ord(char) % 63)
+
+    return mask
+
+
+def get_humps(name):
+    """
+    Returns the positions where the words of the given name start (first character, characters after underscores
+    or digits and upper case characters after lower case ones)
+    :param name: str
+    :return: tuple(int)
+    """
+
+    humps = list()
+    previous = ''
+    for i, char in enumerate(name):
+        if char == '_':
+            previous = char
+            continue
+        if not humps or previous == '_' or (char.isupper() and not previous.isupper()) or (
+                char.isdigit() and not previous.isdigit()):
+            humps.append(i)
+        previous = char
+
+    return tuple(humps)
+
+
+class Ranker(object):
+    """
+    Ranks a list of candidate names against a query using prefix, camelCase humps, substring and subsequence (fuzzy)
+    matching. Features of the candidates (lower case names, humps and character masks) are computed once when the
+    ranker is created, so the same ranker can be reused by all the queries done over the same candidates
+    """
+
+    def __init__(self, names):
+        super(Ranker, self).__init__()
+
+        self._names = list(names)
+        self._lowers = [name.lower() for name in self._names]
+        self._humps = [get_humps(name) for name in self._names]
+        self._initials = [
+            ''.join(lower[i] for i in humps) for lower, humps in zip(self._lowers, self._humps)]
+        self._masks = [get_char_mask(lower) for lower in self._lowers]
+        self._arrays = None
+        if numpy is not None and len(self._names) >= NUMPY_MIN_CANDIDATES:
+            self._arrays = {
+                'names': numpy.array(self._names),
+                'lowers': numpy.array(self._lowers),
+                'initials': numpy.array(self._initials),
+                'masks': numpy.array(self._masks, dtype=numpy.uint64),
+                'lengths': numpy.array([len(name) for name in self._names], dtype=numpy.int64),
+                'private': numpy.array([name.startswith('_') for name in self._names], dtype=bool)
+            }
+
+    def __len__(self):
+        return len(self._names)
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def names(self):
+        return self._names
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def rank(self, query, limit=TOP_K, indexes=None):
+        """
+        Returns indexes of the candidates that match the given query, sorted from best to worst match
+        :param query: str
+        :param limit: int or None, maximum number of indexes to return
+        :param indexes: list(int) or None, if given, only these candidates are ranked (for example, the matches of
+            a previous query or the candidates found by an index)
+        :return: list(int)
+        """
+
+        if not query:
+            indexes = list(range(len(self._names))) if indexes is None else list(indexes)
+            return indexes if limit is None else indexes[:limit]
+
+        query_lower = query.lower()
+        if self._arrays is not None:
+            scored = self._rank_batch(query, query_lower, limit, indexes)
+        else:
+            scored = list()
+            for i in self._filter(get_char_mask(query_lower), indexes):
+                score = self.score(i, query, query_lower)
+                if score is not None:
+                    scored.append((-score, len(self._names[i]), self._lowers[i], i))
+
+        if limit is not None and limit < len(scored):
+            scored = heapq.nsmallest(limit, scored)
+        else:
+            scored.sort()
+
+        return [item[-1] for item in scored]
+
+    def score(self, index, query, query_lower=None):
+        """
+        Returns the score of the candidate in the given index for the given query
+        :param index: int
+        :param query: str
+        :param query_lower: str or None, lower case query
+        :return: int or None, score of the candidate or None if the candidate does not match the query
+        """
+
+        query_lower = query_lower or query.lower()
+        name = self._names[index]
+        lower = self._lowers[index]
+        if lower == query_lower:
+            score = EXACT_SCORE
+        elif lower.startswith(query_lower):
+            score = PREFIX_SCORE
+        elif self._initials[index].startswith(query_lower):
+            score = HUMPS_SCORE
+        else:
+            position = lower.find(query_lower)
+            if position != -1:
+                score = SUBSTRING_SCORE - min(position, 100)
+            else:
+                fuzzy_score = self._match_subsequence(index, query_lower)
+                if fuzzy_score is None:
+                    return None
+                score = FUZZY_SCORE + max(-400, min(fuzzy_score, 99))
+
+        if name.startswith(query):
+            score += CASE_BONUS
+        if name.startswith('_') and not query.startswith('_'):
+            score -= PRIVATE_PENALTY
+
+        return score
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _filter(self, query_mask, indexes=None):
+        """
+        Internal function that returns indexes of the candidates that contain all the characters of the query
+        :param query_mask: int
+        :param indexes: list(int) or None, candidates to filter. If None, all candidates are filtered
+        :return: list(int)
+        """
+
+        if indexes is None:
+            return [i for i, mask in enumerate(self._masks) if mask & query_mask == query_mask]
+
+        masks = self._masks
+        return [i for i in indexes if masks[i] & query_mask == query_mask]
+
+    def _rank_batch(self, query, query_lower, limit, candidates=None):
+        """
+        Internal function that scores all the candidates at once using NumPy vectorized operations
+        Fuzzy matching can not be vectorized, so it is only done for the shortest candidates and only if there are
+        not enough candidates with better kinds of matches
+        :param query: str
+        :param query_lower: str
+        :param limit: int or None
+        :param candidates: list(int) or None, candidates to score. If None, all candidates are scored
+        :return: list(tuple(int, int, str, int)), sort keys of matched candidates
+        """
+
+        arrays = self._arrays
+        query_mask = numpy.uint64(get_char_mask(query_lower))
+        if candidates is None:
+            indexes = numpy.flatnonzero((arrays['masks'] & query_mask) == query_mask)
+        else:
+            indexes = numpy.asarray(candidates, dtype=numpy.int64)
+            indexes = indexes[(arrays['masks'][indexes] & query_mask) == query_mask]
+        lowers = arrays['lowers'][indexes]
+        positions = numpy_strings.find(lowers, query_lower)
+
+        scores = numpy.full(len(indexes), -1, dtype=numpy.int64)
+        substring = positions > 0
+        scores[substring] = SUBSTRING_SCORE - numpy.minimum(positions[substring], 100)
+        scores[numpy_strings.startswith(arrays['initials'][indexes], query_lower) & (positions != 0)] = HUMPS_SCORE
+        scores[positions == 0] = PREFIX_SCORE
+        scores[lowers == query_lower] = EXACT_SCORE
+        matched = scores >= 0
+        scores[matched & numpy_strings.startswith(arrays['names'][indexes], query)] += CASE_BONUS
+        private = arrays['private'][indexes]
+        if not query.startswith('_'):
+            scores[matched & private] -= PRIVATE_PENALTY
+
+        matched_indexes = indexes[matched]
+        matched_scores = scores[matched]
+        matched_lowers = lowers[matched]
+        keys = -matched_scores * 1024 + numpy.minimum(arrays['lengths'][matched_indexes], 1023)
+        if limit is not None and len(keys) > limit:
+            # Only candidates that can be in the top results are sorted alphabetically
+            kth_key = numpy.partition(keys, limit - 1)[limit - 1]
+            subset = numpy.flatnonzero(keys <= kth_key)
+            order = subset[numpy.lexsort((matched_lowers[subset], keys[subset]))][:limit]
+        else:
+            order = numpy.lexsort((matched_lowers, keys))
+        scored = [
+            (-score, len(self._names[index]), self._lowers[index], index)
+            for score, index in zip(matched_scores[order].tolist(), matched_indexes[order].tolist())]
+
+        # Fuzzy matches always rank after public candidates with better kinds of matches
+        if limit is None or int(numpy.count_nonzero(matched & ~private)) < limit:
+            fuzzy_indexes = indexes[~matched]
+            fuzzy_indexes = fuzzy_indexes[numpy.argsort(arrays['lengths'][fuzzy_indexes], kind='stable')]
+            for index in fuzzy_indexes[:FUZZY_MAX_CANDIDATES].tolist():
+                score = self.score(index, query, query_lower)
+                if score is not None:
+                    scored.append((-score, len(self._names[index]), self._lowers[index], index))
+
+        return scored
+
+    def _match_subsequence(self, index, query_lower):
+        """
+        Internal function that matches query characters in order inside the candidate. Characters matched at the
+        start of a word or just after the previous matched character increase the score, gaps decrease it
+        :param index: int
+        :param query_lower: str
+        :return: int or None, score of the match or None if the candidate does not contain the query characters
+        """
+
+        lower = self._lowers[index]
+        humps = self._humps[index]
+        score = 0
+        position = -1
+        for char in query_lower:
+            found = lower.find(char, position + 1)
+            if found == -1:
+                return None
+            if found in humps:
+                score += 10
+            elif found == position + 1:
+                score += 5
+            else:
+                score -= min(found - position - 1, 10)
+            position = found
+
+        return score
+
+
+def rank(items, query, key=None, limit=TOP_K):
+    """
+    Returns given items sorted from best to worst match of the given query. Items that do not match are discarded
+    :param items: list, items to rank
+    :param query: str
+    :param key: callable or None, function that returns the name of an item. If None, items are names
+    :param limit: int or None, maximum number of items to return
+    :return: list
+    """
+
+    items = list(items)
+    ranker = Ranker([key(item) for item in items] if key else items)
+
+    return [items[i] for i in ranker.rank(query, limit=limit)]
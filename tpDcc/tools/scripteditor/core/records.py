@@ -0,0 +1,62 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains lightweight records used to list code completions in the script editor
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import logging
+
+logger = logging.getLogger('tpDcc-tools-scripteditor')
+
+
+class CompletionRecord(object):
+    """
+    Completion listed by the completer. Records only store plain values (and a callable that loads the doc the
+    first time it is requested), so listed completions do not keep jedi inference state alive
+    """
+
+    __slots__ = ('name', 'complete', 'kind', 'end_char', '_doc_fn', '_doc')
+
+    def __init__(self, name, complete=None, kind=None, end_char=False, doc_fn=None):
+        """
+        :param name: str, completed name
+        :param complete: str or None, text inserted after the text typed by the user. If None, the word typed by the
+            user is replaced with the name
+        :param kind: str or None, kind of the completion (module, class, function, etc)
+        :param end_char: bool, whether quotes opened before the name must be closed after inserting it
+        :param doc_fn: callable or None, function that returns the doc of the completion
+        """
+
+        self.name = name
+        self.complete = complete
+        self.kind = kind
+        self.end_char = end_char
+        self._doc_fn = doc_fn
+        self._doc = None
+
+    def __repr__(self):
+        return '<{} {}: {}>'.format(type(self).__name__, self.kind, self.name)
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def doc(self):
+        if self._doc is None:
+            try:
+                self._doc = self._doc_fn() if self._doc_fn else ''
+            except Exception as exc:
+                logger.debug('Error while loading doc of {}: {}'.format(self.name, exc))
+                self._doc = ''
+            self._doc_fn = None
+
+        return self._doc
@@ -0,0 +1,340 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains index of the names of the nodes of the current DCC scene used by PyNode completion
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import time
+
+from tpDcc.tools.scripteditor.core import index
+
+_SCENE_NODE_INDEX = None
+
+
+def get_short_name(name):
+    """
+    Returns the short name of the given node name (the last part of DAG paths)
+    :param name: str
+    :return: str
+    """
+
+    return name.rsplit('|', 1)[-1]
+
+
+def get_scene_nodes():
+    """
+    Returns short names of all the nodes of the current scene. If current DCC is not Maya, selected nodes are
+    returned. Maya returns partial DAG paths for nodes whose name is not unique, so names are converted to short
+    names, the same names node callbacks receive
+    :return: list(str)
+    """
+
+    try:
+        import maya.cmds as cmds
+    except ImportError:
+        from tpDcc import dcc
+        return dcc.selected_nodes(full_path=False) or list()
+
+    return [get_short_name(name) for name in cmds.ls() or list()]
+
+
+class MayaSceneCallbacks(object):
+    """
+    Registers Maya API callbacks that notify a scene node index when nodes are added, removed or renamed and when
+    a new scene is opened
+    """
+
+    def __init__(self, scene_index):
+        super(MayaSceneCallbacks, self).__init__()
+
+        self._scene_index = scene_index
+        self._callback_ids = list()
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def install(self):
+        """
+        Registers Maya callbacks
+        :return: bool, True if callbacks were registered; False otherwise
+        """
+
+        try:
+            import maya.api.OpenMaya as OpenMaya
+        except ImportError:
+            return False
+
+        if self._callback_ids:
+            return True
+
+        self._callback_ids = [
+            OpenMaya.MDGMessage.addNodeAddedCallback(self._on_node_added, 'dependNode'),
+            OpenMaya.MDGMessage.addNodeRemovedCallback(self._on_node_removed, 'dependNode'),
+            OpenMaya.MNodeMessage.addNameChangedCallback(OpenMaya.MObject.kNullObj, self._on_node_renamed),
+            OpenMaya.MSceneMessage.addCallback(OpenMaya.MSceneMessage.kAfterOpen, self._on_scene_changed),
+            OpenMaya.MSceneMessage.addCallback(OpenMaya.MSceneMessage.kAfterNew, self._on_scene_changed)
+        ]
+
+        return True
+
+    def uninstall(self):
+        """
+        Removes registered Maya callbacks
+        """
+
+        if not self._callback_ids:
+            return
+
+        import maya.api.OpenMaya as OpenMaya
+        OpenMaya.MMessage.removeCallbacks(self._callback_ids)
+        self._callback_ids = list()
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _get_name(self, node):
+        """
+        Internal function that returns the name of the given node
+        :param node: OpenMaya.MObject
+        :return: str
+        """
+
+        import maya.api.OpenMaya as OpenMaya
+        return OpenMaya.MFnDependencyNode(node).name()
+
+    # =================================================================================================================
+    # CALLBACKS
+    # =================================================================================================================
+
+    def _on_node_added(self, node, *args):
+        """
+        Internal callback function that is called when a node is added into the scene
+        Changes are discarded while the index is not built (for example, while a file is opened), so node names are
+        not resolved in that case
+        """
+
+        if not self._scene_index.is_built():
+            return
+
+        self._scene_index.add_node(self._get_name(node))
+
+    def _on_node_removed(self, node, *args):
+        """
+        Internal callback function that is called when a node is removed from the scene
+        """
+
+        if not self._scene_index.is_built():
+            return
+
+        self._scene_index.remove_node(self._get_name(node))
+
+    def _on_node_renamed(self, node, previous_name, *args):
+        """
+        Internal callback function that is called when a node is renamed
+        """
+
+        if not self._scene_index.is_built():
+            return
+
+        self._scene_index.rename_node(previous_name, self._get_name(node))
+
+    def _on_scene_changed(self, *args):
+        """
+        Internal callback function that is called when a new scene is created or opened
+        """
+
+        self._scene_index.invalidate()
+
+
+class SceneNodeIndex(object):
+    """
+    Index of the short names of all the nodes of the current scene. Index is built once and, when the DCC supports
+    it, is kept updated with node added, removed and renamed callbacks. Changes are queued and only applied when the
+    index is queried, so creating or deleting lots of nodes does not slow down the DCC
+    Several nodes can share the same short name, so the number of nodes of each name is tracked and names are only
+    removed from the index when the last node with that name is removed
+    """
+
+    # Number of queued changes from which the index is rebuilt instead of updated node by node
+    REBUILD_CHANGES = 1000
+
+    # Time (in seconds) after which the index is rebuilt when DCC callbacks are not available
+    REFRESH_TIME = 5.0
+
+    def __init__(self, list_fn=None, callbacks_class=MayaSceneCallbacks):
+        super(SceneNodeIndex, self).__init__()
+
+        self._list_fn = list_fn or get_scene_nodes
+        self._callbacks = callbacks_class(self) if callbacks_class else None
+        self._index = index.PrefixIndex()
+        self._counts = dict()
+        self._changes = list()
+        self._built_time = None
+        self._tracked = False
+
+    def __len__(self):
+        return len(self._get_index())
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def is_built(self):
+        """
+        Returns whether or not index is built
+        :return: bool
+        """
+
+        return self._built_time is not None
+
+    def is_tracked(self):
+        """
+        Returns whether or not index is updated with DCC callbacks
+        :return: bool
+        """
+
+        return self._tracked
+
+    def build(self):
+        """
+        Builds index with the names of all the nodes of the current scene
+        """
+
+        if not self._tracked and self._callbacks:
+            self._tracked = self._callbacks.install()
+
+        self._counts = dict()
+        for name in self._list_fn():
+            self._counts[name] = self._counts.get(name, 0) + 1
+        self._index.set_items(self._counts)
+        self._changes = list()
+        self._built_time = time.time()
+
+    def invalidate(self):
+        """
+        Forces index to be built again next time it is queried
+        """
+
+        self._built_time = None
+        self._changes = list()
+
+    def add_node(self, name):
+        """
+        Queues the addition of the given node name
+        :param name: str
+        """
+
+        self._queue_change(True, name)
+
+    def remove_node(self, name):
+        """
+        Queues the removal of the given node name
+        :param name: str
+        """
+
+        self._queue_change(False, name)
+
+    def rename_node(self, old_name, new_name):
+        """
+        Queues the rename of a node
+        :param old_name: str
+        :param new_name: str
+        """
+
+        self.remove_node(old_name)
+        self.add_node(new_name)
+
+    def search(self, text, limit=None):
+        """
+        Returns names of the nodes that contain the given text. Nodes that start with the text are returned first
+        :param text: str, case insensitive text
+        :param limit: int or None, maximum number of names to return
+        :return: list(str)
+        """
+
+        return self._get_index().find(text, limit=limit)
+
+    def clear(self):
+        """
+        Removes DCC callbacks and all indexed names
+        """
+
+        if self._callbacks:
+            self._callbacks.uninstall()
+        self._tracked = False
+        self._index.clear()
+        self._counts = dict()
+        self.invalidate()
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _queue_change(self, added, name):
+        """
+        Internal function that queues a change that will be applied next time the index is queried
+        If too many changes are queued, the index is just rebuilt next time it is queried
+        :param added: bool, whether the node was added or removed
+        :param name: str
+        """
+
+        if not self.is_built() or not name:
+            return
+
+        if len(self._changes) >= self.REBUILD_CHANGES * 100:
+            self.invalidate()
+            return
+
+        self._changes.append((added, name))
+
+    def _get_index(self):
+        """
+        Internal function that returns the prefix index, building it or applying queued changes if necessary
+        :return: PrefixIndex
+        """
+
+        if not self.is_built() or (not self._tracked and time.time() - self._built_time > self.REFRESH_TIME):
+            self.build()
+        elif self._changes:
+            changes, self._changes = self._changes, list()
+            rebuild = len(changes) >= self.REBUILD_CHANGES
+            for added, name in changes:
+                count = self._counts.get(name, 0)
+                if added:
+                    self._counts[name] = count + 1
+                    if not count and not rebuild:
+                        self._index.add(name)
+                elif count:
+                    if count > 1:
+                        self._counts[name] = count - 1
+                        continue
+                    del self._counts[name]
+                    if not rebuild:
+                        self._index.remove(name)
+            if rebuild:
+                self._index.set_items(self._counts)
+
+        return self._index
+
+
+def get_scene_node_index():
+    """
+    Returns scene node index shared by all editors of the process
+    :return: SceneNodeIndex
+    """
+
+    global _SCENE_NODE_INDEX
+    if _SCENE_NODE_INDEX is None:
+        _SCENE_NODE_INDEX = SceneNodeIndex()
+
+    return _SCENE_NODE_INDEX
@@ -0,0 +1,449 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains memory mapped index of the API of DCC modules (functions, flags, signatures and docs)
+Indexes are generated offline with scripts/generate_stub_index.py and are used to complete DCC modules
+without introspecting them with jedi
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import os
+import sys
+import mmap
+import json
+import struct
+import logging
+import threading
+
+from tpDcc.tools.scripteditor.core import ranking, records
+
+logger = logging.getLogger('tpDcc-tools-scripteditor')
+
+_STUB_INDEX = None
+
+# File layout: header, JSON metadata, table of record offsets (relative to records start, plus end offset) and
+# records sorted by key. Each record is: key, kind, signature and doc separated by null characters
+MAGIC = b'TPSTUB01'
+HEADER = struct.Struct('<8sII')
+OFFSET = struct.Struct('<I')
+FIELD_SEPARATOR = b'\x00'
+
+# Keys of module members are module + MEMBER_SEPARATOR + name and keys of function flags are
+# module + FLAG_SEPARATOR + function + MEMBER_SEPARATOR + flag. Separators sort before any name character, so
+# members of a module (and flags of a function) are stored contiguously and do not include submodules
+MEMBER_SEPARATOR = u'\x01'
+FLAG_SEPARATOR = u'\x02'
+
+
+class StubKinds(object):
+    MODULE = 'module'
+    CLASS = 'class'
+    FUNCTION = 'function'
+    INSTANCE = 'instance'
+    FLAG = 'flag'
+
+
+def get_member_key(module_name, name):
+    """
+    Returns index key of a module member
+    :param module_name: str
+    :param name: str
+    :return: str
+    """
+
+    return module_name + MEMBER_SEPARATOR + name
+
+
+def get_flag_key(module_name, function_name, flag):
+    """
+    Returns index key of a function flag
+    :param module_name: str
+    :param function_name: str
+    :param flag: str
+    :return: str
+    """
+
+    return module_name + FLAG_SEPARATOR + function_name + MEMBER_SEPARATOR + flag
+
+
+def get_dcc_stub_name():
+    """
+    Returns the name of the stub index of the current DCC session (DCC name and version). DCC modules are only
+    queried if they are already imported
+    :return: str or None
+    """
+
+    cmds = sys.modules.get('maya.cmds')
+    if cmds is not None and hasattr(cmds, 'about'):
+        return 'maya_{}'.format(cmds.about(version=True))
+    hou = sys.modules.get('hou')
+    if hou is not None and hasattr(hou, 'applicationVersionString'):
+        return 'houdini_{}'.format(hou.applicationVersionString())
+
+    return None
+
+
+def write_stub_index(file_path, records, metadata=None):
+    """
+    Writes a stub index file
+    :param file_path: str
+    :param records: list(tuple(str, str, str, str)), key, kind, signature and doc of each record
+    :param metadata: dict or None, data stored in index header (DCC version, modules, etc)
+    """
+
+    encoded = dict()
+    for key, kind, signature, doc in records:
+        key = key.encode('utf-8')
+        encoded[key] = FIELD_SEPARATOR.join(
+            [key, kind.encode('utf-8'), (signature or '').replace('\x00', '').encode('utf-8'),
+             (doc or '').replace('\x00', '').encode('utf-8')])
+
+    offsets = list()
+    offset = 0
+    for key in sorted(encoded):
+        offsets.append(offset)
+        offset += len(encoded[key])
+    offsets.append(offset)
+
+    metadata = json.dumps(metadata or dict()).encode('utf-8')
+    folder = os.path.dirname(file_path)
+    if folder and not os.path.isdir(folder):
+        os.makedirs(folder)
+    with open(file_path, 'wb') as fh:
+        fh.write(HEADER.pack(MAGIC, len(encoded), len(metadata)))
+        fh.write(metadata)
+        fh.write(b''.join(OFFSET.pack(x) for x in offsets))
+        for key in sorted(encoded):
+            fh.write(encoded[key])
+
+
+class StubRecord(records.CompletionRecord):
+    """
+    Member or flag of a DCC module stored in a stub index. Docs are only read from the index when requested
+    """
+
+    __slots__ = ('signature', '_stub_index', '_position')
+
+    def __init__(self, stub_index, position, name, kind, signature):
+        super(StubRecord, self).__init__(name, kind=kind)
+
+        self.signature = signature
+        self._stub_index = stub_index
+        self._position = position
+
+    @property
+    def doc(self):
+        return self._stub_index.get_doc(self._position)
+
+
+class StubIndex(object):
+    """
+    Memory mapped stub index. Records are sorted by key, so members of a module and flags of a function are found
+    with binary search over the table of offsets, without reading the rest of the file
+    """
+
+    def __init__(self, path=None):
+        super(StubIndex, self).__init__()
+
+        self._path = path
+        self._file = None
+        self._mmap = None
+        self._metadata = dict()
+        self._count = 0
+        self._offsets_start = 0
+        self._records_start = 0
+        self._failed_path = None
+        self._members = dict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self._count
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def metadata(self):
+        return self._metadata
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def set_path(self, path):
+        """
+        Sets the path of the index file. Index is opened again next time it is queried
+        :param path: str or None
+        """
+
+        with self._lock:
+            if path == self._path:
+                return
+            self.close()
+            self._path = path
+            self._failed_path = None
+
+    def is_open(self):
+        """
+        Returns whether or not index file is opened
+        :return: bool
+        """
+
+        return self._mmap is not None
+
+    def open(self):
+        """
+        Memory maps index file. Files that do not exist or are not valid are only checked once
+        :return: bool, True if the index is opened; False otherwise
+        """
+
+        with self._lock:
+            if self._mmap is not None:
+                return True
+            if not self._path or self._failed_path == self._path:
+                return False
+            if not os.path.isfile(self._path):
+                self._failed_path = self._path
+                return False
+
+            try:
+                self._file = open(self._path, 'rb')
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, count, metadata_length = HEADER.unpack_from(self._mmap, 0)
+                if magic != MAGIC:
+                    raise ValueError('File is not a stub index')
+                metadata_start = HEADER.size
+                self._metadata = json.loads(self._mmap[metadata_start:metadata_start + metadata_length].decode('utf-8'))
+                self._count = count
+                self._offsets_start = metadata_start + metadata_length
+                self._records_start = self._offsets_start + (count + 1) * OFFSET.size
+            except Exception as exc:
+                logger.warning('Error while opening stub index: {} | {}'.format(self._path, exc))
+                self.close()
+                self._failed_path = self._path
+                return False
+
+        return True
+
+    def close(self):
+        """
+        Closes index file
+        """
+
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+            if self._file is not None:
+                self._file.close()
+            self._mmap = None
+            self._file = None
+            self._metadata = dict()
+            self._count = 0
+            self._members = dict()
+
+    def has_module(self, module_name):
+        """
+        Returns whether or not index contains members of the given module
+        :param module_name: str
+        :return: bool
+        """
+
+        start, end = self._find_range(module_name + MEMBER_SEPARATOR)
+
+        return end > start
+
+    def get_members(self, module_name):
+        """
+        Returns records of the members of the given module, sorted by name
+        :param module_name: str
+        :return: list(StubRecord)
+        """
+
+        return self._get_members(module_name)[0]
+
+    def get_member(self, module_name, name):
+        """
+        Returns record of the given module member
+        :param module_name: str
+        :param name: str
+        :return: StubRecord or None
+        """
+
+        key = get_member_key(module_name, name)
+        start, end = self._find_range(key)
+        with self._lock:
+            if end <= start or self._get_key(start) != key.encode('utf-8'):
+                return None
+            _, kind, signature = self._get_fields(start)
+
+        return StubRecord(self, start, name, kind.decode('utf-8'), signature.decode('utf-8'))
+
+    def get_flags(self, module_name, function_name):
+        """
+        Returns records of the flags of the given function, sorted by name
+        :param module_name: str
+        :param function_name: str
+        :return: list(StubRecord)
+        """
+
+        return self._get_records(get_flag_key(module_name, function_name, ''))
+
+    def complete(self, module_name, prefix, limit=ranking.TOP_K):
+        """
+        Returns records of the members of the given module that match the given prefix, from best to worst match
+        :param module_name: str
+        :param prefix: str
+        :param limit: int or None
+        :return: list(StubRecord)
+        """
+
+        records, ranker = self._get_members(module_name)
+
+        return [records[i] for i in ranker.rank(prefix, limit=limit)]
+
+    def get_doc(self, position):
+        """
+        Returns doc of the record in the given position
+        :param position: int
+        :return: str
+        """
+
+        with self._lock:
+            if self._mmap is None:
+                return ''
+            start, end = self._get_bounds(position)
+            data = self._mmap[start:end]
+
+        return data.split(FIELD_SEPARATOR, 3)[-1].decode('utf-8', 'replace')
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _get_bounds(self, position):
+        """
+        Internal function that returns the start and end positions of the record in the given position
+        :param position: int
+        :return: tuple(int, int)
+        """
+
+        start, end = struct.unpack_from('<II', self._mmap, self._offsets_start + position * OFFSET.size)
+
+        return self._records_start + start, self._records_start + end
+
+    def _get_key(self, position):
+        """
+        Internal function that returns the key of the record in the given position
+        :param position: int
+        :return: bytes
+        """
+
+        start, end = self._get_bounds(position)
+
+        return self._mmap[start:self._mmap.find(FIELD_SEPARATOR, start, end)]
+
+    def _get_fields(self, position):
+        """
+        Internal function that returns the key, kind and signature of the record in the given position. Only the
+        bytes of these fields are read, so docs are not copied
+        :param position: int
+        :return: tuple(bytes, bytes, bytes)
+        """
+
+        start, end = self._get_bounds(position)
+        fields = list()
+        for _ in range(3):
+            separator = self._mmap.find(FIELD_SEPARATOR, start, end)
+            if separator == -1:
+                separator = end
+            fields.append(self._mmap[start:separator])
+            start = min(separator + 1, end)
+
+        return tuple(fields)
+
+    def _find_range(self, key_prefix):
+        """
+        Internal function that returns the range of positions of the records whose key starts with the given prefix
+        :param key_prefix: str
+        :return: tuple(int, int)
+        """
+
+        if not self.open():
+            return 0, 0
+
+        key_prefix = key_prefix.encode('utf-8')
+        with self._lock:
+            lo, hi = 0, self._count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._get_key(mid) < key_prefix:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            start = end = lo
+            hi = self._count
+            while end < hi:
+                mid = (end + hi) // 2
+                if self._get_key(mid).startswith(key_prefix):
+                    end = mid + 1
+                else:
+                    hi = mid
+
+        return start, end
+
+    def _get_records(self, key_prefix):
+        """
+        Internal function that returns records whose key starts with the given prefix. Docs are not read
+        :param key_prefix: str
+        :return: list(StubRecord)
+        """
+
+        start, end = self._find_range(key_prefix)
+        records = list()
+        with self._lock:
+            for position in range(start, end):
+                key, kind, signature = self._get_fields(position)
+                name = key.decode('utf-8')[len(key_prefix):]
+                records.append(StubRecord(self, position, name, kind.decode('utf-8'), signature.decode('utf-8')))
+
+        return records
+
+    def _get_members(self, module_name):
+        """
+        Internal function that returns member records of the given module and the ranker used to rank them
+        Both are cached, so successive completions of the same module do not read the index again
+        :param module_name: str
+        :return: tuple(list(StubRecord), ranking.Ranker)
+        """
+
+        members = self._members.get(module_name)
+        if members is None:
+            records = self._get_records(module_name + MEMBER_SEPARATOR)
+            members = self._members[module_name] = (records, ranking.Ranker([x.name for x in records]))
+
+        return members
+
+
+def get_stub_index():
+    """
+    Returns stub index shared by all editors of the process
+    :return: StubIndex
+    """
+
+    global _STUB_INDEX
+    if _STUB_INDEX is None:
+        _STUB_INDEX = StubIndex()
+
+    return _STUB_INDEX
@@ -0,0 +1,138 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains process wide cache of highlighted blocks
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import threading
+from collections import OrderedDict
+
+_HIGHLIGHT_CACHE = None
+
+
+class HighlightCache(object):
+    """
+    Size bounded LRU cache that maps a block of text and the state of the previous block to the color ranges
+    and state computed by a lexer. Ranges store color keys (not text formats), so cached entries are valid for
+    any theme and can be shared by all the highlighters of the process
+    """
+
+    # Default maximum number of cached blocks
+    MAX_SIZE = 50000
+
+    def __init__(self, max_size=None):
+        super(HighlightCache, self).__init__()
+
+        self._max_size = max_size or self.MAX_SIZE
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    # =================================================================================================================
+    # PROPERTIES
+    # =================================================================================================================
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def lex(self, lexer, text, state):
+        """
+        Returns color ranges and state of the given block of text, lexing it only if it is not already cached
+        :param lexer: PythonLexer, lexer used to classify block tokens
+        :param text: str, text of the block
+        :param state: int, state of the previous block
+        :return: tuple(tuple(tuple(int, int, str)), int)
+        """
+
+        key = (lexer.ENGINE, text, state)
+        with self._lock:
+            result = self._items.pop(key, None)
+            if result is not None:
+                self._items[key] = result
+                self._hits += 1
+                return result
+            self._misses += 1
+
+        ranges, end_state = lexer.lex(text, state)
+        result = (tuple(ranges), end_state)
+
+        with self._lock:
+            self._items[key] = result
+            while len(self._items) > self._max_size:
+                self._items.popitem(last=False)
+
+        return result
+
+    def set_max_size(self, max_size):
+        """
+        Sets the maximum number of blocks that can be cached
+        :param max_size: int
+        """
+
+        with self._lock:
+            self._max_size = max(1, int(max_size))
+            while len(self._items) > self._max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all cached blocks and resets hit/miss counters
+        """
+
+        with self._lock:
+            self._items.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self):
+        """
+        Returns cache usage statistics
+        :return: dict
+        """
+
+        total = self._hits + self._misses
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'size': len(self._items),
+            'max_size': self._max_size,
+            'hit_rate': float(self._hits) / total if total else 0.0
+        }
+
+
+def get_highlight_cache():
+    """
+    Returns highlight cache shared by all highlighters of the process
+    :return: HighlightCache
+    """
+
+    global _HIGHLIGHT_CACHE
+    if _HIGHLIGHT_CACHE is None:
+        _HIGHLIGHT_CACHE = HighlightCache()
+
+    return _HIGHLIGHT_CACHE
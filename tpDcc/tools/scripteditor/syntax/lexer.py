@@ -0,0 +1,213 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains single pass lexer used to highlight Python code
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import re
+
+# Block states are encoded in a single integer. Lower bits store the kind of string that continues in the next
+# block and upper bits store the depth of the brackets that are still open at the end of the block. Only the
+# tokenize engine needs bracket depth: regex engine states store the string bits only, so typing a bracket does not
+# change the state of the block and does not force Qt to rehighlight the rest of the document
+STATE_NONE = 0
+STATE_TRIPLE_SINGLE = 1
+STATE_TRIPLE_DOUBLE = 2
+STATE_SINGLE = 3
+STATE_DOUBLE = 4
+STRING_STATE_MASK = 0x7
+BRACKET_SHIFT = 3
+MAX_BRACKET_DEPTH = 255
+
+STRING_PREFIX = r'(?:[rRuUbBfF]{1,2})?'
+TRIPLE_DELIMITERS = {"'''": STATE_TRIPLE_SINGLE, '"""': STATE_TRIPLE_DOUBLE}
+STRING_KEYS = {
+    STATE_TRIPLE_SINGLE: 'docstring', STATE_TRIPLE_DOUBLE: 'docstring', STATE_SINGLE: 'string', STATE_DOUBLE: 'string'}
+STRING_END = {
+    STATE_TRIPLE_SINGLE: re.compile(r"(?:\\.|[^\\])*?(?P<close>''')"),
+    STATE_TRIPLE_DOUBLE: re.compile(r'(?:\\.|[^\\])*?(?P<close>""")'),
+    STATE_SINGLE: re.compile(r"[^'\\]*(?:\\.[^'\\]*)*(?:(?P<close>')|(?P<cont>\\)?$)"),
+    STATE_DOUBLE: re.compile(r'[^"\\]*(?:\\.[^"\\]*)*(?:(?P<close>")|(?P<cont>\\)?$)')
+}
+OPEN_BRACKETS = '([{'
+CLOSE_BRACKETS = ')]}'
+
+# Lines starting with these statements at column 0 are never inside brackets. They are used to recover from
+# unbalanced brackets, so an unclosed bracket only affects the state of the blocks of its own top level statement
+RESYNC_RE = re.compile(r'(?:def|class|import|from)\b|@')
+
+
+def make_state(string_state=STATE_NONE, bracket_depth=0):
+    """
+    Returns block state that represents the given lexer status
+    :param string_state: int, kind of string that continues in the next block
+    :param bracket_depth: int, number of brackets that are still open
+    :return: int
+    """
+
+    return string_state | (min(bracket_depth, MAX_BRACKET_DEPTH) << BRACKET_SHIFT)
+
+
+def split_state(state):
+    """
+    Returns the lexer status represented by the given block state
+    :param state: int, block state. Negative states (blocks without state) are considered as STATE_NONE
+    :return: tuple(int, int), kind of string that continues in the block and number of open brackets
+    """
+
+    if state is None or state < 0:
+        return STATE_NONE, 0
+
+    return state & STRING_STATE_MASK, state >> BRACKET_SHIFT
+
+
+class PythonLexer(object):
+    """
+    Lexer that classifies all the tokens of a block of Python code in a single left-to-right scan.
+    All the rules of the syntax table are compiled into one regular expression alternation, so the cost of
+    lexing a block scales with its length and not with the number of rules.
+    """
+
+    # Name of the highlighting engine implemented by the lexer
+    ENGINE = 'regex'
+
+    def __init__(self, syntax):
+        super(PythonLexer, self).__init__()
+
+        self._words = dict()
+        for key, syntax_key in (
+                ('keywords', 'keywords'), ('boolean', 'boolean'), ('definition', 'definition'), ('extra', 'extras')):
+            for word in syntax.get(syntax_key, list()):
+                self._words[word] = key
+
+        braces = self._get_char_class(syntax.get('braces', list()))
+        operators = self._get_char_class(list(syntax.get('operators', list())) + list('~!@$%^&*+='))
+        for char in braces:
+            operators = operators.replace(char, '')
+        self._braces = braces
+        self._operators = operators
+
+        self._token_re = re.compile(
+            r'(?P<comment>#.*)'
+            r'|(?P<triple>' + STRING_PREFIX + r'(?:\'\'\'|"""))'
+            r'|(?P<string>' + STRING_PREFIX +
+            r'(?:"[^"\\]*(?:\\.[^"\\]*)*(?:"|(?P<double_cont>\\)?$)'
+            r'|\'[^\'\\]*(?:\\.[^\'\\]*)*(?:\'|(?P<single_cont>\\)?$)))'
+            r'|(?P<word>\w+)'
+            r'|(?P<brace>[' + re.escape(braces) + r'])'
+            r'|(?P<operator>[' + re.escape(operators) + r'])')
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def lex(self, text, state=STATE_NONE):
+        """
+        Classifies the tokens of the given block of text
+        :param text: str, text of the block to lex
+        :param state: int, state of the lexer at the end of the previous block
+        :return: tuple(list(tuple(int, int, str)), int), list of (start, length, color key) ranges for all the
+            non default tokens of the block and the state of the lexer at the end of the block
+        """
+
+        ranges = list()
+        pos = 0
+        length = len(text)
+        string_state = split_state(state)[0]
+
+        if string_state:
+            key = STRING_KEYS[string_state]
+            pos, string_state = self._match_string_end(text, 0, string_state)
+            ranges.append((0, pos, key))
+            if string_state:
+                return ranges, make_state(string_state)
+
+        token_re = self._token_re
+        while pos < length:
+            match = token_re.search(text, pos)
+            if not match:
+                break
+            kind = match.lastgroup
+            start, pos = match.span()
+            if kind == 'word':
+                key = self._classify_word(match.group(kind), text[pos:pos + 1] == '(')
+                if key:
+                    ranges.append((start, pos - start, key))
+            elif kind == 'brace':
+                ranges.append((start, 1, kind))
+            elif kind == 'triple':
+                pos, string_state = self._match_string_end(text, pos, TRIPLE_DELIMITERS[text[pos - 3:pos]])
+                ranges.append((start, pos - start, 'docstring'))
+            else:
+                if kind == 'string':
+                    if match.group('double_cont'):
+                        string_state = STATE_DOUBLE
+                    elif match.group('single_cont'):
+                        string_state = STATE_SINGLE
+                ranges.append((start, pos - start, kind))
+
+        return ranges, make_state(string_state)
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _get_char_class(self, symbols):
+        """
+        Internal function that returns a string with all the unique characters of the given syntax symbols
+        :param symbols: list(str), symbols as defined in syntax table (they can be escaped)
+        :return: str
+        """
+
+        chars = list()
+        for symbol in symbols:
+            for char in symbol.replace('\\', ''):
+                if char not in chars:
+                    chars.append(char)
+
+        return ''.join(chars)
+
+    def _classify_word(self, word, is_call=False):
+        """
+        Internal function that returns the color key of the given word
+        :param word: str, word to classify
+        :param is_call: bool, whether or not word is followed by a call parenthesis
+        :return: str or None
+        """
+
+        if word.isdigit():
+            return 'digits'
+        key = self._words.get(word)
+        if key in ('extra', 'definition'):
+            return key
+        if is_call:
+            return 'methods'
+
+        return key
+
+    def _match_string_end(self, text, pos, state):
+        """
+        Internal function that looks for the end of a string that started in a previous block or position
+        :param text: str, text of the block
+        :param pos: int, position where the search starts
+        :param state: int, string state that represents the delimiter we are looking for
+        :return: tuple(int, int), end position of the string and string state of the lexer after the string
+        """
+
+        match = STRING_END[state].match(text, pos)
+        if not match:
+            return len(text), state
+        if match.group('close'):
+            return match.end(), STATE_NONE
+        if match.groupdict().get('cont'):
+            return match.end(), state
+
+        return match.end(), STATE_NONE
@@ -14,10 +14,15 @@ __email__ = "tpovedatd@gmail.com"
 
 import os
 import re
+import time
+import weakref
+from collections import OrderedDict
 
-from Qt.QtCore import QRegExp
+from Qt.QtCore import Signal, QObject, QTimer
 from Qt.QtGui import QFont, QColor, QBrush, QTextCharFormat, QSyntaxHighlighter
 
+from tpDcc.tools.scripteditor.syntax import lexer, tokenizer, cache, worker
+
 EditorStyle = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources', 'styles', 'completer.css')
 if not os.path.exists(EditorStyle):
     EditorStyle = None
@@ -45,6 +50,16 @@ DefaultColors = dict(
     default=(210, 210, 210)
 )
 
+DEFAULT_ENGINE = 'regex'
+Engines = {
+    'regex': lexer.PythonLexer,
+    'tokenize': tokenizer.TokenizeLexer
+}
+
+_LEXERS = dict()
+_FORMAT_REGISTRY = None
+_HIGHLIGHTER_REGISTRY = None
+
 Syntax = {"extension": [
     "py", "pyw"],
 
@@ -176,6 +191,74 @@ Syntax = {"extension": [
 }
 
 
+def get_lexer(engine=None):
+    """
+    Returns the lexer used to highlight Python code. Lexers are only created once and shared by all highlighters
+    :param engine: str, name of the highlighting engine to use ('regex' or 'tokenize')
+    :return: lexer.PythonLexer
+    """
+
+    engine = engine if engine in Engines else DEFAULT_ENGINE
+    python_lexer = _LEXERS.get(engine)
+    if python_lexer is None:
+        python_lexer = _LEXERS[engine] = Engines[engine](Syntax)
+
+    return python_lexer
+
+
+def get_format_registry():
+    """
+    Returns the format registry shared by all highlighters
+    :return: FormatRegistry
+    """
+
+    global _FORMAT_REGISTRY
+    if _FORMAT_REGISTRY is None:
+        _FORMAT_REGISTRY = FormatRegistry()
+
+    return _FORMAT_REGISTRY
+
+
+def get_highlighter_registry():
+    """
+    Returns the registry that keeps track of all the highlighters of the process
+    :return: HighlighterRegistry
+    """
+
+    global _HIGHLIGHTER_REGISTRY
+    if _HIGHLIGHTER_REGISTRY is None:
+        _HIGHLIGHTER_REGISTRY = HighlighterRegistry()
+
+    return _HIGHLIGHTER_REGISTRY
+
+
+def get_theme_id(colors):
+    """
+    Returns an unique hashable identifier for the given theme colors
+    :param colors: dict
+    :return: tuple
+    """
+
+    return tuple(sorted((k, tuple(v)) for k, v in colors.items()))
+
+
+def get_style(color, bold=False):
+    """
+    Returns text format for the given color
+    :param color: tuple(int, int, int) or list(int, int, int)
+    :param bold: bool
+    :return: QTextCharFormat
+    """
+
+    brush = QBrush(QColor(*color))
+    f = QTextCharFormat()
+    if bold:
+        f.setFontWeight(QFont.Bold)
+    f.setForeground(brush)
+
+    return f
+
+
 def get_colors(theme=False, settings=None):
     if not theme:
         theme = settings.get('theme') if settings else 'default'
@@ -222,8 +305,158 @@ def apply_color_to_editor_style(colors=None):
     return ''
 
 
+class FormatRegistry(object):
+    """
+    Registry that builds the text formats of all color keys once per theme. Formats are shared by all the
+    highlighters, so they are only created again when a new theme is used
+    """
+
+    BOLD_KEYS = ('keywords', 'definition')
+    FORMAT_KEYS = (
+        'default', 'keywords', 'definition', 'digits', 'operator', 'extra', 'methods', 'comment', 'string',
+        'docstring', 'boolean', 'brace')
+
+    # Maximum number of themes whose formats are kept (previewing colors creates a new theme per color change)
+    MAX_THEMES = 8
+
+    def __init__(self):
+        super(FormatRegistry, self).__init__()
+
+        self._themes = OrderedDict()
+
+    def get_formats(self, colors):
+        """
+        Returns formats for the given theme colors
+        :param colors: dict
+        :return: dict(str, QTextCharFormat)
+        """
+
+        theme_id = get_theme_id(colors)
+        formats = self._themes.pop(theme_id, None)
+        if formats is None:
+            formats = self._build_formats(colors)
+        self._themes[theme_id] = formats
+        while len(self._themes) > self.MAX_THEMES:
+            self._themes.popitem(last=False)
+
+        return formats
+
+    def clear(self):
+        """
+        Removes all cached formats
+        """
+
+        self._themes.clear()
+
+    def _build_formats(self, colors):
+        """
+        Internal function that creates the text formats of all color keys
+        :param colors: dict
+        :return: dict(str, QTextCharFormat)
+        """
+
+        return {key: get_style(colors[key], key in self.BOLD_KEYS) for key in self.FORMAT_KEYS}
+
+
+class HighlighterRegistry(QObject):
+    """
+    Keeps track of all the highlighters of the process, so theme changes can be applied to all of them in a
+    single coalesced pass. Highlighters of visible editors are updated first
+    """
+
+    # Minimum time (in milliseconds) between two consecutive theme updates when throttling
+    THROTTLE_TIME = 100
+
+    def __init__(self, parent=None):
+        super(HighlighterRegistry, self).__init__(parent)
+
+        self._highlighters = weakref.WeakSet()
+        self._pending_colors = None
+        self._throttle_timer = QTimer(self)
+        self._throttle_timer.setSingleShot(True)
+        self._throttle_timer.timeout.connect(self._on_throttle_timeout)
+
+    def register(self, highlighter):
+        """
+        Registers given highlighter
+        :param highlighter: PythonHiglighter
+        """
+
+        self._highlighters.add(highlighter)
+
+    def highlighters(self):
+        """
+        Returns all registered highlighters that are still attached to a document
+        :return: list(PythonHiglighter)
+        """
+
+        result = list()
+        for highlighter in list(self._highlighters):
+            try:
+                if highlighter.document():
+                    result.append(highlighter)
+            except RuntimeError:
+                continue
+
+        return result
+
+    def apply_colors(self, colors, throttle=True):
+        """
+        Applies given theme colors to all registered highlighters
+        :param colors: dict
+        :param throttle: bool, if True, colors are applied at most once every THROTTLE_TIME milliseconds and
+            only the last colors received while throttling are applied
+        """
+
+        if throttle and self._throttle_timer.isActive():
+            self._pending_colors = colors
+            return
+
+        self._pending_colors = None
+        self._apply_colors(colors)
+        if throttle:
+            self._throttle_timer.start(self.THROTTLE_TIME)
+
+    def _apply_colors(self, colors):
+        """
+        Internal function that applies given colors to all the highlighters, visible ones first
+        :param colors: dict
+        """
+
+        for highlighter in sorted(self.highlighters(), key=lambda h: not h.is_visible()):
+            highlighter.set_colors(colors)
+
+    def _on_throttle_timeout(self):
+        """
+        Internal callback function that applies the last colors received while throttling
+        """
+
+        if self._pending_colors is None:
+            return
+
+        colors = self._pending_colors
+        self._pending_colors = None
+        self._apply_colors(colors)
+        self._throttle_timer.start(self.THROTTLE_TIME)
+
+
 class PythonHiglighter(QSyntaxHighlighter):
-    def __init__(self, document, colors=None):
+
+    blocksComputed = Signal(int, int, object)
+
+    # State of the blocks whose highlighting has been postponed in lazy mode
+    PENDING_STATE = -1
+
+    # Number of blocks considered visible until the editor reports its visible blocks
+    DEFAULT_VISIBLE_BLOCKS = 100
+
+    # Maximum time (in seconds) spent highlighting blocks in each idle chunk
+    CHUNK_TIME = 0.01
+
+    # Time (in milliseconds) we wait after a document change before resuming idle highlighting
+    CHUNK_DELAY = 50
+
+    def __init__(self, document, colors=None, lazy=False, engine=None, threaded=False):
         super(PythonHiglighter, self).__init__(document)
 
         if colors:
@@ -231,29 +464,33 @@ class PythonHiglighter(QSyntaxHighlighter):
         else:
             self._colors = get_colors()
 
-        self._tri_single = (QRegExp("'''"), 1, self.get_style(self._colors['docstring']))
-        self._tri_double = (QRegExp('"""'), 2, self.get_style(self._colors['docstring']))
-
-        rules = list()
-
-        # rules += [(r".*", 0, self.get_style(self._colors['default'], False))] # Defaults
-        rules += [('\\b%s\\b' % w, 0, self.get_style(self._colors['keywords'], True)) for w in
-                  Syntax['keywords']]  # Keywords
-        rules += [("\\b[A-Za-z0-9_]+(?=\\()", 0, self.get_style(self._colors['methods'], False))]  # Methods
-        rules += [(r'[~!@$%^&*()-+=]', 0, self.get_style(
-            self._colors['operator']))]  # for o in pythonSyntax.syntax['operators']]      # Operators
-        rules += [(r'%s' % b, 0, self.get_style(self._colors['brace'])) for b in Syntax['braces']]  # Braces
-        rules += [("\\b%s\\b" % b, 0, self.get_style(self._colors['definition'], True)) for b in
-                  Syntax['definition']]  # Definition
-        rules += [("\\b%s\\b" % b, 0, self.get_style(self._colors['extra'])) for b in
-                  Syntax['extras']]  # Extra
-        # rules += [(r'#([.*]+|[^#]*)', 0, self.get_style(design.comment))] # Comment
-        rules += [(r"\b[\d]+\b", 0, self.get_style(self._colors['digits']))]  # Digits
-        # ("(?:^|[^A-Za-z])([\d|\.]*\d+)", 0, self.get_style(design.digits)),
-        rules += [(r'[ru]?"[^"\\]*(\\.[^"\\]*)*"', 0, self.get_style(self._colors['string']))]  # Double-quoted string
-        rules += [(r"[ru]?'[^'\\]*(\\.[^'\\]*)*'", 0, self.get_style(self._colors['string']))]  # Single-quoted string
-
-        self.rules = [(QRegExp(pat), index, fmt) for (pat, index, fmt) in rules]
+        self._lexer = get_lexer(engine)
+        self._cache = cache.get_highlight_cache()
+        self._formats = get_format_registry().get_formats(self._colors)
+
+        self._lazy = lazy
+        self._threaded = lazy and threaded
+        self._computed = None
+        self._visible_blocks = (0, self.DEFAULT_VISIBLE_BLOCKS)
+        self._highlighted_until = 0
+        self._block_count = 0
+        self._rehighlighting = False
+        self._has_pending_changes = False
+        self._chunk_timer = QTimer(self)
+        self._chunk_timer.setSingleShot(True)
+        self._chunk_timer.timeout.connect(self._on_highlight_chunk)
+        self.blocksComputed.connect(self._on_blocks_computed)
+
+        if self._lazy and self.document():
+            self._block_count = self.document().blockCount()
+            self.document().contentsChange.connect(self._on_contents_change)
+            self._chunk_timer.start(0)
+
+        get_highlighter_registry().register(self)
+
+    @property
+    def engine(self):
+        return self._lexer.ENGINE
 
     def highlightBlock(self, text):
         """
@@ -261,86 +498,299 @@ class PythonHiglighter(QSyntaxHighlighter):
         :param text: str
         """
 
-        def_format = self.get_style(self._colors['default'])
-        self.setFormat(0, len(text), def_format)
-
-        for expr, nth, fmt in self.rules:
-            index = expr.indexIn(text, 0)
-            while index > 0:
-                index = expr.pos(nth)
-                length = len(expr.cap(nth))
-                self.setFormat(index, length, fmt)
-                index = expr.indexIn(text, index + length)
-
-        strings = re.findall(r'(".*?")|(\'.*?\')', text)
-        if '#' in text:
-            copy_text = text
-            if strings:
-                pat = list()
-                for s in strings:
-                    for match in s:
-                        if match:
-                            pat.append(match)
-                for s in pat:
-                    copy_text = copy_text.replace(s, '_' * len(s))
-            if '#' in copy_text:
-                index = copy_text.index('#')
-                length = len(copy_text) - index
-                self.setFormat(index, length, self.get_style(self._colors['comment']))
-
-        self.setCurrentBlockState(0)
-
-        in_multiline = self.match_multiline(text, *self._tri_single)
-        if not in_multiline:
-            in_multiline = self.match_multiline(text, *self._tri_double)
-
-    def match_multiline(self, text, delimiter, in_state, style):
-        """
-        Do highlighting of multi-line strings
-        :param text: str
-        :param delimiter: QRegExp, delimiter for triple-sinqle or triple-double quotes
-        :param in_state: int, unique integer to represent the corresponding state changes when inside delimiter strings
-        :param style: str
-        :return: bool, True if we're still in a multi-line string or False otherwise
-        """
+        if self._lazy and not self._is_block_ready(self.currentBlock().blockNumber()):
+            self.setCurrentBlockState(self.PENDING_STATE)
+            if not self._rehighlighting:
+                self._has_pending_changes = True
+            return
 
-        # If inside triple-single quotes, start at 0
-        if self.previousBlockState() == in_state:
-            start = 0
-            add = 0
-            # Otherwise, look for the delimiter on this line
-        else:
-            start = delimiter.indexIn(text)
-            # Move past this match
-            add = delimiter.matchedLength()
-
-        # As long as there's a delimiter match on this line...
-        while start >= 0:
-
-            # Look for the ending delimiter and check if the delimiter ends in this line or not
-            end = delimiter.indexIn(text, start + add)
-            if end >= add:
-                length = end - start + add + delimiter.matchedLength()
-                self.setCurrentBlockState(0)
-            # No; multi-line string
-            else:
-                self.setCurrentBlockState(in_state)
-                length = len(text) - start + add
-
-            # Apply formatting and look for next match
-            self.setFormat(start, length, style)
-            start = delimiter.indexIn(text, start + length)
-
-        if self.currentBlockState() == in_state:
-            return True
+        formats = self._formats
+        self.setFormat(0, len(text), formats['default'])
+
+        computed = self._get_computed_block(text) if self._computed else None
+        if computed:
+            ranges, state = computed
         else:
-            return False
+            previous_state = max(lexer.STATE_NONE, self.previousBlockState())
+            ranges, state = self._cache.lex(self._lexer, text, previous_state)
+        for start, length, key in ranges:
+            self.setFormat(start, length, formats[key])
+
+        self.setCurrentBlockState(state)
 
     def get_style(self, color, bold=False):
-        brush = QBrush(QColor(*color))
-        f = QTextCharFormat()
-        if bold:
-            f.setFontWeight(QFont.Bold)
-        f.setForeground(brush)
+        return get_style(color, bold)
+
+    def set_colors(self, colors=None):
+        """
+        Updates the colors used by the highlighter without creating a new one. Text formats are taken from the
+        shared format registry and document is rehighlighted visible blocks first
+        :param colors: dict or None
+        """
+
+        colors = colors or get_colors()
+        formats = get_format_registry().get_formats(colors)
+        if formats is self._formats:
+            return
+
+        self._colors = colors
+        self._formats = formats
+        self.rehighlight_visible_first()
+
+    def rehighlight_visible_first(self):
+        """
+        Rehighlights the whole document. In lazy mode, only visible blocks are highlighted immediately and the
+        rest of the document is highlighted when the application is idle
+        """
+
+        document = self.document()
+        if not document:
+            return
+        if not self._lazy:
+            self.rehighlight()
+            return
+
+        if self._threaded:
+            self._computed = None
+            worker.get_highlight_worker().cancel(id(self))
+        self._highlighted_until = 0
+        self._has_pending_changes = False
+        if self.is_visible():
+            self._rehighlight_blocks(*self._visible_blocks)
+        self._chunk_timer.start(0)
+
+    def is_visible(self):
+        """
+        Returns whether or not the editor this highlighter is attached to is visible
+        :return: bool
+        """
+
+        editor = self.parent()
+        return bool(editor and hasattr(editor, 'isVisible') and editor.isVisible())
+
+    def is_threaded(self):
+        """
+        Returns whether or not highlighter computes pending blocks outside GUI thread
+        :return: bool
+        """
+
+        return self._threaded
+
+    def is_lazy(self):
+        """
+        Returns whether or not highlighter highlights document blocks lazily
+        :return: bool
+        """
+
+        return self._lazy
+
+    def set_visible_blocks(self, first, last):
+        """
+        Sets the range of document blocks that are visible in the editor. In lazy mode, visible blocks are
+        highlighted first and the rest of the document is highlighted in small chunks when the application is idle
+        :param first: int, number of the first visible block
+        :param last: int, number of the last visible block
+        """
+
+        if (first, last) == self._visible_blocks:
+            return
+        self._visible_blocks = (first, last)
+        if not self._lazy or not self.document():
+            return
+
+        self._rehighlight_blocks(max(first, self._highlighted_until), last)
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _is_block_ready(self, block_number):
+        """
+        Internal function that returns whether or not given block can be highlighted in lazy mode
+        :param block_number: int
+        :return: bool
+        """
+
+        first, last = self._visible_blocks
+        return block_number < self._highlighted_until or first <= block_number <= last
+
+    def _rehighlight_blocks(self, first, last):
+        """
+        Internal function that rehighlights the given range of blocks
+        :param first: int, number of the first block to rehighlight
+        :param last: int, number of the last block to rehighlight
+        """
+
+        block = self.document().findBlockByNumber(first)
+        self._rehighlighting = True
+        try:
+            while block.isValid() and block.blockNumber() <= last:
+                self.rehighlightBlock(block)
+                block = block.next()
+        finally:
+            self._rehighlighting = False
+
+    def _get_block_texts(self, document):
+        """
+        Internal function that returns a snapshot of the texts of all the blocks of the given document
+        :param document: QTextDocument
+        :return: list(str)
+        """
+
+        texts = document.toPlainText().split('\n')
+        if len(texts) == document.blockCount():
+            return texts
+
+        texts = list()
+        block = document.begin()
+        while block.isValid():
+            texts.append(block.text())
+            block = block.next()
+
+        return texts
+
+    def _get_computed_block(self, text):
+        """
+        Internal function that returns ranges and state of the current block computed in background
+        :param text: str, text of the current block
+        :return: tuple(tuple(tuple(int, int, str)), int) or None
+        """
+
+        revision, first_block, results = self._computed
+        index = self.currentBlock().blockNumber() - first_block
+        if revision != self.document().revision() or not 0 <= index < len(results):
+            return None
+        computed_text, ranges, state = results[index]
+        if computed_text != text:
+            return None
+
+        return ranges, state
+
+    def _has_computed_blocks(self, document):
+        """
+        Internal function that returns whether or not there are valid background results for pending blocks
+        :param document: QTextDocument
+        :return: bool
+        """
+
+        if not self._computed:
+            return False
+
+        revision, first_block, results = self._computed
+        return revision == document.revision() and first_block <= self._highlighted_until < first_block + len(
+            results)
+
+    def _compute_pending_blocks(self, document):
+        """
+        Internal function that sends a snapshot of all the pending blocks to the highlight worker, so their ranges
+        are computed outside GUI thread
+        :param document: QTextDocument
+        """
+
+        self._computed = None
+        first_block = self._highlighted_until
+        block = document.findBlockByNumber(first_block)
+        if not block.isValid():
+            return
+
+        previous_block = block.previous()
+        state = max(lexer.STATE_NONE, previous_block.userState()) if previous_block.isValid() else lexer.STATE_NONE
+        texts = self._get_block_texts(document)[first_block:]
+        job = worker.HighlightJob(
+            id(self), document.revision(), self._lexer, texts, state, self._on_worker_finished, first_block)
+        worker.get_highlight_worker().submit(job)
+
+    def _on_worker_finished(self, revision, first_block, results):
+        """
+        Internal function that is called from highlight worker thread when pending blocks are computed
+        Results are sent to GUI thread through a queued signal
+        :param revision: int
+        :param first_block: int
+        :param results: list
+        """
+
+        try:
+            self.blocksComputed.emit(revision, first_block, results)
+        except RuntimeError:
+            pass
+
+    # =================================================================================================================
+    # CALLBACKS
+    # =================================================================================================================
+
+    def _on_contents_change(self, position, removed, added):
+        """
+        Internal callback function that is called each time document contents change
+        Pending idle highlighting is cancelled and resumed once the document stops changing
+        :param position: int
+        :param removed: int
+        :param added: int
+        """
+
+        document = self.document()
+        if not document or self._rehighlighting:
+            return
+
+        if self._threaded:
+            self._computed = None
+            worker.get_highlight_worker().cancel(id(self))
+
+        # Changed blocks that were not visible while Qt reformatted them are left pending (pasted text, for
+        # example), so in that case idle highlighting must be resumed from the first changed block
+        block_count = document.blockCount()
+        changed_block = document.findBlock(position).blockNumber()
+        if self._has_pending_changes:
+            self._highlighted_until = min(self._highlighted_until, changed_block)
+        elif changed_block < self._highlighted_until:
+            self._highlighted_until = max(0, self._highlighted_until + block_count - self._block_count)
+        self._has_pending_changes = False
+        self._block_count = block_count
+
+        self._chunk_timer.start(self.CHUNK_DELAY)
+
+    def _on_highlight_chunk(self):
+        """
+        Internal callback function that highlights the next chunk of pending blocks
+        """
+
+        document = self.document()
+        if not document:
+            return
+
+        if self._threaded and not self._has_computed_blocks(document):
+            self._compute_pending_blocks(document)
+            return
+
+        block = document.findBlockByNumber(self._highlighted_until)
+        end_time = time.time() + self.CHUNK_TIME
+        self._rehighlighting = True
+        try:
+            while block.isValid():
+                self._highlighted_until = block.blockNumber() + 1
+                self.rehighlightBlock(block)
+                block = block.next()
+                if time.time() > end_time:
+                    break
+        finally:
+            self._rehighlighting = False
+
+        if block.isValid():
+            self._chunk_timer.start(0)
+        else:
+            self._computed = None
+
+    def _on_blocks_computed(self, revision, first_block, results):
+        """
+        Internal callback function that is called in GUI thread when background highlighting results are ready
+        Results computed for an old revision of the document are dropped
+        :param revision: int
+        :param first_block: int
+        :param results: list
+        """
+
+        document = self.document()
+        if not document or revision != document.revision() or first_block != self._highlighted_until:
+            return
 
-        return f
+        self._computed = (revision, first_block, results)
+        self._chunk_timer.start(0)
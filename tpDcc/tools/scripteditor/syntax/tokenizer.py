@@ -0,0 +1,158 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains lexer based on Python tokenize module used to highlight Python code
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import io
+import token
+import tokenize
+
+from tpDcc.tools.scripteditor.syntax import lexer
+
+STRING_DELIMITERS = {
+    lexer.STATE_TRIPLE_SINGLE: "'''", lexer.STATE_TRIPLE_DOUBLE: '"""', lexer.STATE_SINGLE: "'",
+    lexer.STATE_DOUBLE: '"'
+}
+STRING_TOKENS = tuple(
+    getattr(token, name) for name in ('STRING', 'FSTRING_START', 'FSTRING_MIDDLE', 'FSTRING_END')
+    if hasattr(token, name))
+
+
+class TokenizeLexer(lexer.PythonLexer):
+    """
+    Lexer that uses Python tokenize module to classify the tokens of a block of Python code. It gives exact
+    lexing of f-strings, bytes and numbers and returns the same color keys as PythonLexer
+    """
+
+    ENGINE = 'tokenize'
+
+    # =================================================================================================================
+    # OVERRIDES
+    # =================================================================================================================
+
+    def lex(self, text, state=lexer.STATE_NONE):
+        """
+        Overrides base lex function to classify block tokens using tokenize module
+        :param text: str, text of the block to lex
+        :param state: int, state of the lexer at the end of the previous block
+        :return: tuple(tuple(tuple(int, int, str)), int)
+        """
+
+        return self._tokenize(text, state)
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _tokenize(self, text, state):
+        """
+        Internal function that lexes given block of text using tokenize module
+        Strings and brackets that are opened in previous blocks are prepended to the text before tokenizing it
+        :param text: str, text of the block to lex
+        :param state: int, state of the lexer at the end of the previous block
+        :return: tuple(tuple(tuple(int, int, str)), int)
+        """
+
+        string_state, depth = lexer.split_state(state)
+        if not string_state and depth and lexer.RESYNC_RE.match(text):
+            depth = 0
+
+        prefix = '(' * depth + STRING_DELIMITERS.get(string_state, '')
+        body = text
+        if not prefix:
+            body = text.lstrip()
+        shift = len(text) - len(body) - len(prefix)
+        source = prefix + body
+
+        tokens = list()
+        string_state = lexer.STATE_NONE
+        try:
+            for tokenized in tokenize.generate_tokens(io.StringIO(source + '\n').readline):
+                if tokenized[2][0] > 1:
+                    break
+                tokens.append(tokenized)
+        except tokenize.TokenError as exc:
+            message, (row, column) = exc.args
+            if row == 1 and 'string' in message:
+                string_state = self._get_string_state(source, column)
+                tokens.append((token.STRING, source[column:], (1, column), (1, len(source)), source))
+        except (SyntaxError, ValueError):
+            return super(TokenizeLexer, self).lex(text, state)
+
+        ranges = list()
+        depth = 0
+        for i, (token_type, token_string, (_, start), (_, end), _) in enumerate(tokens):
+            key = None
+            if token_type in STRING_TOKENS:
+                key = self._get_string_key(token_string)
+            elif token_type == token.COMMENT:
+                key = 'comment'
+            elif token_type == token.NUMBER:
+                key = 'digits'
+            elif token_type == token.NAME:
+                next_token = tokens[i + 1] if i + 1 < len(tokens) else None
+                is_call = bool(next_token) and next_token[1] == '(' and next_token[2][1] == end
+                key = self._classify_word(token_string, is_call)
+            elif token_type == token.OP:
+                if token_string in self._braces:
+                    key = 'brace'
+                    if token_string in lexer.OPEN_BRACKETS:
+                        depth += 1
+                    elif token_string in lexer.CLOSE_BRACKETS and depth:
+                        depth -= 1
+                elif all(char in self._operators for char in token_string):
+                    key = 'operator'
+            elif token_type == token.ERRORTOKEN:
+                if token_string.strip() in ('"', "'"):
+                    ranges.append((max(0, start + shift), len(text) - max(0, start + shift), 'string'))
+                    break
+                elif token_string in self._operators:
+                    key = 'operator'
+            if not key:
+                continue
+            start = max(0, start + shift)
+            end = max(0, end + shift)
+            if end > start:
+                ranges.append((start, end - start, key))
+
+        return tuple(ranges), lexer.make_state(string_state, depth)
+
+    def _get_string_key(self, token_string):
+        """
+        Internal function that returns the color key of the given string token
+        :param token_string: str
+        :return: str
+        """
+
+        quotes = token_string.lstrip('rRuUbBfF')
+        if quotes[:3] in ("'''", '"""'):
+            return 'docstring'
+
+        return 'string'
+
+    def _get_string_state(self, source, column):
+        """
+        Internal function that returns the state of a string that is not closed in the block
+        :param source: str, tokenized source
+        :param column: int, column where the string starts
+        :return: int
+        """
+
+        quotes = source[column:].lstrip('rRuUbBfF')
+        if quotes[:3] == "'''":
+            return lexer.STATE_TRIPLE_SINGLE
+        elif quotes[:3] == '"""':
+            return lexer.STATE_TRIPLE_DOUBLE
+        elif quotes[:1] == "'":
+            return lexer.STATE_SINGLE
+
+        return lexer.STATE_DOUBLE
@@ -0,0 +1,171 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains background worker used to compute highlighting ranges outside GUI thread
+"""
+
+from __future__ import print_function, division, absolute_import
+
+__author__ = "Tomas Poveda"
+__license__ = "MIT"
+__maintainer__ = "Tomas Poveda"
+__email__ = "tpovedatd@gmail.com"
+
+import logging
+import threading
+from collections import OrderedDict
+
+from tpDcc.tools.scripteditor.syntax import lexer, cache
+
+logger = logging.getLogger('tpDcc-tools-scripteditor')
+
+_HIGHLIGHT_WORKER = None
+
+
+def compute_blocks(python_lexer, texts, state=lexer.STATE_NONE, highlight_cache=None, cancelled=None):
+    """
+    Computes color ranges of consecutive blocks of text. This function does not use Qt, so it can be safely
+    executed outside GUI thread
+    :param python_lexer: PythonLexer, lexer used to classify block tokens
+    :param texts: list(str), texts of consecutive blocks
+    :param state: int, state of the block previous to the first one
+    :param highlight_cache: HighlightCache or None, cache used to reuse already lexed blocks
+    :param cancelled: threading.Event or None, if given and set, computation stops as soon as possible
+    :return: list(tuple(str, tuple(tuple(int, int, str)), int)) or None, (text, ranges, state) for each
+        computed block or None if the computation was cancelled
+    """
+
+    highlight_cache = highlight_cache or cache.get_highlight_cache()
+    results = list()
+    for i, text in enumerate(texts):
+        if cancelled is not None and not i % 256 and cancelled.is_set():
+            return None
+        ranges, state = highlight_cache.lex(python_lexer, text, state)
+        results.append((text, ranges, state))
+
+    return results
+
+
+class HighlightJob(object):
+    def __init__(self, owner_id, revision, python_lexer, texts, state, callback, first_block=0):
+        self.owner_id = owner_id
+        self.revision = revision
+        self.lexer = python_lexer
+        self.texts = texts
+        self.state = state
+        self.callback = callback
+        self.first_block = first_block
+        self.cancelled = threading.Event()
+
+
+class HighlightWorker(object):
+    """
+    Background thread that computes color ranges of document blocks. Each owner (highlighter) can only have one
+    job queued: submitting a new job cancels the previous one, so stale snapshots are never computed
+    """
+
+    def __init__(self):
+        super(HighlightWorker, self).__init__()
+
+        self._jobs = OrderedDict()
+        self._current_job = None
+        self._condition = threading.Condition()
+        self._thread = None
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def submit(self, job):
+        """
+        Queues given job. Pending or running jobs of the same owner are cancelled
+        :param job: HighlightJob
+        """
+
+        with self._condition:
+            self._cancel(job.owner_id)
+            self._jobs[job.owner_id] = job
+            self._start()
+            self._condition.notify()
+
+    def cancel(self, owner_id):
+        """
+        Cancels pending and running jobs of the given owner
+        :param owner_id: int
+        """
+
+        with self._condition:
+            self._cancel(owner_id)
+
+    def is_busy(self):
+        """
+        Returns whether or not worker is computing or has pending jobs
+        :return: bool
+        """
+
+        with self._condition:
+            return bool(self._jobs) or self._current_job is not None
+
+    # =================================================================================================================
+    # INTERNAL
+    # =================================================================================================================
+
+    def _start(self):
+        """
+        Internal function that starts worker thread if it is not already running
+        """
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=self._run, name='tpDcc-tools-scripteditor-highlighter')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _cancel(self, owner_id):
+        """
+        Internal function that cancels jobs of the given owner. Must be called with condition acquired
+        :param owner_id: int
+        """
+
+        job = self._jobs.pop(owner_id, None)
+        if job:
+            job.cancelled.set()
+        if self._current_job and self._current_job.owner_id == owner_id:
+            self._current_job.cancelled.set()
+
+    def _run(self):
+        """
+        Internal function that processes queued jobs
+        """
+
+        while True:
+            with self._condition:
+                while not self._jobs:
+                    self._condition.wait()
+                _, job = self._jobs.popitem(last=False)
+                self._current_job = job
+
+            try:
+                results = compute_blocks(job.lexer, job.texts, job.state, cancelled=job.cancelled)
+                if results is not None and not job.cancelled.is_set():
+                    job.callback(job.revision, job.first_block, results)
+            except Exception as exc:
+                logger.warning('Error while computing highlighting in background: {}'.format(exc))
+            finally:
+                with self._condition:
+                    self._current_job = None
+
+
+def get_highlight_worker():
+    """
+    Returns highlight worker shared by all highlighters of the process
+    :return: HighlightWorker
+    """
+
+    global _HIGHLIGHT_WORKER
+    if _HIGHLIGHT_WORKER is None:
+        _HIGHLIGHT_WORKER = HighlightWorker()
+
+    return _HIGHLIGHT_WORKER
@@ -13,45 +13,149 @@ __maintainer__ = "Tomas Poveda"
 __email__ = "tpovedatd@gmail.com"
 
 import re
+try:
+    from html import escape
+except ImportError:
+    from cgi import escape
 
-from Qt.QtCore import Qt
-from Qt.QtWidgets import QListWidget, QListWidgetItem
+from Qt.QtCore import Qt, QPoint, QAbstractListModel, QModelIndex
+from Qt.QtWidgets import QLabel, QListView, QAbstractItemView
 from Qt.QtGui import QFont, QFontMetrics
 
-from tpDcc import dcc
 from tpDcc.libs.python import osplatform
+from tpDcc.tools.scripteditor.core import nodetypes, scenenodes, stubindex, ranking, records, completion, diagnostics
 from tpDcc.tools.scripteditor.syntax import python
 
-NODE_TYPES_CACHE = list()
+# Maximum number of scene nodes found by the scene index that are ranked by PyNode completion
+MAX_NODE_COMPLETIONS = 500
 
 
-class ContextCompleter(object):
+class ContextCompleter(records.CompletionRecord):
+
+    __slots__ = ()
+
     def __init__(self, name, complete, end=None):
-        self.name = name
-        self.complete = complete
-        self.end = end
+        super(ContextCompleter, self).__init__(name, complete, kind='context', end_char=bool(end))
+
+
+class CompletionModel(QAbstractListModel, object):
+    """
+    List model of the completions listed by the completer. Data of the completions is only requested by the view
+    for visible rows, so the cost of updating the list does not depend on the number of completions
+    """
+
+    # Role used to store completion records (same role used by previous QListWidget items)
+    CompletionRole = 32
+
+    def __init__(self, parent=None):
+        super(CompletionModel, self).__init__(parent)
+
+        self._items = list()
+        self._extra_start = 0
+        self._extra_font = None
+        self._max_length = None
+
+    # =================================================================================================================
+    # OVERRIDES
+    # =================================================================================================================
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+
+        return len(self._items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._items):
+            return None
+
+        item = self._items[index.row()]
+        if role == Qt.DisplayRole:
+            return item.name
+        elif role == self.CompletionRole:
+            return item
+        elif role == Qt.FontRole and index.row() >= self._extra_start:
+            return self._extra_font
+
+        return None
+
+    # =================================================================================================================
+    # BASE
+    # =================================================================================================================
+
+    def set_extra_font(self, font):
+        """
+        Sets font used by extra completions
+        :param font: QFont
+        """
+
+        self._extra_font = font
+
+    def set_completions(self, lines=None, extra=None):
+        """
+        Replaces all completions of the model
+        :param lines: list or None
+        :param extra: list or None, completions listed after the other ones with extra font
+        """
+
+        self.beginResetModel()
+        try:
+            self._items = [x for x in lines if not x.name == 'mro'] if lines else list()
+            self._extra_start = len(self._items)
+            if extra:
+                self._items.extend(extra)
+            self._max_length = None
+        finally:
+            self.endResetModel()
+
+    def get_completion(self, row):
+        """
+        Returns completion of the given row
+        :param row: int
+        :return: object or None
+        """
 
+        return self._items[row] if 0 <= row < len(self._items) else None
 
-class ScriptCompleter(QListWidget, object):
+    def get_max_length(self):
+        """
+        Returns the length of the longest completion name. Value is cached until completions change
+        :return: int
+        """
+
+        if self._max_length is None:
+            self._max_length = max(len(item.name) for item in self._items) if self._items else 0
+
+        return self._max_length
+
+
+class ScriptCompleter(QListView, object):
     def __init__(self, parent=None, editor=None):
         super(ScriptCompleter, self).__init__(parent)
 
-        if dcc.is_maya():
-            import pymel.core as pm
-            global NODE_TYPES_CACHE
-            NODE_TYPES_CACHE = pm.allNodeTypes()
-
         self.setAlternatingRowColors(True)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.line_height = 18
         self.editor = editor
         self.setAttribute(Qt.WA_ShowWithoutActivating)
 
+        self._model = CompletionModel(parent=self)
+        self.setModel(self._model)
+        self._char_width = QFontMetrics(QFont('monospace', self.line_height, False)).width(' ')
+        self._update_extra_font()
+
         if osplatform.is_windows():
             self.setWindowFlags(Qt.FramelessWindowHint | Qt.Window)
         else:
             self.setWindowFlags(Qt.FramelessWindowHint | Qt.Window | Qt.WindowStaysOnTopHint)
 
-        self.itemDoubleClicked.connect(self._on_insert_selected)
+        self.doubleClicked.connect(self._on_insert_selected)
+
+    def paintEvent(self, event):
+        with diagnostics.get_diagnostics().timer(diagnostics.CompletionStages.RENDER):
+            super(ScriptCompleter, self).paintEvent(event)
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Escape:
@@ -61,21 +165,15 @@ class ScriptCompleter(QListWidget, object):
             self.apply_current_complete()
             return event
         elif event.key() == Qt.Key_Up:
-            sel = self.selectedItems()
-            if sel:
-                i = self.row(sel[0])
-                if i == 0:
-                    super(ScriptCompleter, self).keyPressEvent(event)
-                    self.setCurrentRow(self.count()-1)
-                    return
+            if self.currentRow() == 0:
+                super(ScriptCompleter, self).keyPressEvent(event)
+                self.setCurrentRow(self.count()-1)
+                return
         elif event.key() == Qt.Key_Down:
-            sel = self.selectedItems()
-            if sel:
-                i = self.row(sel[0])
-                if i+1 == self.count():
-                    super(ScriptCompleter, self).keyPressEvent(event)
-                    self.setCurrentRow(0)
-                    return
+            if self.count() and self.currentRow() + 1 == self.count():
+                super(ScriptCompleter, self).keyPressEvent(event)
+                self.setCurrentRow(0)
+                return
         elif event.key() == Qt.Key_Backspace:
             self.editor.setFocus()
             self.editor.activateWindow()
@@ -85,6 +183,31 @@ class ScriptCompleter(QListWidget, object):
 
         super(ScriptCompleter, self).keyPressEvent(event)
 
+    def count(self):
+        """
+        Returns the number of listed completions
+        :return: int
+        """
+
+        return self._model.rowCount()
+
+    def currentRow(self):
+        """
+        Returns the row of the current completion or -1 if there is no current completion
+        :return: int
+        """
+
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def setCurrentRow(self, row):
+        """
+        Sets the current completion
+        :param row: int
+        """
+
+        self.setCurrentIndex(self._model.index(row, 0))
+
     def send_text(self, comp):
         self.editor.insert_text(comp)
 
@@ -105,49 +228,123 @@ class ScriptCompleter(QListWidget, object):
     def update_style(self, colors=None):
         text = python.editor_style()
         self.setStyleSheet(text)
+        self._update_extra_font()
 
     def update_complete_list(self, lines=None, extra=None):
-        self.clear()
-        if lines or extra:
-            self.show_me()
-            if lines:
-                for i in [x for x in lines if not x.name == 'mro']:
-                    item = QListWidgetItem(i.name)
-                    item.setData(32, i)
-                    self.addItem(item)
-            if extra:
-                font = self.font()
-                font.setItalic(True)
-                font.setPointSize(font.pointSize()*0.8)
-                for e in extra:
-                    item = QListWidgetItem(e.name)
-                    item.setData(32, e)
-                    item.setFont(font)
-                    self.addItem(item)
-
-            font = QFont('monospace', self.line_height, False)
-            fm = QFontMetrics(font)
-            width = fm.width(' ') * max([len(x.name) for x in lines or extra]) + 40
+        """
+        Updates completions listed by the completer. Completions are listed in the given order, so they must be
+        already ranked
+        :param lines: list or None, completions
+        :param extra: list or None, secondary completions (listed after completions with an italic font)
+        """
 
+        self._model.set_completions(lines, extra)
+        if self._model.rowCount():
+            self.show_me()
+            width = self._char_width * self._model.get_max_length() + 40
             self.resize(max(250, width), 250)
             self.setCurrentRow(0)
         else:
             self.hide_me()
 
     def apply_current_complete(self):
-        i = self.selectedItems()
-        if i:
-            comp = i[0].data(32)
+        comp = self._model.get_completion(self.currentRow())
+        if comp:
             self.send_text(comp)
         self.hide_me()
 
-    def _on_insert_selected(self, item):
-        if item:
-            comp = item.data(32)
+    def _update_extra_font(self):
+        """
+        Internal function that updates the font used by extra completions
+        """
+
+        font = self.font()
+        font.setItalic(True)
+        font.setPointSize(font.pointSize()*0.8)
+        self._model.set_extra_font(font)
+
+    def _on_insert_selected(self, index):
+        comp = self._model.get_completion(index.row()) if index.isValid() else None
+        if comp:
             self.send_text(comp)
             self.hide_me()
 
 
+class SignatureTip(QLabel, object):
+    """
+    Tooltip that shows the signature of the callable being called, highlighting the current parameter
+    """
+
+    # Maximum number of doc lines shown under the signature
+    MAX_DOC_LINES = 8
+
+    def __init__(self, parent=None):
+        super(SignatureTip, self).__init__(parent)
+
+        self.setWindowFlags(Qt.ToolTip | Qt.FramelessWindowHint)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setTextFormat(Qt.RichText)
+        self.setMargin(4)
+
+        self._signature = None
+        self._pos = None
+
+    def show_signature(self, signature, pos):
+        """
+        Shows given signature above the given position. Doc is only shown if it is already loaded
+        :param signature: CallSignature
+        :param pos: QPoint, global position
+        """
+
+        self._signature = signature
+        self._pos = pos
+        self.setText(self._get_html(signature))
+        self.adjustSize()
+        self.move(pos - QPoint(0, self.height()))
+        self.show()
+
+    def update_doc(self, signature):
+        """
+        Shows the doc of the given signature, if it is the signature shown by the tooltip
+        :param signature: CallSignature
+        """
+
+        if signature is not self._signature or not self.isVisible():
+            return
+
+        self.show_signature(signature, self._pos)
+
+    def hide_me(self):
+        self._signature = None
+        self.hide()
+
+    def update_style(self, colors=None):
+        self.setStyleSheet(python.editor_style())
+
+    def _get_html(self, signature):
+        """
+        Internal function that returns the rich text of the given signature
+        :param signature: CallSignature
+        :return: str
+        """
+
+        if signature.params:
+            params = list()
+            for i, param in enumerate(signature.params):
+                param = escape(param)
+                params.append('<b><u>{}</u></b>'.format(param) if i == signature.index else param)
+            label = '{}({})'.format(escape(signature.name), ', '.join(params))
+        else:
+            label = escape(signature.label)
+
+        doc = signature.doc if signature.is_doc_loaded() else ''
+        doc_lines = doc.strip().splitlines()[:self.MAX_DOC_LINES]
+        if not doc_lines:
+            return '<pre>{}</pre>'.format(label)
+
+        return '<pre>{}</pre><pre><i>{}</i></pre>'.format(label, escape('\n'.join(doc_lines)))
+
+
 def completer(line, ns):
 
     # create node
@@ -156,7 +353,8 @@ def completer(line, ns):
     if m:
         name = m.group(1)
         if name:
-            auto = [x for x in NODE_TYPES_CACHE if x.lower().startswith(name.lower())]
+            # Node types are loaded the first time they are completed
+            auto = nodetypes.get_node_type_catalogue().rank(name)
             l = len(name)
             return [ContextCompleter(x, x[l:], True) for x in auto], None
     # exists nodes
@@ -164,12 +362,70 @@ def completer(line, ns):
     m = re.search(p, line)
     if m:
         name = m.group(1)
-        exists_nodes = sorted(dcc.selected_nodes(full_path=False))
+        # Nodes containing the name are also listed. Their completion replaces the typed text with the node name
+        exists_nodes = scenenodes.get_scene_node_index().search(name, limit=MAX_NODE_COMPLETIONS)
+        exists_nodes = ranking.rank(exists_nodes, name, limit=ranking.TOP_K)
         l = len(name)
-        if name:
-            auto = [x for x in exists_nodes if x.lower().startswith(name.lower())]
-            return [ContextCompleter(x, x[l:], True) for x in auto], None
-        else:
-            return [ContextCompleter(x, x, True) for x in exists_nodes], None
+        return [ContextCompleter(x, x[l:], True) for x in exists_nodes], None
 
     return None, None
+
+
+def stub_completer(line, resolve_fn):
+    """
+    Returns completions of DCC module members and command flags found in the stub index
+    :param line: str, text of the line before the cursor
+    :param resolve_fn: callable, function that returns the module name of an expression (cmds -> maya.cmds)
+    :return: list or None, completions or None if the line does not complete a module of the stub index
+    """
+
+    stub_index = stubindex.get_stub_index()
+    if not stub_index.open():
+        return None
+
+    # command flags
+    p = r"(?<![\w.])([A-Za-z_]\w*(?:\.\w+)*)\.(\w+)\((?:[^()]*,)?\s*(\w*)$"
+    m = re.search(p, line)
+    if m:
+        module_name = resolve_fn(m.group(1))
+        flags = stub_index.get_flags(module_name, m.group(2)) if module_name else None
+        if flags:
+            # Flags are inserted as keyword arguments
+            for flag in flags:
+                flag.name += '='
+            flags = ranking.rank(flags, m.group(3), key=lambda x: x.name) if m.group(3) else flags
+            # Positional arguments that do not match any flag are completed by jedi
+            if flags:
+                return flags
+    # module members
+    p = r"(?<![\w.])([A-Za-z_]\w*(?:\.\w+)*)\.(\w*)$"
+    m = re.search(p, line)
+    if m:
+        module_name = resolve_fn(m.group(1))
+        if module_name and stub_index.has_module(module_name):
+            return stub_index.complete(module_name, m.group(2))
+
+    return None
+
+
+def stub_signature(line, resolve_fn):
+    """
+    Returns the signature of the DCC command called at the end of the line, if it is found in the stub index
+    :param line: str, text of the line before the cursor
+    :param resolve_fn: callable, function that returns the module name of an expression (cmds -> maya.cmds)
+    :return: CallSignature or None
+    """
+
+    stub_index = stubindex.get_stub_index()
+    expression = completion.get_call_expression(line)
+    if not expression or '.' not in expression or not stub_index.open():
+        return None
+
+    module_expression, function_name = expression.rsplit('.', 1)
+    module_name = resolve_fn(module_expression)
+    record = stub_index.get_member(module_name, function_name) if module_name else None
+    if not record:
+        return None
+
+    return completion.CallSignature(
+        function_name, label=record.signature or '{}(...)'.format(function_name), doc_fn=lambda: record.doc)
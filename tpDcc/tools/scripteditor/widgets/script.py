@@ -14,22 +14,23 @@ __email__ = "tpovedatd@gmail.com"
 
 import os
 import re
-import jedi
+import inspect
 import logging
+import functools
 import traceback
 
-from Qt.QtCore import Qt, Signal, QPoint, QRect
+from Qt.QtCore import Qt, Signal, QPoint, QRect, QTimer
 from Qt.QtWidgets import QApplication, QWidget, QMessageBox, QMenu, QTextEdit, QShortcut, QAction
 from Qt.QtGui import QCursor, QTextCursor, QTextOption, QFont, QFontMetrics, QKeySequence, QColor, QPalette
 from Qt.QtGui import QPen, QBrush, QPainter
 
 from tpDcc import dcc
-from tpDcc.dcc import completer
+from tpDcc.dcc import completer as dcc_completer
 from tpDcc.libs.python import path as path_utils
 from tpDcc.libs.qt.core import base, qtutils
 from tpDcc.libs.qt.widgets import layouts, tabs
 
-from tpDcc.tools.scripteditor.core import consts
+from tpDcc.tools.scripteditor.core import consts, completion, diagnostics
 from tpDcc.tools.scripteditor.widgets import completer
 from tpDcc.tools.scripteditor.syntax import python
 
@@ -39,6 +40,7 @@ logger = logging.getLogger('tpDcc-tools-scripteditor')
 class ScriptsTab(tabs.BaseEditableTabWidget, object):
 
     lastTabClosed = Signal()
+    performanceModeChanged = Signal(bool)
 
     def __init__(self, script=None, add_empty_tab=False, settings=None, parent=None):
         super(ScriptsTab, self).__init__(parent=parent)
@@ -51,6 +53,7 @@ class ScriptsTab(tabs.BaseEditableTabWidget, object):
 
         self.tabBar().setContextMenuPolicy(Qt.CustomContextMenu)
         self.currentChanged.connect(self._on_hide_all_completers)
+        self.currentChanged.connect(self._on_performance_mode_changed)
         self.tabBar().customContextMenuRequested.connect(self._on_open_menu)
         self.tabBar().addTabClicked.connect(self._on_add_new_tab)
 
@@ -113,6 +116,7 @@ class ScriptsTab(tabs.BaseEditableTabWidget, object):
         script_widget = ScriptWidget(
             file_path=script_file, settings=self._settings, parent=self._parent, desktop=self._desktop)
         script_widget.editor.scriptSaved.connect(self._on_save_session)
+        script_widget.editor.performanceModeChanged.connect(self._on_performance_mode_changed)
         self.addTab(script_widget, script_name)
         script_widget.editor.moveCursor(QTextCursor.Start)
         self.setCurrentIndex(self.count() - 1)
@@ -337,6 +341,17 @@ class ScriptsTab(tabs.BaseEditableTabWidget, object):
         if result and result != text:
             self.setTabText(index, result)
 
+    def _on_performance_mode_changed(self, *args):
+        """
+        Internal callback function that is called when current tab changes or when performance mode of an editor
+        changes
+        """
+
+        if self.currentIndex() < 0 or not self.widget(self.currentIndex()):
+            return
+
+        self.performanceModeChanged.emit(self.current().is_performance_mode())
+
     def _on_add_new_tab(self):
         """
         Internal callback function that is called when add button in tab bar is clicked by the user
@@ -396,7 +411,25 @@ class ScriptWidget(base.BaseWidget, object):
         if self._file_path and os.path.isfile(self._file_path):
             with open(self._file_path) as file_handler:
                 text = file_handler.read()
-                self._editor.add_text(text)
+            self._editor.jedi_session.set_path(self._file_path)
+            # Performance mode is set before adding the text, so big files are never highlighted
+            self._editor.set_performance_mode(self._is_large_file(text))
+            self._editor.add_text(text)
+
+    def _is_large_file(self, text):
+        """
+        Internal function that returns whether or not given file text exceeds the size or line count limits
+        defined in settings
+        :param text: str
+        :return: bool
+        """
+
+        max_size = self._settings.get('performance_mode_size') if self._settings else None
+        max_lines = self._settings.get('performance_mode_lines') if self._settings else None
+        max_size = int(max_size or consts.PERFORMANCE_MODE_SIZE)
+        max_lines = int(max_lines or consts.PERFORMANCE_MODE_LINES)
+
+        return os.path.getsize(self._file_path) > max_size or text.count('\n') + 1 > max_lines
 
 
 class ScriptEditor(QTextEdit, object):
@@ -404,17 +437,34 @@ class ScriptEditor(QTextEdit, object):
     scriptExecuted = Signal()
     scriptSaved = Signal()
     scriptInput = Signal()
+    performanceModeChanged = Signal(bool)
+    completionsReady = Signal(int, int, object)
+    signaturesReady = Signal(int, int, object)
+    signatureDocReady = Signal(object)
 
     def __init__(self, desktop=None, settings=None, parent=None):
         super(ScriptEditor, self).__init__(parent)
 
         self._font_size = 12
         self._completer = completer.ScriptCompleter(parent=parent, editor=self)
+        self._signature_tip = completer.SignatureTip(parent=self)
         self._desktop = desktop
         self._parent = parent
         self._settings = settings
         self._syntax_highlighter = None
         self._use_jedi = True
+        self._lazy_highlighting = True
+        self._threaded_highlighting = True
+        self._performance_mode = False
+        self._jedi_session = completion.JediSession()
+        self._completion_mode = completion.CompletionModes.INTERPRETER
+        self._completion_session = None
+        self._completion_trace = None
+        self._completion_timer_start = None
+        self._import_aliases = None
+        self._completion_timer = QTimer(self)
+        self._completion_timer.setSingleShot(True)
+        self._completion_timer.setInterval(consts.COMPLETION_DELAY)
 
         font = QFont(consts.FONT_NAME)
         font.setStyleHint(consts.FONT_STYLE)
@@ -428,8 +478,27 @@ class ScriptEditor(QTextEdit, object):
 
         shortcut = QShortcut(QKeySequence('Ctrl+S'), self)
         shortcut.activated.connect(self.scriptSaved.emit)
+        self.verticalScrollBar().valueChanged.connect(self._on_update_visible_blocks)
+        self.document().blockCountChanged.connect(self._on_update_visible_blocks)
+        self._completion_timer.timeout.connect(self._on_request_completions)
+        self.completionsReady.connect(self._on_completions_ready)
+        self.signaturesReady.connect(self._on_signatures_ready)
+        self.signatureDocReady.connect(self._signature_tip.update_doc)
 
         if settings:
+            lazy_highlighting = settings.get('lazy_highlighting')
+            if lazy_highlighting is not None:
+                self._lazy_highlighting = bool(lazy_highlighting)
+            threaded_highlighting = settings.get('threaded_highlighting')
+            if threaded_highlighting is not None:
+                self._threaded_highlighting = bool(threaded_highlighting)
+            self._completion_mode = settings.get('completion_mode') or self._completion_mode
+            completion_delay = settings.get('completion_delay')
+            if completion_delay is not None:
+                self._completion_timer.setInterval(int(completion_delay))
+            completion_slow_threshold = settings.get('completion_slow_threshold')
+            if completion_slow_threshold is not None:
+                diagnostics.get_diagnostics().set_slow_threshold(float(completion_slow_threshold))
             self.apply_highlighter(settings.get('theme'))
 
         self.change_font_size(True)
@@ -442,15 +511,22 @@ class ScriptEditor(QTextEdit, object):
     def completer(self):
         return self._completer
 
+    @property
+    def jedi_session(self):
+        return self._jedi_session
+
     # =================================================================================================================
     # OVERRIDES
     # =================================================================================================================
 
     def focusOutEvent(self, event):
+        self._signature_tip.hide_me()
         self.scriptSaved.emit()
         super(ScriptEditor, self).focusOutEvent(event)
 
     def hideEvent(self, event):
+        self._cancel_completions()
+        self._cancel_signatures()
         self._completer.update_complete_list()
         try:
             super(ScriptEditor, self).hideEvent(event)
@@ -459,14 +535,23 @@ class ScriptEditor(QTextEdit, object):
 
     def mousePressEvent(self, event):
         self._completer.update_complete_list()
+        self._cancel_signatures()
         super(ScriptEditor, self).mousePressEvent(event)
 
+    def resizeEvent(self, event):
+        super(ScriptEditor, self).resizeEvent(event)
+        self._on_update_visible_blocks()
+
     def keyPressEvent(self, event):
         """
         Overrides keyPressEvent
         :param event: QKeyEvent
         """
 
+        # Jedi warm up waits until the user stops typing
+        completion.get_completion_worker().notify_activity()
+
+        # Line number bar only paints visible blocks, so it is also updated in performance mode
         self.scriptInput.emit()
         parse = 0
 
@@ -538,6 +623,7 @@ class ScriptEditor(QTextEdit, object):
             # close completer
             if self._completer:
                 self._completer.update_complete_list()
+            self._cancel_signatures()
             self.setFocus()
         elif event.key() == Qt.Key_Down or event.key() == Qt.Key_Up:
             # go to completer
@@ -565,7 +651,7 @@ class ScriptEditor(QTextEdit, object):
             mime_data = event.mimeData()
             text = mime_data.text()
             namespace = self._parent.namespace
-            text = completer.Completer.wrap_dropped_text(namespace, text, event)
+            text = dcc_completer.Completer.wrap_dropped_text(namespace, text, event)
             mime_data.setText(text)
             super(ScriptEditor, self).dropEvent(event)
         else:
@@ -598,6 +684,39 @@ class ScriptEditor(QTextEdit, object):
 
         self.apply_highlighter(settings.get('theme'))
 
+    def is_performance_mode(self):
+        """
+        Returns whether or not editor is in performance mode
+        :return: bool
+        """
+
+        return self._performance_mode
+
+    def set_performance_mode(self, flag):
+        """
+        Sets whether or not editor is in performance mode. In performance mode, used when editing big files, syntax
+        highlighting and jedi completion are disabled
+        :param flag: bool
+        """
+
+        flag = bool(flag)
+        if flag == self._performance_mode:
+            return
+
+        self._performance_mode = flag
+        if flag:
+            self._cancel_completions()
+            if self._completer:
+                self._completer.update_complete_list()
+            if self._syntax_highlighter:
+                self._syntax_highlighter.setDocument(None)
+                self._syntax_highlighter.deleteLater()
+                self._syntax_highlighter = None
+        else:
+            self.apply_highlighter(self._settings.get('theme') if self._settings else None)
+
+        self.performanceModeChanged.emit(flag)
+
     def get_selection(self):
         """
         Returns selected text
@@ -628,14 +747,18 @@ class ScriptEditor(QTextEdit, object):
 
     def insert_text(self, comp):
         """
-        Inserts given text and the end of the script editor
-        :param comp: str
+        Inserts given completion at the cursor position
+        :param comp: CompletionRecord
         """
 
         cursor = self.textCursor()
+        complete = comp.complete
+        if complete is None:
+            # Fuzzy completions replace the whole word typed by the user (see _fix_line)
+            complete = comp.name[len(self._get_word_prefix(cursor)):]
         self.document().documentLayout().blockSignals(True)
         try:
-            cursor.insertText(comp.complete)
+            cursor.insertText(complete)
             cursor = self._fix_line(cursor, comp)
             self.document().documentLayout().blockSignals(False)
         except Exception:
@@ -832,8 +955,16 @@ class ScriptEditor(QTextEdit, object):
                 colors = python.get_colors(theme=theme, settings=self._settings)
                 if self._completer:
                     self._completer.update_style(colors)
-
-            self._syntax_highlighter = python.PythonHiglighter(document=self, colors=colors)
+                self._signature_tip.update_style(colors)
+
+            # In performance mode syntax highlighting is disabled, so no highlighter is updated nor created
+            if not self._performance_mode:
+                engine = python.get_lexer(self._get_highlighter_engine()).ENGINE
+                if self._syntax_highlighter and self._syntax_highlighter.engine == engine:
+                    # Colors are applied to all open editors in a single throttled pass, visible editors first
+                    python.get_highlighter_registry().apply_colors(colors, throttle=True)
+                else:
+                    self._create_highlighter(colors)
             editor_style = python.editor_style(theme)
             self.setStyleSheet(editor_style)
         except Exception:
@@ -900,53 +1031,70 @@ class ScriptEditor(QTextEdit, object):
 
     def parse_text(self):
         """
-        Parses all the texts in the script editor
+        Parses the text before the cursor and updates the completer. Context completions are shown immediately
+        while jedi completions are requested in background once the user stops typing. While the user extends the
+        same identifier, last jedi completions are narrowed locally
         """
 
-        use_jedi = True
+        if not self._completer:
+            return
 
-        if self._completer:
-            text = self.toPlainText()
-            self.move_completer()
-            if text:
-                context_completer = False
-                text_cursor = self.textCursor()
-                pos = text_cursor.position()
-                line = text[:pos].split('\n')[-1]
-                if not hasattr(self._parent, 'namespace'):
-                    namespace = dict()
-                else:
-                    namespace = self._parent.namespace
-                comp, extra = completer.completer(line, namespace)
-                if comp or extra:
-                    context_completer = True
-                    self._completer.update_complete_list(comp, extra)
-                if not context_completer:
-                    if re.match('[a-zA-Z0-9_.]', text[pos - 1]):
-                        offset = 0
-                        auto_import = completer.Completer.get_auto_import()
-                        if auto_import:
-                            text = auto_import + text
-                            offset = len(auto_import.split('\n')) - 1
-                        block_number = text_cursor.blockNumber() + 1 + offset
-                        column_number = text_cursor.columnNumber()
-
-                        if self._use_jedi:
-                            try:
-                                script = jedi.Script(text, block_number, column_number, '')
-                                if self._use_jedi:
-                                    try:
-                                        self._completer.update_complete_list(script.complete())
-                                    except Exception:
-                                        self._completer.update_complete_list()
-                            except Exception as exc:
-                                self._use_jedi = False
-                        else:
-                            self._completer.update_complete_list()
-                else:
-                    self._completer.update_complete_list()
+        self.move_completer()
+        if self.document().isEmpty():
+            self._cancel_completions()
+            self._completer.update_complete_list()
+            return
+
+        trace = diagnostics.get_diagnostics().start_trace(self._get_trace_name())
+        with trace.stage(diagnostics.CompletionStages.SNAPSHOT):
+            text_cursor = self.textCursor()
+            line = text_cursor.block().text()[:text_cursor.positionInBlock()]
+        if line and line[-1] in '(,':
+            self._request_signatures(line)
+        elif line and line[-1] == ')':
+            self._cancel_signatures()
+        if not hasattr(self._parent, 'namespace'):
+            namespace = dict()
+        else:
+            namespace = self._parent.namespace
+        with trace.stage(diagnostics.CompletionStages.CONTEXT):
+            comp, extra = completer.completer(line, namespace)
+        if comp or extra:
+            self._cancel_completions()
+            with trace.stage(diagnostics.CompletionStages.POPULATE):
+                self._completer.update_complete_list(comp, extra)
+            trace.finish()
+            return
+
+        # DCC modules found in the stub index are completed without jedi
+        with trace.stage(diagnostics.CompletionStages.STUBS):
+            stub_completions = completer.stub_completer(line, self._resolve_module_name) if line else None
+        if stub_completions is not None:
+            self._cancel_completions()
+            with trace.stage(diagnostics.CompletionStages.POPULATE):
+                self._completer.update_complete_list(stub_completions)
+            trace.finish()
+        elif line and re.match('[a-zA-Z0-9_.]', line[-1]) and self._use_jedi and not self._performance_mode:
+            prefix = self._get_word_prefix(text_cursor)
+            start = text_cursor.position() - len(prefix)
+            session = self._completion_session
+            if session and session.is_valid(text_cursor.blockNumber(), start, prefix):
+                self._completion_timer.stop()
+                with trace.stage(diagnostics.CompletionStages.RANK):
+                    completions = session.filter(prefix)
+                with trace.stage(diagnostics.CompletionStages.POPULATE):
+                    self._completer.update_complete_list(completions)
+                trace.finish()
             else:
-                self._completer.update_complete_list()
+                # Trace is finished once the completion worker results are shown
+                self._completion_session = None
+                self._completion_trace = trace
+                self._completion_timer_start = diagnostics.clock()
+                self._completion_timer.start()
+        else:
+            self._cancel_completions()
+            self._completer.update_complete_list()
+            trace.finish()
 
     def add_tabs(self, text):
         """
@@ -1013,7 +1161,10 @@ class ScriptEditor(QTextEdit, object):
         self.blockSignals(True)
 
         try:
-            self._syntax_highlighter = python.PythonHiglighter(document=self, colors=colors)
+            if self._syntax_highlighter:
+                python.get_highlighter_registry().apply_colors(colors, throttle=True)
+            elif not self._performance_mode:
+                self._create_highlighter(colors)
             current_style = python.apply_color_to_editor_style(colors=colors)
             self.setStyleSheet(current_style)
             self._completer.setStyleSheet(current_style)
@@ -1055,14 +1206,13 @@ class ScriptEditor(QTextEdit, object):
         before = start[:-len(comp.name)]
         br = ''
         ofs = 0
-        if hasattr(comp, 'end_char'):
-            if before and comp.end_char:
-                brackets = {'"': '"', "'": "'"}  # , '(':')', '[':']'}
-                if before[-1] in brackets:
-                    ofs = 1
-                    br = brackets[before[-1]]
-                    if end and end[0] == brackets[before[-1]]:
-                        br = ''
+        if before and comp.end_char:
+            brackets = {'"': '"', "'": "'"}  # , '(':')', '[':']'}
+            if before[-1] in brackets:
+                ofs = 1
+                br = brackets[before[-1]]
+                if end and end[0] == brackets[before[-1]]:
+                    br = ''
 
         res = before + comp.name + br + end
 
@@ -1084,6 +1234,250 @@ class ScriptEditor(QTextEdit, object):
 
         return pattern
 
+    def _create_highlighter(self, colors=None):
+        """
+        Internal function that creates a new syntax highlighter for the editor, replacing the current one
+        :param colors: dict or None
+        """
+
+        if self._syntax_highlighter:
+            self._syntax_highlighter.setDocument(None)
+            self._syntax_highlighter.deleteLater()
+
+        self._syntax_highlighter = python.PythonHiglighter(
+            document=self, colors=colors, lazy=self._lazy_highlighting, engine=self._get_highlighter_engine(),
+            threaded=self._threaded_highlighting)
+        self._on_update_visible_blocks()
+
+    def _get_highlighter_engine(self):
+        """
+        Internal function that returns the name of the highlighting engine defined in settings
+        :return: str or None
+        """
+
+        return self._settings.get('highlighter_engine') if self._settings else None
+
+    def _get_word_prefix(self, cursor):
+        """
+        Internal function that returns the part of the identifier located before the given cursor
+        :param cursor: QTextCursor
+        :return: str
+        """
+
+        line = cursor.block().text()[:cursor.positionInBlock()]
+
+        return re.search(r'\w*$', line).group(0)
+
+    def _resolve_module_name(self, expression):
+        """
+        Internal function that returns the name of the module the given expression refers to, using interpreter
+        namespace, auto import names and the import statements of the document
+        :param expression: str, dotted expression (cmds, maya.cmds, pm.nodetypes, etc)
+        :return: str or None
+        """
+
+        parts = expression.split('.')
+        for namespace in (getattr(self._parent, 'namespace', None), completion.get_auto_import_preamble().namespace):
+            value = namespace.get(parts[0]) if namespace else None
+            if inspect.ismodule(value):
+                return '.'.join([value.__name__] + parts[1:])
+
+        module_name = self._get_import_aliases().get(parts[0]) if not self._performance_mode else None
+        if not module_name:
+            return expression
+
+        return '.'.join([module_name] + parts[1:])
+
+    def _get_import_aliases(self):
+        """
+        Internal function that returns the names bound by the import statements of the auto import code and the
+        document. Aliases are cached per document revision, so the document is only scanned once per edit
+        :return: dict(str, str)
+        """
+
+        revision = self.document().revision()
+        if self._import_aliases is None or self._import_aliases[0] != revision:
+            aliases = completion.get_import_aliases(completion.get_auto_import_preamble().source)
+            aliases.update(completion.get_import_aliases(self.toPlainText()))
+            self._import_aliases = (revision, aliases)
+
+        return self._import_aliases[1]
+
+    def _request_signatures(self, line):
+        """
+        Internal function that shows the signature of the callable called at the cursor position. Signatures of DCC
+        commands found in the stub index are shown immediately; other signatures are computed by jedi in background
+        :param line: str, text of the line before the cursor
+        """
+
+        self._cancel_signatures()
+        if not self._use_jedi or self._performance_mode:
+            return
+
+        signature = completer.stub_signature(line, self._resolve_module_name)
+        if signature:
+            self._show_signature(signature)
+            return
+
+        text_cursor = self.textCursor()
+        position = text_cursor.position()
+        revision = self.document().revision()
+        signatures_fn = functools.partial(
+            self._jedi_session.get_signatures, revision=revision, preamble=completion.get_auto_import_preamble())
+        namespace_snapshot = getattr(self._parent, 'namespace_snapshot', None)
+        if self._completion_mode == completion.CompletionModes.INTERPRETER and namespace_snapshot:
+            signatures_fn = functools.partial(
+                signatures_fn, namespace=namespace_snapshot.namespace, namespace_version=namespace_snapshot.version)
+
+        def _on_finished(revision, signatures):
+            self.signaturesReady.emit(revision, position, signatures)
+
+        completion.get_completion_worker().submit(completion.CompletionRequest(
+            self._get_signatures_owner(), revision, self.toPlainText(), text_cursor.blockNumber() + 1,
+            text_cursor.columnNumber(), _on_finished, signatures_fn))
+
+    def _show_signature(self, signature):
+        """
+        Internal function that shows given signature above the cursor. If its doc is not loaded yet, it is loaded
+        by the completion worker and shown once it is ready
+        :param signature: CallSignature
+        """
+
+        self._signature_tip.show_signature(signature, self.mapToGlobal(self.cursorRect().topLeft()))
+        if signature.is_doc_loaded():
+            return
+
+        def _on_finished(revision, doc):
+            self.signatureDocReady.emit(signature)
+
+        completion.get_completion_worker().submit(completion.CompletionRequest(
+            self._get_signatures_owner(), self.document().revision(), None, None, None, _on_finished,
+            lambda *args: signature.load_doc()))
+
+    def _cancel_signatures(self):
+        """
+        Internal function that hides signature tooltip and cancels pending signature requests
+        """
+
+        self._signature_tip.hide_me()
+        completion.get_completion_worker().cancel(self._get_signatures_owner())
+
+    def _get_signatures_owner(self):
+        """
+        Internal function that returns the owner of signature requests, so they do not cancel completion requests
+        :return: tuple(int, str)
+        """
+
+        return id(self), 'signatures'
+
+    def _get_trace_name(self):
+        """
+        Internal function that returns the name used to identify completion requests of the editor in diagnostics
+        :return: str
+        """
+
+        return os.path.basename(self._jedi_session.path)
+
+    def _cancel_completions(self):
+        """
+        Internal function that cancels pending and running completion requests of the editor
+        """
+
+        self._completion_timer.stop()
+        self._completion_session = None
+        self._completion_trace = None
+        self._completion_timer_start = None
+        completion.get_completion_worker().cancel(id(self))
+
+    def _on_request_completions(self):
+        """
+        Internal callback function that is called when the user stops typing. Sends a snapshot of the editor text
+        to the completion worker, tagged with the current document revision
+        """
+
+        if not self._completer or self._performance_mode:
+            return
+
+        trace = self._completion_trace or diagnostics.get_diagnostics().start_trace(self._get_trace_name())
+        if self._completion_timer_start is not None:
+            trace.add(
+                diagnostics.CompletionStages.DEBOUNCE, (diagnostics.clock() - self._completion_timer_start) * 1000.0)
+            self._completion_timer_start = None
+        with trace.stage(diagnostics.CompletionStages.SNAPSHOT):
+            text_cursor = self.textCursor()
+            text = self.toPlainText()
+        # Auto import code is only parsed when it changes. Completion worker only resolves modules that are already
+        # imported, so modules that are not imported yet are imported in the main thread once this request is sent
+        with trace.stage(diagnostics.CompletionStages.AUTO_IMPORT):
+            preamble = completion.get_auto_import_preamble()
+            if preamble.update(dcc_completer.Completer.get_auto_import()):
+                QTimer.singleShot(0, preamble.import_modules)
+        position = text_cursor.position()
+        block_number = text_cursor.blockNumber()
+        prefix = self._get_word_prefix(text_cursor)
+        revision = self.document().revision()
+        complete_fn = functools.partial(
+            self._jedi_session.complete, revision=revision, preamble=preamble, fuzzy=True)
+        namespace_snapshot = getattr(self._parent, 'namespace_snapshot', None)
+        if self._completion_mode == completion.CompletionModes.INTERPRETER and namespace_snapshot:
+            complete_fn = functools.partial(
+                complete_fn, namespace=namespace_snapshot.namespace, namespace_version=namespace_snapshot.version)
+
+        def _on_finished(revision, completions):
+            self.completionsReady.emit(revision, position, completion.CompletionSession(
+                block_number, position - len(prefix), prefix, completions))
+
+        self._completion_trace = trace
+        completion.get_completion_worker().submit(completion.CompletionRequest(
+            id(self), revision, text, block_number + 1, text_cursor.columnNumber(),
+            _on_finished, complete_fn, prefix=prefix, trace=trace))
+
+    def _on_completions_ready(self, revision, position, session):
+        """
+        Internal callback function that is called when completion worker finishes a request
+        Completions computed for an old revision of the text or for another cursor position are ignored
+        :param revision: int
+        :param position: int
+        :param session: CompletionSession
+        """
+
+        if revision != self.document().revision() or position != self.textCursor().position():
+            return
+
+        trace = self._completion_trace or diagnostics.get_diagnostics().start_trace(self._get_trace_name())
+        self._completion_trace = None
+        self._completion_session = session
+        with trace.stage(diagnostics.CompletionStages.POPULATE):
+            self._completer.update_complete_list(session.completions)
+        trace.finish()
+
+    def _on_signatures_ready(self, revision, position, signatures):
+        """
+        Internal callback function that is called when completion worker finishes a signature request
+        Signatures are only shown if the user did not modify the text or move the cursor since the request
+        :param revision: int
+        :param position: int
+        :param signatures: list(CallSignature)
+        """
+
+        if revision != self.document().revision() or position != self.textCursor().position() or not signatures:
+            return
+
+        self._show_signature(signatures[0])
+
+    def _on_update_visible_blocks(self, *args):
+        """
+        Internal callback function that notifies the highlighter which blocks are visible in the editor
+        so they are highlighted before the rest of the document
+        """
+
+        if not self._syntax_highlighter or not self._syntax_highlighter.is_lazy():
+            return
+
+        first_block = self.cursorForPosition(QPoint(0, 0)).blockNumber()
+        last_block = self.cursorForPosition(QPoint(0, self.viewport().height())).blockNumber()
+        self._syntax_highlighter.set_visible_blocks(first_block, last_block)
+
 
 class ScriptEditorNumberBar(QWidget, object):
     def __init__(self, editor, parent=None):
@@ -1129,10 +1523,10 @@ class ScriptEditorNumberBar(QWidget, object):
         font_metrics = self.fontMetrics()
         current_block = self.editor.document().findBlock(self.editor.textCursor().position())
         painter = QPainter(self)
-        line_count = 0
+        layout = self.editor.document().documentLayout()
 
-        # Iterate over all text blocks in the document
-        block = self.editor.document().begin()
+        # Iterate only over the text blocks that are visible in the editor
+        block = self.editor.cursorForPosition(QPoint(0, 0)).block()
         font_size = self.editor.font().pointSize()
         font = painter.font()
         font.setPixelSize(font_size)
@@ -1141,12 +1535,12 @@ class ScriptEditorNumberBar(QWidget, object):
         painter.setFont(font)
         align = Qt.AlignRight
         while block.isValid():
-            line_count += 1
+            line_count = block.blockNumber() + 1
 
             # Get top left position of the block in the document and check if the position of the block is
             # outside of the visible area
-            position = self.editor.document().documentLayout().blockBoundingRect(block).topLeft()
-            if position.y() == page_bottom:
+            position = layout.blockBoundingRect(block).topLeft()
+            if position.y() > page_bottom:
                 break
 
             rect = QRect(0, round(position.y()) - contents_y, self.width()-5, font_size + offset)
@@ -1162,6 +1556,6 @@ class ScriptEditorNumberBar(QWidget, object):
             painter.drawText(rect, align, str(line_count))
             block = block.next()
 
-        self.highest_line = line_count
+        self.highest_line = self.editor.document().blockCount()
         painter.end()
         super(ScriptEditorNumberBar, self).paintEvent(event)
@@ -17,13 +17,14 @@ import sys
 import logging
 import traceback
 
-from Qt.QtCore import Qt, Signal, QCoreApplication, QSize
+from Qt.QtCore import Qt, Signal, QCoreApplication, QSize, QTimer
 from Qt.QtWidgets import QSplitter, QFileDialog, QMenu, QAction, QToolBar, QMenuBar
 from Qt.QtGui import QKeySequence
 
 from tpDcc import dcc
+from tpDcc.dcc import completer as dcc_completer
 from tpDcc.managers import resources
-from tpDcc.tools.scripteditor.core import session, consts
+from tpDcc.tools.scripteditor.core import session, consts, completion, nodetypes, stubindex
 from tpDcc.libs.qt.core import base
 from tpDcc.libs.qt.widgets import buttons
 from tpDcc.libs.python import osplatform, path as path_utils
@@ -45,9 +46,25 @@ class ScriptEditorWidget(base.BaseWidget, object):
             session_path = self._get_session_path()
             session.SessionManager().current_session = session.Session(session_path)
 
+        node_type_catalogue = nodetypes.get_node_type_catalogue()
+        if not node_type_catalogue.cache_path:
+            node_type_catalogue.set_cache_path(
+                os.path.join(os.path.dirname(self._get_session_path()), consts.NODE_TYPES_CACHE_NAME))
+
+        stub_index = stubindex.get_stub_index()
+        stub_index_path = self._settings.get('stub_index_path') if self._settings else None
+        if not stub_index_path and not stub_index.path and stubindex.get_dcc_stub_name():
+            stub_index_path = os.path.join(
+                os.path.dirname(self._get_session_path()), consts.STUBS_FOLDER_NAME,
+                '{}.stubs'.format(stubindex.get_dcc_stub_name()))
+        if stub_index_path:
+            stub_index.set_path(stub_index_path)
+
         self._namespace = __import__('__main__').__dict__
+        self._namespace_snapshot = completion.NamespaceSnapshot(self._namespace)
         self._dial = None
         self._enable_save_script = enable_save_script
+        self._warm_up_started = False
 
         self._update_namespace({
             'self_main': self,
@@ -68,6 +85,10 @@ class ScriptEditorWidget(base.BaseWidget, object):
     def namespace(self):
         return self._namespace
 
+    @property
+    def namespace_snapshot(self):
+        return self._namespace_snapshot
+
     # =================================================================================================================
     # OVERRIDES
     # =================================================================================================================
@@ -95,6 +116,14 @@ class ScriptEditorWidget(base.BaseWidget, object):
 
     def setup_signals(self):
         self._scripts_tab.lastTabClosed.connect(self.lastTabClosed.emit)
+        self._scripts_tab.performanceModeChanged.connect(self._on_performance_mode_changed)
+
+    def showEvent(self, event):
+        super(ScriptEditorWidget, self).showEvent(event)
+        if not self._warm_up_started:
+            # Warm up starts once the editor is painted, so it never delays the editor from being shown
+            self._warm_up_started = True
+            QTimer.singleShot(consts.WARM_UP_DELAY, self._on_warm_up)
 
     def closeEvent(self, event):
         self.save_current_session()
@@ -372,8 +401,13 @@ class ScriptEditorWidget(base.BaseWidget, object):
         self._theme_menu.setIcon(theme_icon)
         edit_theme_action = QAction(edit_icon, 'Edit...', self._theme_menu)
         open_settings_folder_action = QAction(settings_icon, 'Open Settings Folder', options_menu)
+        self._performance_mode_action = QAction('Performance Mode', options_menu)
+        self._performance_mode_action.setCheckable(True)
+        self._performance_mode_action.setToolTip(
+            'Disables syntax highlighting and code completion of current script to edit big files faster')
         options_menu.addMenu(self._theme_menu)
         self._theme_menu.addAction(edit_theme_action)
+        options_menu.addAction(self._performance_mode_action)
         options_menu.addAction(open_settings_folder_action)
 
         help_menu = QMenu('Help', self)
@@ -404,6 +438,7 @@ class ScriptEditorWidget(base.BaseWidget, object):
         self._execute_selected_action.triggered.connect(self.execute_selected)
         self._clear_output_action.triggered.connect(self.clear_history)
         open_settings_folder_action.triggered.connect(self._open_settings)
+        self._performance_mode_action.toggled.connect(self._on_toggle_performance_mode)
         # manual_action.triggered.connect(self._open_manual)
         # show_shortcuts_action.triggered.connect(self._open_shortcuts)
         # print_help_action.triggered.connect(self.editor_help)
@@ -436,14 +471,19 @@ class ScriptEditorWidget(base.BaseWidget, object):
         execute_selected_btn.setToolButtonStyle(Qt.ToolButtonTextUnderIcon)
         clear_output_btn = buttons.BaseToolButton(parent=self)
         clear_output_btn.setToolButtonStyle(Qt.ToolButtonTextUnderIcon)
+        performance_mode_btn = buttons.BaseToolButton(parent=self)
+        performance_mode_btn.setToolButtonStyle(Qt.ToolButtonTextOnly)
 
         toolbar.addWidget(execute_btn)
         toolbar.addWidget(execute_selected_btn)
         toolbar.addWidget(clear_output_btn)
+        toolbar.addSeparator()
+        toolbar.addWidget(performance_mode_btn)
 
         execute_btn.setDefaultAction(self._execute_all_action)
         execute_selected_btn.setDefaultAction(self._execute_selected_action)
         clear_output_btn.setDefaultAction(self._clear_output_action)
+        performance_mode_btn.setDefaultAction(self._performance_mode_action)
 
         return toolbar
 
@@ -466,6 +506,7 @@ class ScriptEditorWidget(base.BaseWidget, object):
         """
 
         self._namespace.update(namespace_dict)
+        self._namespace_snapshot.update(self._namespace)
 
     def _load_current_session(self):
         """
@@ -597,5 +638,61 @@ class ScriptEditorWidget(base.BaseWidget, object):
 
         sys.stdout = tmp_std_out
 
+        # Objects created by the command are now available for completion
+        self._namespace_snapshot.update(self._namespace)
+
     def _open_find_replace(self):
         print('opening ...')
+
+    def _get_warm_up_modules(self):
+        """
+        Internal function that returns the modules preloaded into jedi in background: builtins, modules imported by
+        auto import code and by open tabs and DCC modules defined in settings
+        :return: list(str)
+        """
+
+        warm_up_modules = self._settings.get('warm_up_modules') if self._settings else None
+        if warm_up_modules is None:
+            warm_up_modules = consts.WARM_UP_MODULES
+
+        texts = [dcc_completer.Completer.get_auto_import() or '']
+        texts.extend(self._scripts_tab.get_current_text(i) for i in range(self._scripts_tab.count()))
+        modules = [type(len).__module__]
+        for module_name in completion.get_imported_modules('\n'.join(texts)) + list(warm_up_modules):
+            if module_name not in modules:
+                modules.append(module_name)
+
+        return modules
+
+    def _on_warm_up(self):
+        """
+        Internal callback function that starts preloading modules into jedi in background
+        """
+
+        if self._settings and self._settings.get('warm_up') is False:
+            return
+
+        completion.get_jedi_warm_up().start(self._get_warm_up_modules())
+
+    def _on_performance_mode_changed(self, flag):
+        """
+        Internal callback function that is called when performance mode of the current script changes
+        :param flag: bool
+        """
+
+        self._performance_mode_action.blockSignals(True)
+        try:
+            self._performance_mode_action.setChecked(flag)
+        finally:
+            self._performance_mode_action.blockSignals(False)
+
+    def _on_toggle_performance_mode(self, flag):
+        """
+        Internal callback function that is called when the user toggles performance mode action
+        :param flag: bool
+        """
+
+        if not self._scripts_tab.count():
+            return
+
+        self._scripts_tab.current().set_performance_mode(flag)